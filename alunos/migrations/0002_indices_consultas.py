@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('tipo_arquivo', 'CORRENTE')), fields=['nome'], name='aluno_corrente_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matricula',
+            index=models.Index(fields=['ano_administrativo', 'status'], name='matricula_ano_status_idx'),
+        ),
+    ]
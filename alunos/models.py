@@ -47,6 +47,12 @@ class Aluno(models.Model):
         verbose_name = "Aluno"
         verbose_name_plural = "Alunos"
         ordering = ['nome']
+        indexes = [
+            # Listagens e contagens do arquivo corrente, ordenadas por nome
+            models.Index(
+                fields=['nome'], condition=models.Q(tipo_arquivo='CORRENTE'), name='aluno_corrente_nome_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.codigo} - {self.nome}"
@@ -168,6 +174,10 @@ class Matricula(models.Model):
         verbose_name_plural = "Matrículas"
         unique_together = ['aluno', 'ano_administrativo', 'tipo_matricula']
         ordering = ['-ano_administrativo', '-data_matricula']
+        indexes = [
+            # Agregações do censo por ano letivo
+            models.Index(fields=['ano_administrativo', 'status'], name='matricula_ano_status_idx'),
+        ]
     
     def __str__(self):
         return f"Matrícula {self.aluno.codigo} - {self.ano_administrativo} - {self.get_tipo_ensino_display()}"
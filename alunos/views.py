@@ -5,6 +5,7 @@ from django.db.models import Q, Count
 from django.http import JsonResponse
 from django.core.paginator import Paginator
 from dashboard.models import AtividadeRecente
+from busca.services import buscar
 from .models import Aluno, DocumentacaoAluno, Responsavel, TransporteAluno, Matricula
 from .forms import AlunoForm, DocumentacaoAlunoForm, ResponsavelForm, TransporteAlunoForm, MatriculaForm
 
@@ -56,9 +57,10 @@ def aluno_list(request):
     
     if busca:
         if tipo_busca == 'codigo':
-            alunos = alunos.filter(codigo__icontains=busca)
+            busca_codigo = busca.strip()
+            alunos = alunos.filter(codigo=int(busca_codigo)) if busca_codigo.isdigit() else alunos.none()
         else:  # nome
-            alunos = alunos.filter(nome__icontains=busca)
+            alunos = buscar(alunos, 'aluno', busca)
     
     # Filtro por tipo de arquivo
     if arquivo_tipo == 'CORRENTE':
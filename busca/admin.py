@@ -0,0 +1,7 @@
+from django.contrib import admin
+from .models import DocumentoBusca
+
+@admin.register(DocumentoBusca)
+class DocumentoBuscaAdmin(admin.ModelAdmin):
+    list_display = ['tipo', 'objeto_id', 'texto']
+    list_filter = ['tipo']
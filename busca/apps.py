@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class BuscaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'busca'
+
+    def ready(self):
+        from .signals import conectar_sinais
+        conectar_sinais()
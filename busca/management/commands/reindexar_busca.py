@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from busca.services import INDICES, indexar
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice da busca unificada (use após importações em lote)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipos', nargs='*', help=f'Tipos a reindexar (padrão: todos): {", ".join(INDICES)}')
+
+    def handle(self, *args, **options):
+        tipos = options['tipos'] or list(INDICES)
+        desconhecidos = [tipo for tipo in tipos if tipo not in INDICES]
+        if desconhecidos:
+            raise CommandError(f'Tipo(s) desconhecido(s): {", ".join(desconhecidos)}')
+
+        for tipo in tipos:
+            total = indexar(tipo)
+            self.stdout.write(self.style.SUCCESS(f'✓ {tipo}: {total} registro(s) indexado(s)'))
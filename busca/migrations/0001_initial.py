@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=30, verbose_name='Tipo de Registro')),
+                ('objeto_id', models.BigIntegerField(verbose_name='Código do Registro')),
+                ('texto', models.TextField(verbose_name='Texto Normalizado')),
+            ],
+            options={
+                'verbose_name': 'Documento de Busca',
+                'verbose_name_plural': 'Documentos de Busca',
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+    ]
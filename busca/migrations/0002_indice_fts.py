@@ -0,0 +1,130 @@
+import re
+import unicodedata
+
+from django.db import migrations, OperationalError
+
+# Cópias congeladas de busca.services no momento desta migração: o código da
+# migração não pode depender do módulo atual, que muda com o tempo. Depois de
+# alterar INDICES, use `manage.py reindexar_busca`.
+TABELA_FTS = 'busca_fts'
+
+# tipo: (modelo, campos, identificadores)
+INDICES = {
+    'aluno': ('alunos.Aluno', ('nome', 'nome_social'), ('codigo',)),
+    'funcionario': (
+        'funcionarios.Funcionario',
+        ('nome',),
+        ('codigo', 'documentacao__cpf', 'dados_funcionais__matricula'),
+    ),
+    'motorista': ('transporte.Motorista', ('nome',), ('cpf', 'cnh_numero')),
+    'veiculo': ('transporte.Veiculo', ('marca', 'modelo'), ('placa',)),
+    'aluno_transporte': ('transporte.AlunoTransporte', ('aluno__nome', 'responsavel_nome'), ()),
+    'itinerario': ('escola.ItinerarioFormativo', ('nome', 'habilidades'), ()),
+}
+
+CRIAR_FTS = [
+    f"""
+    CREATE VIRTUAL TABLE {TABELA_FTS} USING fts5(
+        texto,
+        content='busca_documentobusca',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER busca_fts_ai AFTER INSERT ON busca_documentobusca BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, texto) VALUES (new.id, new.texto);
+    END
+    """,
+    f"""
+    CREATE TRIGGER busca_fts_ad AFTER DELETE ON busca_documentobusca BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, texto) VALUES ('delete', old.id, old.texto);
+    END
+    """,
+    f"""
+    CREATE TRIGGER busca_fts_au AFTER UPDATE ON busca_documentobusca BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, texto) VALUES ('delete', old.id, old.texto);
+        INSERT INTO {TABELA_FTS}(rowid, texto) VALUES (new.id, new.texto);
+    END
+    """,
+]
+
+REMOVER_FTS = [
+    'DROP TRIGGER IF EXISTS busca_fts_ai',
+    'DROP TRIGGER IF EXISTS busca_fts_ad',
+    'DROP TRIGGER IF EXISTS busca_fts_au',
+    f'DROP TABLE IF EXISTS {TABELA_FTS}',
+]
+
+
+def criar_fts(apps, schema_editor):
+    """Cria o índice FTS5 no SQLite; sem FTS5 a busca usa o fallback por texto normalizado"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('SAVEPOINT busca_fts')
+            for sql in CRIAR_FTS:
+                cursor.execute(sql)
+            cursor.execute('RELEASE SAVEPOINT busca_fts')
+    except OperationalError:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('ROLLBACK TO SAVEPOINT busca_fts')
+            cursor.execute('RELEASE SAVEPOINT busca_fts')
+
+
+def remover_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in REMOVER_FTS:
+            cursor.execute(sql)
+
+
+def normalizar(texto):
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return re.findall(r'[^\W_]+', sem_acentos.casefold())
+
+
+def popular_indice(apps, schema_editor):
+    """Indexa os registros existentes; os gatilhos criados acima alimentam a tabela FTS"""
+    DocumentoBusca = apps.get_model('busca', 'DocumentoBusca')
+    DocumentoBusca.objects.all().delete()
+    for tipo, (modelo, campos, identificadores) in INDICES.items():
+        todos = campos + identificadores
+        palavras = {}
+        linhas = apps.get_model(modelo)._default_manager.order_by().values_list('pk', *todos)
+        for pk, *valores in linhas.iterator(chunk_size=2000):
+            termos = palavras.setdefault(pk, [])
+            for campo, valor in zip(todos, valores):
+                if valor is None:
+                    continue
+                normalizado = normalizar(valor)
+                termos.extend(normalizado)
+                if campo in identificadores and len(normalizado) > 1:
+                    termos.append(''.join(normalizado))
+        DocumentoBusca.objects.bulk_create(
+            [
+                DocumentoBusca(tipo=tipo, objeto_id=pk, texto=' ' + ' '.join(dict.fromkeys(termos)))
+                for pk, termos in palavras.items()
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busca', '0001_initial'),
+        ('alunos', '0001_initial'),
+        ('funcionarios', '0007_alter_funcionario_sexo'),
+        ('transporte', '0001_initial'),
+        ('escola', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_fts, remover_fts),
+        migrations.RunPython(popular_indice, migrations.RunPython.noop),
+    ]
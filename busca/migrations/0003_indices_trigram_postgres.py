@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Índices GIN com pg_trgm para as buscas por LIKE/ILIKE no PostgreSQL: o
+# fallback da busca unificada (texto LIKE '% termo%') e as buscas por nome
+# que ainda usam icontains (UPPER(nome) LIKE UPPER(...)).
+INDICES_TRIGRAM = [
+    ('busca_documentobusca_texto_trgm', 'busca_documentobusca', 'texto gin_trgm_ops'),
+    ('alunos_aluno_nome_trgm', 'alunos_aluno', 'UPPER(nome) gin_trgm_ops'),
+    ('funcionarios_funcionario_nome_trgm', 'funcionarios_funcionario', 'UPPER(nome) gin_trgm_ops'),
+]
+
+
+def criar_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nome, tabela, expressao in INDICES_TRIGRAM:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {nome} ON {tabela} USING gin ({expressao})')
+
+
+def remover_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, _, _ in INDICES_TRIGRAM:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busca', '0002_indice_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices_trigram, remover_indices_trigram),
+    ]
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class DocumentoBusca(models.Model):
+    """
+    Texto pesquisável (normalizado, sem acentos e em minúsculas) de um
+    registro indexado pelo módulo de busca.
+
+    No SQLite a tabela é espelhada, por triggers, no índice FTS5
+    busca_fts; nos demais bancos a busca é feita diretamente nesta tabela.
+    """
+    tipo = models.CharField(max_length=30, verbose_name="Tipo de Registro")
+    objeto_id = models.BigIntegerField(verbose_name="Código do Registro")
+    texto = models.TextField(verbose_name="Texto Normalizado")
+
+    class Meta:
+        verbose_name = "Documento de Busca"
+        verbose_name_plural = "Documentos de Busca"
+        unique_together = ['tipo', 'objeto_id']
+
+    def __str__(self):
+        return f"{self.tipo} {self.objeto_id}"
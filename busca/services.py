@@ -0,0 +1,172 @@
+"""Busca unificada: índice de texto normalizado (FTS5 no SQLite) e API de pesquisa"""
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from django.apps import apps as django_apps
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+TABELA_FTS = 'busca_fts'
+
+
+@dataclass(frozen=True)
+class Indice:
+    """
+    Configuração de um tipo de registro pesquisável.
+
+    `campos` e `identificadores` aceitam lookups com __; os identificadores
+    (CPF, placa, matrícula...) também são indexados sem pontuação.
+    `dependencias` são pares (modelo, lookup a partir do modelo indexado)
+    cujas alterações exigem reindexar os registros relacionados.
+    """
+    modelo: str
+    campos: tuple
+    identificadores: tuple = ()
+    dependencias: tuple = ()
+
+
+INDICES = {
+    'aluno': Indice('alunos.Aluno', ('nome', 'nome_social'), ('codigo',)),
+    'funcionario': Indice(
+        'funcionarios.Funcionario',
+        ('nome',),
+        ('codigo', 'documentacao__cpf', 'dados_funcionais__matricula'),
+        (('funcionarios.DocumentacaoFuncionario', 'documentacao'), ('funcionarios.DadosFuncionais', 'dados_funcionais')),
+    ),
+    'motorista': Indice('transporte.Motorista', ('nome',), ('cpf', 'cnh_numero')),
+    'veiculo': Indice('transporte.Veiculo', ('marca', 'modelo'), ('placa',)),
+    'aluno_transporte': Indice(
+        'transporte.AlunoTransporte',
+        ('aluno__nome', 'responsavel_nome'),
+        dependencias=(('alunos.Aluno', 'aluno'),),
+    ),
+    'itinerario': Indice('escola.ItinerarioFormativo', ('nome', 'habilidades')),
+}
+
+
+def normalizar(texto):
+    """Separa o texto em palavras sem acentos e em minúsculas"""
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return re.findall(r'[^\W_]+', sem_acentos.casefold())
+
+
+_fts_por_banco = {}
+
+
+def fts_disponivel():
+    """True quando o banco é SQLite e o índice FTS5 foi criado pela migração"""
+    if connection.vendor != 'sqlite':
+        return False
+    banco = connection.settings_dict['NAME']
+    if banco not in _fts_por_banco:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABELA_FTS])
+            _fts_por_banco[banco] = cursor.fetchone() is not None
+    return _fts_por_banco[banco]
+
+
+# Indexação -------------------------------------------------------------------
+
+def _textos(indice, queryset):
+    """Retorna {pk: texto normalizado} lendo apenas os campos indexados"""
+    campos = indice.campos + indice.identificadores
+    palavras = {}
+    for pk, *valores in queryset.order_by().values_list('pk', *campos).iterator(chunk_size=2000):
+        termos = palavras.setdefault(pk, [])
+        for campo, valor in zip(campos, valores):
+            if valor is None:
+                continue
+            normalizado = normalizar(valor)
+            termos.extend(normalizado)
+            if campo in indice.identificadores and len(normalizado) > 1:
+                termos.append(''.join(normalizado))
+    # Espaço inicial permite a busca por prefixo de palavra no fallback (texto__contains=' termo')
+    return {pk: ' ' + ' '.join(dict.fromkeys(termos)) for pk, termos in palavras.items()}
+
+
+def indexar(tipo, pks=None, apps=django_apps):
+    """
+    (Re)indexa os registros `pks` do tipo informado (todos, se None) com
+    um único upsert. Registros que não existem mais saem do índice.
+
+    Retorna a quantidade de registros indexados.
+    """
+    indice = INDICES[tipo]
+    modelo = apps.get_model(indice.modelo)
+    DocumentoBusca = apps.get_model('busca', 'DocumentoBusca')
+
+    queryset = modelo._default_manager.all()
+    if pks is not None:
+        pks = set(pks)
+        queryset = queryset.filter(pk__in=pks)
+    textos = _textos(indice, queryset)
+
+    with transaction.atomic():
+        documentos = DocumentoBusca.objects.filter(tipo=tipo)
+        if pks is not None:
+            documentos = documentos.filter(objeto_id__in=pks - set(textos))
+        documentos.delete()
+        DocumentoBusca.objects.bulk_create(
+            [DocumentoBusca(tipo=tipo, objeto_id=pk, texto=texto) for pk, texto in textos.items()],
+            update_conflicts=True,
+            unique_fields=['tipo', 'objeto_id'],
+            update_fields=['texto'],
+            batch_size=500,
+        )
+    return len(textos)
+
+
+def remover(tipo, pks):
+    """Remove registros do índice"""
+    from .models import DocumentoBusca
+    DocumentoBusca.objects.filter(tipo=tipo, objeto_id__in=pks).delete()
+
+
+def reconstruir_indice(apps=django_apps):
+    """Reindexa todos os tipos; retorna {tipo: quantidade}"""
+    return {tipo: indexar(tipo, apps=apps) for tipo in INDICES}
+
+
+# Pesquisa --------------------------------------------------------------------
+
+def documentos(tipo, termo):
+    """
+    DocumentoBusca do tipo que contêm todas as palavras do termo como
+    prefixo de alguma palavra indexada (FTS5 no SQLite; fallback por
+    texto normalizado nos demais bancos).
+    """
+    from .models import DocumentoBusca
+    resultado = DocumentoBusca.objects.filter(tipo=tipo)
+    termos = normalizar(termo)
+
+    if fts_disponivel():
+        consulta = ' '.join(f'"{palavra}"*' for palavra in termos)
+        return resultado.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', [consulta]
+        ))
+
+    for palavra in termos:
+        resultado = resultado.filter(texto__contains=' ' + palavra)
+    return resultado
+
+
+def buscar(queryset, tipo, termo):
+    """
+    Filtra `queryset` (do modelo do tipo) pelos registros que casam com o
+    termo. Termo vazio não filtra; termo sem palavras não encontra nada.
+    """
+    if not termo or not termo.strip():
+        return queryset
+    if not normalizar(termo):
+        return queryset.none()
+    return queryset.filter(pk__in=documentos(tipo, termo).values('objeto_id'))
+
+
+def sugerir(tipo, termo, limite=10):
+    """Primeiros registros do tipo que casam com o termo (typeahead)"""
+    if not normalizar(termo or ''):
+        return []
+    modelo = django_apps.get_model(INDICES[tipo].modelo)
+    return list(buscar(modelo._default_manager.all(), tipo, termo)[:limite])
@@ -0,0 +1,57 @@
+from django.apps import apps
+from django.db.models.signals import post_save, pre_delete, post_delete
+
+from .services import INDICES, indexar, remover
+
+
+def _tipos_indexados(modelo):
+    return [tipo for tipo, indice in INDICES.items() if indice.modelo == modelo._meta.label]
+
+
+def _dependentes(instance):
+    """Retorna {tipo: [pks]} dos registros indexados que dependem de `instance`"""
+    afetados = {}
+    for tipo, indice in INDICES.items():
+        for label, lookup in indice.dependencias:
+            if label == instance._meta.label:
+                indexado = apps.get_model(indice.modelo)
+                pks = indexado._default_manager.filter(**{lookup: instance.pk}).values_list('pk', flat=True)
+                afetados.setdefault(tipo, []).extend(pks)
+    return afetados
+
+
+def atualizar_indice(sender, instance, **kwargs):
+    """Reindexa o registro salvo e os registros indexados que dependem dele"""
+    for tipo in _tipos_indexados(sender):
+        indexar(tipo, [instance.pk])
+    for tipo, pks in _dependentes(instance).items():
+        if pks:
+            indexar(tipo, pks)
+
+
+def guardar_dependentes(sender, instance, **kwargs):
+    """Antes da exclusão, guarda os dependentes (depois o relacionamento não existe mais)"""
+    instance._busca_dependentes = _dependentes(instance)
+
+
+def remover_do_indice(sender, instance, **kwargs):
+    """Retira o registro excluído do índice e reindexa os dependentes"""
+    for tipo in _tipos_indexados(sender):
+        remover(tipo, [instance.pk])
+    for tipo, pks in getattr(instance, '_busca_dependentes', {}).items():
+        if pks:
+            indexar(tipo, pks)
+
+
+def conectar_sinais():
+    """Mantém o índice de busca sincronizado com os modelos indexados e suas dependências"""
+    labels = set()
+    for indice in INDICES.values():
+        labels.add(indice.modelo)
+        labels.update(label for label, _ in indice.dependencias)
+
+    for label in sorted(labels):
+        model = apps.get_model(label)
+        post_save.connect(atualizar_indice, sender=model, dispatch_uid=f'busca_save_{label}')
+        pre_delete.connect(guardar_dependentes, sender=model, dispatch_uid=f'busca_pre_delete_{label}')
+        post_delete.connect(remover_do_indice, sender=model, dispatch_uid=f'busca_delete_{label}')
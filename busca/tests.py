@@ -0,0 +1,92 @@
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+from datetime import date
+from alunos.models import Aluno
+from funcionarios.models import Funcionario, DocumentacaoFuncionario
+from busca.models import DocumentoBusca
+from busca.services import buscar, normalizar, indexar
+
+
+class BuscaUnificadaTest(TestCase):
+    """Testes para o índice e a API da busca unificada"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.joao = self.criar_aluno('João Conceição')
+        self.criar_aluno('Maria José')
+
+    def criar_aluno(self, nome):
+        return Aluno.objects.create(
+            nome=nome,
+            data_nascimento=date(2015, 1, 1),
+            sexo='M',
+            usuario_cadastro=self.user
+        )
+
+    def nomes(self, termo):
+        return list(buscar(Aluno.objects.all(), 'aluno', termo).values_list('nome', flat=True))
+
+    def test_busca_sem_acentos_e_por_prefixo(self):
+        """Teste 1: Verifica a busca sem acentos, por prefixo e com várias palavras"""
+        self.assertEqual(normalizar('João  CONCEIÇÃO-2'), ['joao', 'conceicao', '2'])
+        self.assertEqual(self.nomes('joao'), ['João Conceição'])
+        self.assertEqual(self.nomes('CONCEI'), ['João Conceição'])
+        self.assertEqual(self.nomes('jo'), ['João Conceição', 'Maria José'])
+        self.assertEqual(self.nomes('maria jo'), ['Maria José'])
+        self.assertEqual(self.nomes('aria'), [])
+        self.assertEqual(self.nomes('---'), [])
+        self.assertEqual(len(self.nomes('')), 2)
+
+    def test_fallback_sem_fts(self):
+        """Teste 2: Verifica que o fallback por texto normalizado retorna o mesmo resultado"""
+        with mock.patch('busca.services.fts_disponivel', return_value=False):
+            self.assertEqual(self.nomes('CONCEI'), ['João Conceição'])
+            self.assertEqual(self.nomes('jo'), ['João Conceição', 'Maria José'])
+            self.assertEqual(self.nomes('aria'), [])
+
+    def test_indice_sincronizado_por_sinais(self):
+        """Teste 3: Verifica que alterações, exclusões e dependências atualizam o índice"""
+        self.joao.nome = 'João Batista'
+        self.joao.save()
+        self.assertEqual(self.nomes('conceicao'), [])
+        self.assertEqual(self.nomes('batista'), ['João Batista'])
+
+        self.joao.delete()
+        self.assertEqual(self.nomes('joao'), [])
+        self.assertFalse(DocumentoBusca.objects.filter(tipo='aluno', objeto_id=self.joao.pk).exists())
+
+        funcionario = Funcionario.objects.create(
+            nome='Ana Lúcia', data_nascimento=date(1980, 1, 1), sexo='F', estado_civil='CASADO',
+            cor_raca='PARDA', naturalidade='Vitória', uf_nascimento='ES', nome_mae='Maria',
+            endereco='Rua A', numero='1', bairro='Centro', cidade='Vitória', uf='ES',
+            usuario_cadastro=self.user
+        )
+        DocumentacaoFuncionario.objects.create(
+            funcionario=funcionario, rg='123', rg_orgao_expedidor='SSP', rg_uf='ES', cpf='123.456.789-00'
+        )
+        funcionarios = Funcionario.objects.all()
+        self.assertEqual(list(buscar(funcionarios, 'funcionario', '12345678900')), [funcionario])
+        self.assertEqual(list(buscar(funcionarios, 'funcionario', '123.456')), [funcionario])
+
+        funcionario.documentacao.delete()
+        self.assertEqual(list(buscar(funcionarios, 'funcionario', '12345678900')), [])
+        self.assertEqual(indexar('funcionario'), 1)
+
+    def test_views_e_sugestoes(self):
+        """Teste 4: Verifica a listagem de alunos e o endpoint de sugestões"""
+        response = self.client.get(reverse('alunos:aluno_list'), {'busca': 'joao'})
+        self.assertEqual([aluno.nome for aluno in response.context['alunos']], ['João Conceição'])
+
+        response = self.client.get(reverse('alunos:aluno_list'), {'busca': str(self.joao.pk), 'tipo_busca': 'codigo'})
+        self.assertEqual([aluno.pk for aluno in response.context['alunos']], [self.joao.pk])
+
+        response = self.client.get(reverse('busca:sugestoes'), {'tipo': 'aluno', 'q': 'mar'})
+        self.assertEqual(response.json()['resultados'][0]['id'], Aluno.objects.get(nome='Maria José').pk)
+        self.assertEqual(self.client.get(reverse('busca:sugestoes'), {'tipo': 'x'}).status_code, 400)
@@ -0,0 +1,19 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+
+from .services import INDICES, sugerir
+
+
+@login_required
+def sugestoes(request):
+    """
+    Typeahead da busca unificada: ?tipo=<tipo>&q=<início das palavras>
+    """
+    tipo = request.GET.get('tipo', '')
+    if tipo not in INDICES:
+        return JsonResponse({'error': 'Tipo de busca inválido'}, status=400)
+
+    resultados = sugerir(tipo, request.GET.get('q', ''))
+    return JsonResponse({
+        'resultados': [{'id': registro.pk, 'texto': str(registro)} for registro in resultados]
+    })
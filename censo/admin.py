@@ -1,3 +1,7 @@
 from django.contrib import admin
+from .models import CensoSnapshot
 
-# Register your models here.
+@admin.register(CensoSnapshot)
+class CensoSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['ano', 'data_referencia', 'total_alunos', 'total_funcionarios', 'total_matriculas_ativas', 'data_geracao']
+    readonly_fields = ['data_geracao']
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from censo.services import gerar_snapshot, data_referencia_censo
+
+
+class Command(BaseCommand):
+    help = 'Materializa os agregados do censo escolar de um ano (CensoSnapshot)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ano', type=int, default=date.today().year, help='Ano do censo (padrão: ano atual)')
+        parser.add_argument(
+            '--data-referencia',
+            help='Data de referência no formato AAAA-MM-DD (padrão: última quarta-feira de maio do ano)'
+        )
+
+    def handle(self, *args, **options):
+        ano = options['ano']
+        try:
+            data_referencia = (
+                date.fromisoformat(options['data_referencia'])
+                if options['data_referencia'] else data_referencia_censo(ano)
+            )
+        except ValueError:
+            raise CommandError('Data de referência inválida, use AAAA-MM-DD.')
+
+        snapshot = gerar_snapshot(ano, data_referencia)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Snapshot do censo {ano} gerado (referência {data_referencia.strftime("%d/%m/%Y")}): '
+            f'{snapshot.total_alunos} alunos, {snapshot.total_funcionarios} funcionários, '
+            f'{snapshot.total_matriculas_ativas} matrículas ativas.'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CensoSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField(unique=True, verbose_name='Ano do Censo')),
+                ('data_referencia', models.DateField(verbose_name='Data de Referência')),
+                ('total_alunos', models.IntegerField(default=0, verbose_name='Total de Alunos')),
+                ('total_funcionarios', models.IntegerField(default=0, verbose_name='Total de Funcionários')),
+                ('total_matriculas_ativas', models.IntegerField(default=0, verbose_name='Total de Matrículas Ativas')),
+                ('estatisticas_alunos', models.JSONField(default=list, verbose_name='Alunos por Faixa Etária/Sexo/Arquivo')),
+                ('matriculas', models.JSONField(default=list, verbose_name='Matrículas por Tipo/Série/Turno/Status')),
+                ('data_geracao', models.DateTimeField(auto_now=True, verbose_name='Data de Geração')),
+            ],
+            options={
+                'verbose_name': 'Snapshot do Censo',
+                'verbose_name_plural': 'Snapshots do Censo',
+                'ordering': ['-ano'],
+            },
+        ),
+    ]
@@ -1,3 +1,28 @@
 from django.db import models
 
-# Create your models here.
+
+class CensoSnapshot(models.Model):
+    """
+    Agregados do censo escolar de um ano materializados na data de
+    referência (gerados pelo comando refresh_censo_snapshot).
+
+    As linhas agrupadas são guardadas como JSON no mesmo formato produzido
+    pelos serviços do censo, que as reutilizam sem consultar Aluno,
+    Matricula ou Funcionario.
+    """
+    ano = models.IntegerField(unique=True, verbose_name="Ano do Censo")
+    data_referencia = models.DateField(verbose_name="Data de Referência")
+    total_alunos = models.IntegerField(default=0, verbose_name="Total de Alunos")
+    total_funcionarios = models.IntegerField(default=0, verbose_name="Total de Funcionários")
+    total_matriculas_ativas = models.IntegerField(default=0, verbose_name="Total de Matrículas Ativas")
+    estatisticas_alunos = models.JSONField(default=list, verbose_name="Alunos por Faixa Etária/Sexo/Arquivo")
+    matriculas = models.JSONField(default=list, verbose_name="Matrículas por Tipo/Série/Turno/Status")
+    data_geracao = models.DateTimeField(auto_now=True, verbose_name="Data de Geração")
+
+    class Meta:
+        verbose_name = "Snapshot do Censo"
+        verbose_name_plural = "Snapshots do Censo"
+        ordering = ['-ano']
+
+    def __str__(self):
+        return f"Censo {self.ano} (referência {self.data_referencia.strftime('%d/%m/%Y')})"
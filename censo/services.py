@@ -0,0 +1,347 @@
+"""Serviços do Censo Escolar: estatísticas e exportação de dados"""
+import csv
+import json
+from datetime import date, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from alunos.models import Aluno, Matricula
+from funcionarios.models import Funcionario
+from .models import CensoSnapshot
+
+# (rótulo, idade mínima, idade máxima ou None para faixa aberta)
+FAIXAS_ETARIAS = [
+    ('0-5 anos', 0, 5),
+    ('6-10 anos', 6, 10),
+    ('11-14 anos', 11, 14),
+    ('15-17 anos', 15, 17),
+    ('18+ anos', 18, None),
+]
+
+
+def data_limite_idade(referencia, anos):
+    """
+    Data de nascimento mais recente de quem já tem `anos` completos na
+    data de referência (29/02 vira 28/02 em anos não bissextos).
+    """
+    try:
+        return referencia.replace(year=referencia.year - anos)
+    except ValueError:
+        return referencia.replace(year=referencia.year - anos, day=28)
+
+
+def faixa_etaria_expression(referencia, campo='data_nascimento'):
+    """
+    Expressão CASE que classifica `campo` nas FAIXAS_ETARIAS comparando a
+    data de nascimento com as datas-limite de cada idade, sem calcular a
+    idade linha a linha. Nascimentos posteriores à referência ficam None.
+    """
+    casos = [When(**{f'{campo}__gt': referencia}, then=Value(None))]
+    for rotulo, idade_minima, _ in reversed(FAIXAS_ETARIAS):
+        casos.append(When(
+            **{f'{campo}__lte': data_limite_idade(referencia, idade_minima)},
+            then=Value(rotulo)
+        ))
+    return Case(*casos, default=Value(None), output_field=CharField())
+
+
+class EstatisticasAlunos:
+    """
+    Estatísticas de alunos por faixa etária × sexo × tipo de arquivo.
+
+    Todos os números saem de uma única consulta agrupada (ou das linhas
+    guardadas em um CensoSnapshot); os totais por dimensão são somados em
+    memória sobre as poucas linhas do agrupamento.
+    """
+
+    def __init__(self, queryset=None, referencia=None, snapshot=None):
+        self.snapshot = snapshot
+        if snapshot is not None:
+            self.referencia = snapshot.data_referencia
+            self.linhas = snapshot.estatisticas_alunos
+            return
+
+        self.referencia = referencia or date.today()
+        queryset = Aluno.objects.all() if queryset is None else queryset
+
+        self.linhas = list(
+            queryset.annotate(
+                faixa=faixa_etaria_expression(self.referencia)
+            ).values('faixa', 'sexo', 'tipo_arquivo').annotate(
+                total=Count('pk')
+            ).order_by()
+        )
+
+    def _somar(self, chave, rotulos=()):
+        totais = dict.fromkeys(rotulos, 0)
+        for linha in self.linhas:
+            if linha[chave] is not None:
+                totais[linha[chave]] = totais.get(linha[chave], 0) + linha['total']
+        return totais
+
+    @property
+    def total(self):
+        """Total de alunos considerados (inclusive os fora das faixas)"""
+        return sum(linha['total'] for linha in self.linhas)
+
+    def por_sexo(self):
+        """Retorna {sexo: total} com todas as opções de Aluno.SEXO_CHOICES"""
+        return self._somar('sexo', [valor for valor, _ in Aluno.SEXO_CHOICES])
+
+    def por_tipo_arquivo(self):
+        """Retorna {tipo_arquivo: total} com todas as opções de Aluno.TIPO_ARQUIVO_CHOICES"""
+        return self._somar('tipo_arquivo', [valor for valor, _ in Aluno.TIPO_ARQUIVO_CHOICES])
+
+    def por_faixa(self):
+        """Retorna {faixa: total} na ordem de FAIXAS_ETARIAS"""
+        return self._somar('faixa', [rotulo for rotulo, _, _ in FAIXAS_ETARIAS])
+
+    def cruzamento(self):
+        """Retorna {faixa: {sexo: {tipo_arquivo: total}}} apenas com as combinações existentes"""
+        tabela = {}
+        for linha in self.linhas:
+            if linha['faixa'] is None:
+                continue
+            por_sexo = tabela.setdefault(linha['faixa'], {}).setdefault(linha['sexo'], {})
+            por_sexo[linha['tipo_arquivo']] = por_sexo.get(linha['tipo_arquivo'], 0) + linha['total']
+        return tabela
+
+
+def estatisticas_alunos(queryset=None, referencia=None):
+    """Calcula as estatísticas de alunos (por padrão, todos) na data de referência"""
+    return EstatisticasAlunos(queryset, referencia)
+
+
+class CensoMatriculas:
+    """
+    Matrículas de um ano administrativo agrupadas por tipo de ensino,
+    série e turno, com uma coluna por status (agregação condicional).
+
+    Os números vêm de uma única consulta agrupada (ou de um CensoSnapshot);
+    os totais por tipo e por status e a tabela dinâmica são montados sobre as linhas agrupadas.
+    """
+
+    STATUS = [valor for valor, _ in Matricula.STATUS_CHOICES]
+
+    def __init__(self, ano, snapshot=None):
+        self.ano = ano
+        self.snapshot = snapshot
+        if snapshot is not None:
+            self.linhas = snapshot.matriculas
+            return
+
+        colunas = {
+            status.lower(): Count('pk', filter=Q(status=status))
+            for status in self.STATUS
+        }
+        self.linhas = list(
+            Matricula.objects.filter(ano_administrativo=ano).values(
+                'tipo_ensino', 'serie_ano', 'turno_preferencial'
+            ).annotate(
+                total=Count('pk'), **colunas
+            ).order_by('tipo_ensino', 'serie_ano', 'turno_preferencial')
+        )
+
+    @property
+    def total(self):
+        """Total de matrículas do ano"""
+        return sum(linha['total'] for linha in self.linhas)
+
+    def por_status(self):
+        """Retorna {status: total} com todos os status de Matricula"""
+        return {
+            status: sum(linha[status.lower()] for linha in self.linhas)
+            for status in self.STATUS
+        }
+
+    def por_tipo_ensino(self):
+        """Retorna {tipo de ensino (rótulo): total}, na ordem das opções do modelo"""
+        totais = {}
+        for linha in self.linhas:
+            totais[linha['tipo_ensino']] = totais.get(linha['tipo_ensino'], 0) + linha['total']
+        return {
+            rotulo: totais[valor]
+            for valor, rotulo in Matricula.TIPO_ENSINO_CHOICES
+            if valor in totais
+        }
+
+    def pivot(self):
+        """
+        Tabela dinâmica serializável em JSON:
+        {ano, total, por_status, tipos: [{tipo_ensino, rotulo, total,
+        por_status, series: [{serie_ano, total, por_status, turnos}]}]}
+        """
+        rotulos = dict(Matricula.TIPO_ENSINO_CHOICES)
+        tipos = {}
+        for linha in self.linhas:
+            por_status = {status: linha[status.lower()] for status in self.STATUS}
+            tipo = tipos.setdefault(linha['tipo_ensino'], {
+                'tipo_ensino': linha['tipo_ensino'],
+                'rotulo': rotulos.get(linha['tipo_ensino'], linha['tipo_ensino']),
+                'total': 0,
+                'por_status': dict.fromkeys(self.STATUS, 0),
+                'series': {},
+            })
+            serie = tipo['series'].setdefault(linha['serie_ano'], {
+                'serie_ano': linha['serie_ano'],
+                'total': 0,
+                'por_status': dict.fromkeys(self.STATUS, 0),
+                'turnos': {},
+            })
+            serie['turnos'][linha['turno_preferencial']] = linha['total']
+            for grupo in (tipo, serie):
+                grupo['total'] += linha['total']
+                for status, quantidade in por_status.items():
+                    grupo['por_status'][status] += quantidade
+
+        for tipo in tipos.values():
+            tipo['series'] = list(tipo['series'].values())
+        return {
+            'ano': self.ano,
+            'total': self.total,
+            'por_status': self.por_status(),
+            'tipos': list(tipos.values()),
+        }
+
+
+def censo_matriculas(ano):
+    """Agrega as matrículas do ano administrativo informado"""
+    return CensoMatriculas(ano)
+
+
+# Snapshot anual ---------------------------------------------------------------
+
+def data_referencia_censo(ano):
+    """Data de referência do Censo Escolar: última quarta-feira de maio"""
+    ultimo_dia = date(ano, 5, 31)
+    return ultimo_dia - timedelta(days=(ultimo_dia.weekday() - 2) % 7)
+
+
+def matriculas_ativas_do_ano(ano):
+    """Total de matrículas ativas do ano administrativo"""
+    return Matricula.objects.filter(ano_administrativo=ano, status='ATIVA').count()
+
+
+def gerar_snapshot(ano, data_referencia=None):
+    """
+    Materializa (cria ou substitui) o CensoSnapshot do ano com todos os
+    agregados do censo calculados na data de referência.
+    """
+    data_referencia = data_referencia or data_referencia_censo(ano)
+    estatisticas = EstatisticasAlunos(referencia=data_referencia)
+    snapshot, _ = CensoSnapshot.objects.update_or_create(
+        ano=ano,
+        defaults={
+            'data_referencia': data_referencia,
+            'total_alunos': estatisticas.total,
+            'total_funcionarios': Funcionario.objects.count(),
+            'total_matriculas_ativas': matriculas_ativas_do_ano(ano),
+            'estatisticas_alunos': estatisticas.linhas,
+            'matriculas': CensoMatriculas(ano).linhas,
+        }
+    )
+    return snapshot
+
+
+def obter_snapshot(ano):
+    """Retorna o CensoSnapshot do ano ou None quando ainda não foi gerado"""
+    return CensoSnapshot.objects.filter(ano=ano).first()
+
+
+def estatisticas_alunos_do_ano(ano):
+    """Estatísticas de alunos do snapshot do ano ou, na falta dele, calculadas na hora"""
+    snapshot = obter_snapshot(ano)
+    if snapshot is None:
+        return estatisticas_alunos()
+    return EstatisticasAlunos(snapshot=snapshot)
+
+
+def censo_matriculas_do_ano(ano):
+    """Matrículas agregadas do snapshot do ano ou, na falta dele, calculadas na hora"""
+    snapshot = obter_snapshot(ano)
+    if snapshot is None:
+        return censo_matriculas(ano)
+    return CensoMatriculas(ano, snapshot=snapshot)
+
+
+# Exportação em streaming -----------------------------------------------------
+
+EXPORTACAO_CHUNK_SIZE = 2000
+EXPORTACAO_LIMITE_PAGINA = 500
+
+FORMATOS_EXPORTACAO = ('json', 'jsonl', 'csv', 'cursor')
+
+
+def consulta_exportacao(tipo, ano=None):
+    """
+    Retorna (queryset, campos) da exportação `tipo`, ordenada pela chave
+    primária, ou None quando o tipo não é reconhecido.
+    """
+    if tipo == 'matriculas':
+        queryset = Matricula.objects.order_by('pk')
+        if ano:
+            queryset = queryset.filter(ano_administrativo=ano)
+        campos = ['aluno__nome', 'ano_administrativo', 'tipo_ensino', 'serie_ano', 'status']
+    elif tipo == 'funcionarios':
+        queryset = Funcionario.objects.filter(documentacao__isnull=False).order_by('pk')
+        campos = ['nome', 'documentacao__cpf', 'data_nascimento', 'tipo_arquivo']
+    else:
+        return None
+    return queryset, campos
+
+
+def _linhas(queryset, campos, chunk_size):
+    return queryset.values(*campos).iterator(chunk_size=chunk_size)
+
+
+def _json(valor):
+    return json.dumps(valor, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def gerar_json(tipo, queryset, campos, chunk_size=EXPORTACAO_CHUNK_SIZE):
+    """Gera o documento {tipo, total, dados} em pedaços, sem montar a lista em memória"""
+    yield f'{{"tipo": {_json(tipo)}, "total": {queryset.count()}, "dados": ['
+    separador = ''
+    for linha in _linhas(queryset, campos, chunk_size):
+        yield separador + _json(linha)
+        separador = ', '
+    yield ']}'
+
+
+def gerar_jsonl(queryset, campos, chunk_size=EXPORTACAO_CHUNK_SIZE):
+    """Gera um objeto JSON por linha (JSON Lines)"""
+    for linha in _linhas(queryset, campos, chunk_size):
+        yield _json(linha) + '\n'
+
+
+class _Eco:
+    """Pseudo-arquivo para o csv.writer: devolve a linha em vez de gravá-la"""
+
+    def write(self, valor):
+        return valor
+
+
+def gerar_csv(queryset, campos, chunk_size=EXPORTACAO_CHUNK_SIZE):
+    """Gera o CSV com cabeçalho (nomes dos campos) linha a linha"""
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(campos)
+    for linha in _linhas(queryset, campos, chunk_size):
+        yield escritor.writerow([linha[campo] for campo in campos])
+
+
+def pagina_exportacao(tipo, queryset, campos, cursor=None, limite=EXPORTACAO_LIMITE_PAGINA):
+    """
+    Página da exportação por cursor (chave primária da última linha
+    recebida). O cliente repete a chamada com `proximo_cursor` até recebê-lo
+    como None; cada página custa uma consulta pelo índice da chave primária.
+    """
+    if cursor is not None:
+        queryset = queryset.filter(pk__gt=cursor)
+    linhas = list(queryset.values('pk', *campos)[:limite + 1])
+    proximo_cursor = linhas[limite - 1]['pk'] if len(linhas) > limite else None
+    dados = []
+    for linha in linhas[:limite]:
+        linha.pop('pk')
+        dados.append(linha)
+    return {'tipo': tipo, 'dados': dados, 'proximo_cursor': proximo_cursor}
@@ -0,0 +1,42 @@
+"""Tarefas em segundo plano do app (executadas por manage.py run_workers)"""
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from utilitarios.fila import registrar_tarefa
+
+from .services import EXPORTACAO_CHUNK_SIZE, consulta_exportacao, gerar_csv, gerar_json, gerar_jsonl
+
+
+@registrar_tarefa('censo.exportar')
+def exportar(tarefa, tipo, formato, ano=None):
+    """
+    Grava a exportação `tipo` no formato (json, jsonl ou csv) em
+    MEDIA_ROOT/exportacoes, lendo o banco em blocos como a exportação em
+    streaming; a tela baixa o arquivo por censo:baixar_exportacao.
+    """
+    queryset, campos = consulta_exportacao(tipo, ano=ano)
+    total = queryset.count()
+    if formato == 'csv':
+        partes = gerar_csv(queryset, campos)
+    elif formato == 'jsonl':
+        partes = gerar_jsonl(queryset, campos)
+    else:
+        partes = gerar_json(tipo, queryset, campos)
+
+    with tempfile.TemporaryFile() as arquivo:
+        for numero, parte in enumerate(partes, 1):
+            arquivo.write(parte.encode('utf-8'))
+            if numero % EXPORTACAO_CHUNK_SIZE == 0:
+                tarefa.reportar_progresso(numero * 100 // max(total, 1), f'{numero} de {total} linhas exportadas')
+        arquivo.seek(0)
+        nome = default_storage.save(f'exportacoes/censo_{tipo}_{tarefa.pk}.{formato}', File(arquivo))
+
+    return {
+        'arquivo': nome,
+        'tipo': tipo,
+        'formato': formato,
+        'linhas': total,
+        'mensagem': f'{total} linha(s) exportada(s).',
+    }
@@ -1,3 +1,305 @@
-from django.test import TestCase
+import json
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.urls import reverse
+from datetime import date
+from alunos.models import Aluno, Matricula
+from censo.models import CensoSnapshot
+from censo.services import (
+    estatisticas_alunos, data_limite_idade, censo_matriculas, censo_matriculas_do_ano, data_referencia_censo,
+    gerar_snapshot
+)
+from utilitarios.fila import executar, reivindicar
 
-# Create your tests here.
+
+class EstatisticasAlunosTest(TestCase):
+    """Testes para o serviço de estatísticas do censo"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.referencia = date(2025, 6, 15)
+
+    def criar_aluno(self, nome, nascimento, sexo='M', tipo_arquivo='CORRENTE'):
+        return Aluno.objects.create(
+            nome=nome,
+            data_nascimento=nascimento,
+            sexo=sexo,
+            tipo_arquivo=tipo_arquivo,
+            usuario_cadastro=self.user
+        )
+
+    def test_faixas_sexo_e_tipo_arquivo_em_uma_consulta(self):
+        """Teste 1: Verifica faixas etárias, sexo e tipo de arquivo com uma única consulta"""
+        self.criar_aluno('Ana', date(2020, 6, 15), 'F')          # 5 anos completos no dia
+        self.criar_aluno('Bruno', date(2019, 6, 16))              # 5 anos (faz 6 amanhã)
+        self.criar_aluno('Carla', date(2019, 6, 15), 'F')         # 6 anos
+        self.criar_aluno('Davi', date(2007, 6, 15), 'M', 'PERMANENTE')  # 18 anos
+        self.criar_aluno('Eva', date(2026, 1, 1), 'F')            # nascimento futuro
+
+        with self.assertNumQueries(1):
+            estatisticas = estatisticas_alunos(referencia=self.referencia)
+
+        self.assertEqual(estatisticas.total, 5)
+        self.assertEqual(estatisticas.por_sexo(), {'M': 2, 'F': 3})
+        self.assertEqual(estatisticas.por_tipo_arquivo(), {'CORRENTE': 4, 'PERMANENTE': 1})
+        self.assertEqual(estatisticas.por_faixa(), {
+            '0-5 anos': 2,
+            '6-10 anos': 1,
+            '11-14 anos': 0,
+            '15-17 anos': 0,
+            '18+ anos': 1,
+        })
+        self.assertEqual(estatisticas.cruzamento()['0-5 anos'], {
+            'F': {'CORRENTE': 1},
+            'M': {'CORRENTE': 1},
+        })
+
+    def test_data_limite_em_29_de_fevereiro(self):
+        """Teste 2: Verifica a data-limite quando a referência é 29/02"""
+        self.assertEqual(data_limite_idade(date(2024, 2, 29), 5), date(2019, 2, 28))
+        self.assertEqual(data_limite_idade(date(2024, 2, 29), 4), date(2020, 2, 29))
+
+
+class ExportacaoCensoTest(TestCase):
+    """Testes para a exportação do censo (em streaming e em arquivo pela fila)"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        for i in range(3):
+            aluno = Aluno.objects.create(
+                nome=f'Aluno {i}',
+                data_nascimento=date(2015, 1, 1),
+                sexo='M',
+                usuario_cadastro=self.user
+            )
+            Matricula.objects.create(
+                aluno=aluno,
+                ano_administrativo=2025,
+                tipo_ensino='FUNDAMENTAL_I',
+                serie_ano='5º Ano',
+                turno_preferencial='MATUTINO',
+                data_matricula=date(2025, 2, 1),
+                condicao_anterior='CONTINUIDADE',
+                usuario_cadastro=self.user
+            )
+        self.url = reverse('censo:exportar_dados', args=['matriculas'])
+
+    def conteudo(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_json_em_streaming(self):
+        """Teste 1: Verifica que o JSON padrão é gerado em streaming com o mesmo formato"""
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        dados = json.loads(self.conteudo(response))
+        self.assertEqual(dados['tipo'], 'matriculas')
+        self.assertEqual(dados['total'], 3)
+        self.assertEqual(dados['dados'][0], {
+            'aluno__nome': 'Aluno 0',
+            'ano_administrativo': 2025,
+            'tipo_ensino': 'FUNDAMENTAL_I',
+            'serie_ano': '5º Ano',
+            'status': 'ATIVA',
+        })
+
+    def test_jsonl_e_csv(self):
+        """Teste 2: Verifica os formatos JSON Lines e CSV"""
+        linhas = self.conteudo(self.client.get(self.url, {'formato': 'jsonl'})).splitlines()
+        self.assertEqual(len(linhas), 3)
+        self.assertEqual(json.loads(linhas[2])['aluno__nome'], 'Aluno 2')
+
+        response = self.client.get(self.url, {'formato': 'csv', 'ano': 2024})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(
+            self.conteudo(response).splitlines(),
+            ['aluno__nome,ano_administrativo,tipo_ensino,serie_ano,status']
+        )
+
+    def test_paginacao_por_cursor(self):
+        """Teste 3: Verifica que as páginas por cursor percorrem todas as linhas"""
+        nomes = []
+        cursor = ''
+        while True:
+            pagina = self.client.get(self.url, {'formato': 'cursor', 'limite': 2, 'cursor': cursor}).json()
+            nomes += [linha['aluno__nome'] for linha in pagina['dados']]
+            if pagina['proximo_cursor'] is None:
+                break
+            cursor = pagina['proximo_cursor']
+        self.assertEqual(nomes, ['Aluno 0', 'Aluno 1', 'Aluno 2'])
+
+
+    def test_exportacao_em_arquivo_pela_fila(self):
+        """Teste 4: Verifica que a tela enfileira a exportação e baixa o arquivo gravado pela tarefa"""
+        url = reverse('censo:solicitar_exportacao', args=['matriculas'])
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            andamento = self.client.get(url, {'formato': 'csv'})
+            self.assertTemplateUsed(andamento, 'utilitarios/tarefa_andamento.html')
+            # A mesma exportação ainda na fila não gera outra tarefa
+            self.assertEqual(self.client.get(url, {'formato': 'csv'}).context['tarefa'], andamento.context['tarefa'])
+
+            tarefa = executar(reivindicar('teste'))
+            self.assertEqual(tarefa.resultado['linhas'], 3)
+            download = self.client.get(reverse('censo:baixar_exportacao', args=[tarefa.pk]))
+            self.assertEqual(download['Content-Disposition'], 'attachment; filename="censo_matriculas.csv"')
+            linhas = b''.join(download.streaming_content).decode('utf-8').splitlines()
+            download.close()
+        self.assertEqual(len(linhas), 4)
+        self.assertEqual(linhas[1], 'Aluno 0,2025,FUNDAMENTAL_I,5º Ano,ATIVA')
+        self.assertRedirects(
+            self.client.get(reverse('censo:solicitar_exportacao', args=['completo'])),
+            reverse('censo:relatorios')
+        )
+
+class CensoMatriculasTest(TestCase):
+    """Testes para a agregação de matrículas do censo escolar"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        dados = [
+            ('FUNDAMENTAL_I', '5º Ano', 'MATUTINO', 'ATIVA'),
+            ('FUNDAMENTAL_I', '5º Ano', 'MATUTINO', 'ENCERRADA'),
+            ('FUNDAMENTAL_I', '5º Ano', 'VESPERTINO', 'ATIVA'),
+            ('MEDIO', '1º Ano', 'NOTURNO', 'CANCELADA'),
+        ]
+        for i, (tipo_ensino, serie_ano, turno, status) in enumerate(dados):
+            aluno = Aluno.objects.create(
+                nome=f'Aluno {i}',
+                data_nascimento=date(2012, 1, 1),
+                sexo='F',
+                usuario_cadastro=self.user
+            )
+            Matricula.objects.create(
+                aluno=aluno,
+                ano_administrativo=2025,
+                tipo_ensino=tipo_ensino,
+                serie_ano=serie_ano,
+                turno_preferencial=turno,
+                status=status,
+                data_matricula=date(2025, 2, 1),
+                condicao_anterior='CONTINUIDADE',
+                usuario_cadastro=self.user
+            )
+
+    def test_agregacao_em_uma_consulta(self):
+        """Teste 1: Verifica totais por status, por tipo e a tabela dinâmica com uma consulta"""
+        with self.assertNumQueries(1):
+            censo = censo_matriculas(2025)
+
+        self.assertEqual(censo.total, 4)
+        self.assertEqual(censo.por_status(), {'ATIVA': 2, 'ENCERRADA': 1, 'CANCELADA': 1})
+        self.assertEqual(censo.por_tipo_ensino(), {'Ensino Fundamental I': 3, 'Ensino Médio': 1})
+
+        fundamental = censo.pivot()['tipos'][0]
+        self.assertEqual(fundamental['tipo_ensino'], 'FUNDAMENTAL_I')
+        self.assertEqual(fundamental['por_status'], {'ATIVA': 2, 'ENCERRADA': 1, 'CANCELADA': 0})
+        self.assertEqual(fundamental['series'][0]['turnos'], {'MATUTINO': 2, 'VESPERTINO': 1})
+        self.assertEqual(censo_matriculas(2024).total, 0)
+
+    def test_pagina_e_exportacao_do_resumo(self):
+        """Teste 2: Verifica a página do censo do ano e a exportação JSON do resumo"""
+        response = self.client.get(reverse('censo:censo_escolar_ano', args=[2025]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_matriculas'], 4)
+        self.assertEqual(response.context['matriculas_ativas'], 2)
+
+        resumo = self.client.get(reverse('censo:exportar_dados', args=['resumo']), {'ano': 2025}).json()
+        self.assertEqual(resumo['total'], 4)
+        self.assertEqual(len(resumo['tipos']), 2)
+
+
+class CensoSnapshotTest(TestCase):
+    """Testes para o snapshot anual do censo"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+        self.criar_matricula('Ana')
+
+    def criar_matricula(self, nome):
+        aluno = Aluno.objects.create(
+            nome=nome,
+            data_nascimento=date(2015, 3, 10),
+            sexo='F',
+            usuario_cadastro=self.user
+        )
+        Matricula.objects.create(
+            aluno=aluno,
+            ano_administrativo=2025,
+            tipo_ensino='FUNDAMENTAL_I',
+            serie_ano='4º Ano',
+            turno_preferencial='MATUTINO',
+            data_matricula=date(2025, 2, 1),
+            condicao_anterior='CONTINUIDADE',
+            usuario_cadastro=self.user
+        )
+
+    def test_data_referencia(self):
+        """Teste 1: Verifica a data de referência padrão (última quarta-feira de maio)"""
+        self.assertEqual(data_referencia_censo(2025), date(2025, 5, 28))
+        self.assertEqual(data_referencia_censo(2024), date(2024, 5, 29))
+
+    def test_views_leem_o_snapshot(self):
+        """Teste 2: Verifica que as views usam o snapshot gerado pelo comando e recorrem ao cálculo ao vivo sem ele"""
+        call_command('refresh_censo_snapshot', '--ano', '2025', stdout=StringIO())
+        snapshot = CensoSnapshot.objects.get(ano=2025)
+        self.assertEqual(snapshot.data_referencia, date(2025, 5, 28))
+        self.assertEqual(snapshot.total_alunos, 1)
+        self.assertEqual(snapshot.total_matriculas_ativas, 1)
+        # Matrículas ativas contadas só no ano do snapshot
+        self.assertEqual(gerar_snapshot(2024).total_matriculas_ativas, 0)
+        CensoSnapshot.objects.filter(ano=2024).delete()
+
+        # Alterações após a data de referência não mudam o snapshot
+        self.criar_matricula('Bia')
+        with self.assertNumQueries(1):
+            censo = censo_matriculas_do_ano(2025)
+        self.assertEqual(censo.total, 1)
+        self.assertEqual(censo.por_status()['ATIVA'], 1)
+        self.assertEqual(censo_matriculas(2025).total, 2)
+
+        response = self.client.get(reverse('censo:censo_escolar_ano', args=[2025]))
+        self.assertEqual(response.context['total_matriculas'], 1)
+        response = self.client.get(reverse('censo:relatorio_estatisticas'), {'ano': 2025})
+        self.assertEqual(response.context['faixas_etarias']['6-10 anos'], 1)
+
+        # Sem snapshot, o cálculo é feito na hora
+        response = self.client.get(reverse('censo:censo_escolar_ano', args=[2024]))
+        self.assertIsNone(response.context['snapshot'])
+        snapshot.delete()
+        response = self.client.get(reverse('censo:censo_escolar_ano', args=[2025]))
+        self.assertEqual(response.context['total_matriculas'], 2)
+
+    def test_inicio_conta_matriculas_do_ano_com_e_sem_snapshot(self):
+        """Teste 3: Verifica que o card de matrículas ativas conta só o ano atual, com ou sem snapshot"""
+        ano_atual = date.today().year
+        Matricula.objects.update(ano_administrativo=ano_atual - 1)
+        self.assertEqual(self.client.get(reverse('censo:censo_home')).context['total_matriculas'], 0)
+
+        self.criar_matricula('Bia')
+        Matricula.objects.filter(aluno__nome='Bia').update(ano_administrativo=ano_atual)
+        self.assertEqual(self.client.get(reverse('censo:censo_home')).context['total_matriculas'], 1)
+        gerar_snapshot(ano_atual)
+        response = self.client.get(reverse('censo:censo_home'))
+        self.assertIsNotNone(response.context['snapshot'])
+        self.assertEqual(response.context['total_matriculas'], 1)
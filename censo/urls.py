@@ -19,4 +19,6 @@ urlpatterns = [
     
     # Exportação
     path('exportar/<str:tipo>/', views.exportar_dados, name='exportar_dados'),
+    path('exportar/<str:tipo>/arquivo/', views.solicitar_exportacao, name='solicitar_exportacao'),
+    path('exportacoes/<int:tarefa_id>/', views.baixar_exportacao, name='baixar_exportacao'),
 ]
\ No newline at end of file
@@ -1,26 +1,51 @@
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.contrib import messages
+from django.core.files.storage import default_storage
+from django.http import JsonResponse, StreamingHttpResponse, FileResponse
+from django.urls import reverse
 from datetime import datetime
 from alunos.models import Aluno, Matricula
 from funcionarios.models import Funcionario
+from .services import (
+    estatisticas_alunos_do_ano, censo_matriculas_do_ano, matriculas_ativas_do_ano, obter_snapshot, consulta_exportacao, gerar_json, gerar_jsonl, gerar_csv,
+    pagina_exportacao, FORMATOS_EXPORTACAO, EXPORTACAO_LIMITE_PAGINA
+)
+from utilitarios.fila import enfileirar
+from utilitarios.models import Tarefa
+
+# Formatos que a exportação em segundo plano grava em arquivo
+TIPOS_CONTEUDO = {
+    'json': 'application/json',
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
 
 @login_required
 def censo_home(request):
     """
     Página inicial do módulo Censo
     """
-    # Estatísticas básicas
-    total_alunos = Aluno.objects.count()
-    total_funcionarios = Funcionario.objects.count()
-    total_matriculas = Matricula.objects.filter(status='ATIVA').count()
+    ano_atual = datetime.now().year
+    snapshot = obter_snapshot(ano_atual)
+    
+    # Estatísticas básicas (do snapshot do censo, quando já gerado)
+    if snapshot:
+        total_alunos = snapshot.total_alunos
+        total_funcionarios = snapshot.total_funcionarios
+        total_matriculas = snapshot.total_matriculas_ativas
+    else:
+        total_alunos = Aluno.objects.count()
+        total_funcionarios = Funcionario.objects.count()
+        total_matriculas = matriculas_ativas_do_ano(ano_atual)
     
     context = {
         'title': 'Censo Escolar',
         'total_alunos': total_alunos,
         'total_funcionarios': total_funcionarios,
         'total_matriculas': total_matriculas,
-        'ano_atual': datetime.now().year,
+        'ano_atual': ano_atual,
+        'snapshot': snapshot,
     }
     return render(request, 'censo/censo_home.html', context)
 
@@ -37,24 +62,19 @@ def censo_escolar_ano(request, ano):
     """
     Dados do censo escolar por ano
     """
-    # Dados de matrículas por ano
-    matriculas = Matricula.objects.filter(ano_administrativo=ano)
-    
-    # Estatísticas por tipo de ensino
-    matriculas_por_tipo = {}
-    for matricula in matriculas:
-        tipo = matricula.get_tipo_ensino_display()
-        if tipo not in matriculas_por_tipo:
-            matriculas_por_tipo[tipo] = 0
-        matriculas_por_tipo[tipo] += 1
+    censo = censo_matriculas_do_ano(ano)
+    por_status = censo.por_status()
     
     context = {
         'title': f'Censo Escolar {ano}',
         'ano': ano,
-        'total_matriculas': matriculas.count(),
-        'matriculas_por_tipo': matriculas_por_tipo,
-        'matriculas_ativas': matriculas.filter(status='ATIVA').count(),
-        'matriculas_encerradas': matriculas.filter(status='ENCERRADA').count(),
+        'anos_disponiveis': range(2020, max(ano, datetime.now().year) + 1),
+        'total_matriculas': censo.total,
+        'matriculas_por_tipo': censo.por_tipo_ensino(),
+        'matriculas_ativas': por_status['ATIVA'],
+        'matriculas_encerradas': por_status['ENCERRADA'],
+        'censo_pivot': censo.pivot(),
+        'snapshot': censo.snapshot,
     }
     return render(request, 'censo/censo_escolar.html', context)
 
@@ -73,13 +93,20 @@ def relatorio_matriculas(request):
     """
     Relatório de matrículas
     """
-    ano = request.GET.get('ano', datetime.now().year)
+    ano = request.GET.get('ano', str(datetime.now().year))
     
-    matriculas = Matricula.objects.filter(ano_administrativo=ano)
+    # "Todos os anos" envia o parâmetro vazio
+    matriculas = Matricula.objects.select_related('aluno')
+    if ano.isdigit():
+        ano = int(ano)
+        matriculas = matriculas.filter(ano_administrativo=ano)
+    else:
+        ano = None
     
     context = {
-        'title': f'Relatório de Matrículas {ano}',
+        'title': f'Relatório de Matrículas {ano}' if ano else 'Relatório de Matrículas',
         'ano': ano,
+        'anos_disponiveis': range(2020, max(ano or 0, datetime.now().year) + 1),
         'matriculas': matriculas,
     }
     return render(request, 'censo/relatorio_matriculas.html', context)
@@ -102,36 +129,18 @@ def relatorio_estatisticas(request):
     """
     Relatório de estatísticas gerais
     """
-    # Estatísticas por sexo
-    alunos_masculino = Aluno.objects.filter(sexo='M').count()
-    alunos_feminino = Aluno.objects.filter(sexo='F').count()
-    
-    # Estatísticas de idade (faixas)
-    from datetime import date
-    hoje = date.today()
-    
-    idades = []
-    for aluno in Aluno.objects.all():
-        idade = hoje.year - aluno.data_nascimento.year
-        if (hoje.month, hoje.day) < (aluno.data_nascimento.month, aluno.data_nascimento.day):
-            idade -= 1
-        idades.append(idade)
-    
-    # Faixas etárias
-    faixas_etarias = {
-        '0-5 anos': len([i for i in idades if 0 <= i <= 5]),
-        '6-10 anos': len([i for i in idades if 6 <= i <= 10]),
-        '11-14 anos': len([i for i in idades if 11 <= i <= 14]),
-        '15-17 anos': len([i for i in idades if 15 <= i <= 17]),
-        '18+ anos': len([i for i in idades if i >= 18]),
-    }
+    ano = request.GET.get('ano', '')
+    estatisticas = estatisticas_alunos_do_ano(int(ano) if ano.isdigit() else datetime.now().year)
+    por_sexo = estatisticas.por_sexo()
     
     context = {
         'title': 'Estatísticas Gerais',
-        'alunos_masculino': alunos_masculino,
-        'alunos_feminino': alunos_feminino,
-        'faixas_etarias': faixas_etarias,
-        'total_alunos': len(idades),
+        'alunos_masculino': por_sexo['M'],
+        'alunos_feminino': por_sexo['F'],
+        'faixas_etarias': estatisticas.por_faixa(),
+        'alunos_por_tipo_arquivo': estatisticas.por_tipo_arquivo(),
+        'cruzamento_faixas': estatisticas.cruzamento(),
+        'total_alunos': estatisticas.total,
     }
     return render(request, 'censo/relatorio_estatisticas.html', context)
 
@@ -139,27 +148,93 @@ def relatorio_estatisticas(request):
 def exportar_dados(request, tipo):
     """
     Exportar dados em diferentes formatos
-    """
-    if tipo == 'matriculas':
-        data = list(Matricula.objects.values(
-            'aluno__nome',
-            'ano_administrativo',
-            'tipo_ensino',
-            'serie_ano',
-            'status'
-        ))
-    elif tipo == 'funcionarios':
-        data = list(Funcionario.objects.select_related('documentacao').values(
-            'nome',
-            'documentacao__cpf',
-            'data_nascimento',
-            'tipo_arquivo'
-        ).filter(documentacao__isnull=False))
+    
+    O tipo 'resumo' devolve a tabela dinâmica de matrículas do ano (?ano=).
+    ?formato=json (padrão), jsonl ou csv geram a resposta em streaming, lendo
+    o banco em blocos; ?formato=cursor devolve uma página por vez
+    (parâmetros cursor e limite).
+    """
+    formato = request.GET.get('formato', 'json')
+    ano = request.GET.get('ano', '')
+    if tipo == 'resumo':
+        return JsonResponse({
+            'tipo': tipo,
+            **censo_matriculas_do_ano(int(ano) if ano.isdigit() else datetime.now().year).pivot()
+        })
+    consulta = consulta_exportacao(tipo, ano=int(ano) if ano.isdigit() else None)
+    if consulta is None:
+        return JsonResponse({
+            'tipo': tipo,
+            'total': 0,
+            'dados': {'erro': 'Tipo de exportação não reconhecido'}
+        })
+    if formato not in FORMATOS_EXPORTACAO:
+        return JsonResponse({'erro': 'Formato de exportação não reconhecido'}, status=400)
+    
+    queryset, campos = consulta
+    
+    if formato == 'cursor':
+        try:
+            cursor = int(request.GET['cursor']) if request.GET.get('cursor') else None
+            limite = min(int(request.GET.get('limite', EXPORTACAO_LIMITE_PAGINA)), EXPORTACAO_LIMITE_PAGINA)
+        except ValueError:
+            return JsonResponse({'erro': 'Parâmetros de paginação inválidos'}, status=400)
+        return JsonResponse(pagina_exportacao(tipo, queryset, campos, cursor, max(limite, 1)))
+    
+    if formato == 'csv':
+        response = StreamingHttpResponse(gerar_csv(queryset, campos), content_type='text/csv; charset=utf-8')
+    elif formato == 'jsonl':
+        response = StreamingHttpResponse(gerar_jsonl(queryset, campos), content_type='application/x-ndjson')
     else:
-        data = {'erro': 'Tipo de exportação não reconhecido'}
+        return StreamingHttpResponse(gerar_json(tipo, queryset, campos), content_type='application/json')
     
-    return JsonResponse({
-        'tipo': tipo,
-        'total': len(data) if isinstance(data, list) else 0,
-        'dados': data
+    response['Content-Disposition'] = f'attachment; filename="censo_{tipo}.{formato}"'
+    return response
+
+
+@login_required
+def solicitar_exportacao(request, tipo):
+    """
+    Exportação para baixar pela tela: grava o arquivo na fila (censo/tarefas.py)
+    e acompanha a tarefa, que ao terminar leva ao download. Os mesmos
+    parâmetros de exportar_dados (?formato=json, jsonl ou csv e ?ano=); a
+    mesma exportação ainda em andamento não gera outra tarefa.
+    """
+    formato = request.GET.get('formato', 'json')
+    ano = request.GET.get('ano', '')
+    ano = int(ano) if ano.isdigit() else None
+    if consulta_exportacao(tipo) is None or formato not in TIPOS_CONTEUDO:
+        messages.error(request, 'Tipo ou formato de exportação não reconhecido.')
+        return redirect('censo:relatorios')
+
+    tarefa = Tarefa.objects.filter(
+        nome='censo.exportar', usuario=request.user, status__in=['PENDENTE', 'EXECUTANDO'],
+        argumentos__tipo=tipo, argumentos__formato=formato, argumentos__ano=ano
+    ).first()
+    if tarefa is None:
+        tarefa = enfileirar('censo.exportar', usuario=request.user, tipo=tipo, formato=formato, ano=ano)
+    if tarefa.status == 'CONCLUIDA':
+        return redirect('censo:baixar_exportacao', tarefa_id=tarefa.pk)
+
+    return render(request, 'utilitarios/tarefa_andamento.html', {
+        'titulo': f'Exportação - {tipo}',
+        'tarefa': tarefa,
+        'destino': reverse('censo:baixar_exportacao', args=[tarefa.pk]),
+        'voltar': reverse('censo:relatorios'),
     })
+
+
+@login_required
+def baixar_exportacao(request, tarefa_id):
+    """Download do arquivo de uma exportação concluída (só de quem a pediu)"""
+    tarefa = get_object_or_404(
+        Tarefa, pk=tarefa_id, nome='censo.exportar', status='CONCLUIDA', usuario=request.user
+    )
+    resultado = tarefa.resultado
+    return FileResponse(
+        default_storage.open(resultado['arquivo'], 'rb'),
+        as_attachment=True,
+        filename=f'censo_{resultado["tipo"]}.{resultado["formato"]}',
+        content_type=TIPOS_CONTEUDO[resultado['formato']],
+    )
+
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_atividaderecente'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='atividaderecente',
+            index=models.Index(fields=['-data_atividade'], name='atividade_recente_data_idx'),
+        ),
+    ]
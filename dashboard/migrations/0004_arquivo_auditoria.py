@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_indices_consultas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AtividadeRecenteArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('acao', models.CharField(choices=[('CRIAR', 'Criou'), ('EDITAR', 'Editou'), ('DELETAR', 'Deletou'), ('VISUALIZAR', 'Visualizou')], max_length=20, verbose_name='Ação')),
+                ('modulo', models.CharField(choices=[('ALUNOS', 'Alunos'), ('FUNCIONARIOS', 'Funcionários'), ('OPCOES', 'Opções'), ('AEE', 'AEE/AC'), ('AVALIACAO', 'Avaliação'), ('UTILITARIOS', 'Utilitários'), ('DASHBOARD', 'Dashboard')], max_length=20, verbose_name='Módulo')),
+                ('objeto_nome', models.CharField(max_length=255, verbose_name='Nome do Objeto')),
+                ('objeto_id', models.IntegerField(blank=True, null=True, verbose_name='ID do Objeto')),
+                ('descricao', models.TextField(blank=True, null=True, verbose_name='Descrição')),
+                ('data_atividade', models.DateTimeField(verbose_name='Data da Atividade')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Atividade Arquivada',
+                'verbose_name_plural': 'Atividades Arquivadas',
+                'ordering': ['-data_atividade'],
+                'indexes': [models.Index(fields=['-data_atividade', '-id'], name='atividade_arq_data_idx')],
+            },
+        ),
+    ]
@@ -61,6 +61,9 @@ class AtividadeRecente(models.Model):
         verbose_name = "Atividade Recente"
         verbose_name_plural = "Atividades Recentes"
         ordering = ['-data_atividade']
+        indexes = [
+            models.Index(fields=['-data_atividade'], name='atividade_recente_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.usuario.get_full_name() or self.usuario.username} {self.get_acao_display().lower()} {self.objeto_nome}"
@@ -93,12 +96,39 @@ class AtividadeRecente(models.Model):
     
     @classmethod
     def registrar_atividade(cls, usuario, acao, modulo, objeto_nome, objeto_id=None, descricao=None):
-        """Método helper para registrar uma nova atividade"""
-        return cls.objects.create(
+        """
+        Método helper para registrar uma nova atividade. No modo de auditoria
+        assíncrono (padrão) a gravação acontece em lote, fora da requisição.
+        """
+        from utilitarios.auditoria import registrar
+        return registrar(cls(
             usuario=usuario,
             acao=acao,
             modulo=modulo,
             objeto_nome=objeto_nome,
             objeto_id=objeto_id,
             descricao=descricao
-        )
+        ))
+
+
+class AtividadeRecenteArquivada(models.Model):
+    """Atividades mais antigas que o período de retenção, movidas pelo comando archive_audit"""
+    id = models.BigIntegerField(primary_key=True)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name="Usuário")
+    acao = models.CharField(max_length=20, choices=AtividadeRecente.TIPO_ACAO_CHOICES, verbose_name="Ação")
+    modulo = models.CharField(max_length=20, choices=AtividadeRecente.MODULO_CHOICES, verbose_name="Módulo")
+    objeto_nome = models.CharField(max_length=255, verbose_name="Nome do Objeto")
+    objeto_id = models.IntegerField(null=True, blank=True, verbose_name="ID do Objeto")
+    descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
+    data_atividade = models.DateTimeField(verbose_name="Data da Atividade")
+    
+    class Meta:
+        verbose_name = "Atividade Arquivada"
+        verbose_name_plural = "Atividades Arquivadas"
+        ordering = ['-data_atividade']
+        indexes = [
+            models.Index(fields=['-data_atividade', '-id'], name='atividade_arq_data_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.usuario.username} {self.get_acao_display().lower()} {self.objeto_nome}"
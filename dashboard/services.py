@@ -0,0 +1,51 @@
+"""Resumo do dashboard servido pelo cache do Django"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from alunos.models import Aluno
+from funcionarios.models import Funcionario
+from turma.models import Turma, Avaliacao
+
+CHAVE_RESUMO = 'dashboard:resumo'
+
+
+def calcular_resumo_dashboard():
+    """Calcula os contadores e o gráfico de alunos por turma diretamente no banco"""
+    turmas_com_alunos = Turma.objects.annotate(
+        total_alunos=Count('enturmacoes', filter=Q(enturmacoes__ativo=True))
+    ).filter(total_alunos__gt=0).order_by('nome').values_list('nome', 'total_alunos')
+
+    alunos_por_serie = [
+        {'serie': nome, 'quantidade': total}
+        for nome, total in turmas_com_alunos
+    ]
+
+    # Calcular percentuais para as barras (baseado no máximo)
+    total_max = max((item['quantidade'] for item in alunos_por_serie), default=0)
+    if total_max > 0:
+        for item in alunos_por_serie:
+            item['percentual'] = (item['quantidade'] / total_max) * 100
+
+    return {
+        'total_alunos': Aluno.objects.count(),
+        'total_funcionarios': Funcionario.objects.count(),
+        # Avaliações pendentes (não lançadas)
+        'avaliacoes_pendentes': Avaliacao.objects.filter(notas_lancadas=False).count(),
+        'alunos_por_serie': alunos_por_serie,
+        'total_turmas': len(alunos_por_serie),
+    }
+
+
+def obter_resumo_dashboard():
+    """Retorna o resumo do dashboard a partir do cache, recalculando quando ausente"""
+    return cache.get_or_set(
+        CHAVE_RESUMO,
+        calcular_resumo_dashboard,
+        getattr(settings, 'DASHBOARD_RESUMO_TIMEOUT', 300)
+    )
+
+
+def invalidar_resumo_dashboard(**kwargs):
+    """Descarta o resumo em cache (os sinais chamam após o commit, ver signals.py)"""
+    cache.delete(CHAVE_RESUMO)
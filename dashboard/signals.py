@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from alunos.models import Aluno
+from funcionarios.models import Funcionario
+from turma.models import Turma, Enturmacao, Avaliacao
+from .services import invalidar_resumo_dashboard
+
+MODELOS_RESUMO = [Aluno, Funcionario, Turma, Enturmacao, Avaliacao]
+
+
+def invalidar_apos_commit(**kwargs):
+    """
+    Invalida o resumo só depois do commit: invalidado antes, uma requisição
+    concorrente poderia recalculá-lo com os dados anteriores à alteração e
+    deixá-lo no cache até a próxima escrita.
+    """
+    transaction.on_commit(invalidar_resumo_dashboard)
+
+
+def conectar_sinais():
+    """Invalida o resumo do dashboard sempre que um model contabilizado muda"""
+    for model in MODELOS_RESUMO:
+        post_save.connect(invalidar_apos_commit, sender=model, dispatch_uid=f'dashboard_resumo_save_{model._meta.label}')
+        post_delete.connect(invalidar_apos_commit, sender=model, dispatch_uid=f'dashboard_resumo_delete_{model._meta.label}')
@@ -1,3 +1,62 @@
 from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from datetime import date
+from alunos.models import Aluno
+from turma.models import Turma, Enturmacao
+from dashboard.services import obter_resumo_dashboard
 
-# Create your tests here.
+
+class ResumoDashboardTest(TestCase):
+    """Testes para o resumo do dashboard em cache"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.turma = Turma.objects.create(
+            nome='5º Ano A',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_FUNDAMENTAL_I',
+            ano_serie='5_ANO',
+            turno='MATUTINO',
+            usuario_criacao=self.user
+        )
+
+    def criar_aluno(self, nome):
+        return Aluno.objects.create(
+            nome=nome,
+            data_nascimento=date(2015, 1, 1),
+            sexo='M',
+            usuario_cadastro=self.user
+        )
+
+    def test_resumo_servido_do_cache(self):
+        """Teste 1: Verifica que a segunda leitura não consulta o banco"""
+        self.criar_aluno('João')
+        self.assertEqual(obter_resumo_dashboard()['total_alunos'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(obter_resumo_dashboard()['total_alunos'], 1)
+
+    def test_resumo_invalidado_por_sinais(self):
+        """Teste 2: Verifica a invalidação por post_save/post_delete após o commit"""
+        self.assertEqual(obter_resumo_dashboard()['total_alunos'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            aluno = self.criar_aluno('Maria')
+            Enturmacao.objects.create(turma=self.turma, aluno=aluno, usuario_enturmacao=self.user)
+        resumo = obter_resumo_dashboard()
+        self.assertEqual(resumo['total_alunos'], 1)
+        self.assertEqual(resumo['alunos_por_serie'], [
+            {'serie': '5º Ano A', 'quantidade': 1, 'percentual': 100.0}
+        ])
+
+        # A invalidação só acontece no commit: antes dele o resumo continua em cache
+        with self.captureOnCommitCallbacks(execute=True):
+            aluno.delete()
+            self.assertEqual(obter_resumo_dashboard()['total_alunos'], 1)
+        self.assertEqual(obter_resumo_dashboard()['total_alunos'], 0)
@@ -1,29 +1,14 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
-from django.db import models
-from django.contrib.auth.models import User
 from .models import AtividadeRecente
-from alunos.models import Aluno
-from funcionarios.models import Funcionario
-from turma.models import Turma, Enturmacao, Avaliacao
+from .services import obter_resumo_dashboard
 import datetime
-import locale
 
 @login_required
 def home(request):
     """
     View principal do dashboard - mostra resumo geral do sistema
     """
-    # Configurar localização para português
-    try:
-        locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-    except:
-        try:
-            locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil.1252')
-        except:
-            pass  # Usar padrão se não conseguir configurar
-    
     # Data atual com dia da semana
     hoje = datetime.date.today()
     dias_semana = {
@@ -37,50 +22,24 @@ def home(request):
     }
     dia_semana = dias_semana[hoje.weekday()]
     
-    # Dados reais do banco de dados
-    total_alunos = Aluno.objects.count()
-    total_funcionarios = Funcionario.objects.count()
-    
-    # Avaliações pendentes (não lançadas)
-    avaliacoes_pendentes = Avaliacao.objects.filter(notas_lancadas=False).count()
+    # Contadores e gráfico servidos do cache (invalidado por sinais dos models)
+    resumo = obter_resumo_dashboard()
     
     # Buscar atividades recentes reais
     atividades_recentes = AtividadeRecente.objects.select_related('usuario')[:10]
     
-    # Dados reais de alunos por série/turma
-    turmas_com_alunos = Turma.objects.annotate(
-        total_alunos=Count('enturmacoes', filter=Q(enturmacoes__ativo=True))
-    ).filter(total_alunos__gt=0).order_by('nome')
-    
-    # Preparar dados para o gráfico
-    alunos_por_serie = []
-    total_max = 0
-    
-    for turma in turmas_com_alunos:
-        alunos_por_serie.append({
-            'serie': turma.nome,
-            'quantidade': turma.total_alunos
-        })
-        if turma.total_alunos > total_max:
-            total_max = turma.total_alunos
-    
-    # Calcular percentuais para as barras (baseado no máximo)
-    if total_max > 0:
-        for item in alunos_por_serie:
-            item['percentual'] = (item['quantidade'] / total_max) * 100
-    
     context = {
-        'total_alunos': total_alunos,
-        'total_funcionarios': total_funcionarios,
-        'avaliacoes_pendentes': avaliacoes_pendentes,
+        'total_alunos': resumo['total_alunos'],
+        'total_funcionarios': resumo['total_funcionarios'],
+        'avaliacoes_pendentes': resumo['avaliacoes_pendentes'],
         'transportes_ativos': 0,  # Será implementado quando o módulo transporte for criado
         'escola_nome': 'Sistema GUTO',
         'data_atual': hoje,
         'dia_semana': dia_semana,
         
         # Dados reais para gráficos
-        'alunos_por_serie': alunos_por_serie,
-        'total_turmas': turmas_com_alunos.count(),
+        'alunos_por_serie': resumo['alunos_por_serie'],
+        'total_turmas': resumo['total_turmas'],
         
         # Atividades recentes reais
         'atividades_recentes': atividades_recentes,
@@ -0,0 +1,144 @@
+"""Serviços do Diário Eletrônico"""
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from alunos.models import Aluno
+from turma.models import Avaliacao, DivisaoPeriodoLetivo, NotaAvaliacao, PendenciaAvaliacao
+
+
+@dataclass(frozen=True)
+class Pendencia:
+    """Avaliação sem nota lançada para um aluno em uma divisão do período"""
+    aluno_id: int
+    aluno_nome: str
+    divisao_id: int
+    divisao_nome: str
+    avaliacao_id: int
+    avaliacao_nome: str
+
+
+class ValidacaoFechamento:
+    """
+    Resultado da validação de fechamento de um diário (turma/disciplina).
+
+    Todas as pendências são calculadas com um número fixo de consultas,
+    independente da quantidade de alunos, divisões e avaliações.
+    """
+
+    def __init__(self, turma, disciplina):
+        self.turma = turma
+        self.disciplina = disciplina
+
+        divisoes = list(
+            DivisaoPeriodoLetivo.objects.filter(ativo=True).order_by('ordem').values_list('pk', 'nome')
+        )
+        avaliacoes = list(
+            Avaliacao.objects.filter(
+                turma=turma,
+                disciplina=disciplina,
+                divisao_periodo__in=[pk for pk, _ in divisoes]
+            ).order_by('data_aplicacao', 'pk').values_list('pk', 'nome', 'divisao_periodo_id')
+        )
+        alunos = list(
+            Aluno.objects.filter(
+                enturmacoes__turma=turma,
+                enturmacoes__ativo=True
+            ).order_by('nome').values_list('codigo', 'nome')
+        )
+        lancadas = set(
+            NotaAvaliacao.objects.filter(
+                avaliacao__in=[pk for pk, _, _ in avaliacoes],
+                aluno__in=[codigo for codigo, _ in alunos]
+            ).filter(
+                Q(nota__isnull=False) | Q(conceito__isnull=False) | Q(dispensado=True)
+            ).values_list('aluno_id', 'avaliacao_id')
+        )
+
+        avaliacoes_por_divisao = {}
+        for avaliacao_id, avaliacao_nome, divisao_id in avaliacoes:
+            avaliacoes_por_divisao.setdefault(divisao_id, []).append((avaliacao_id, avaliacao_nome))
+
+        self.divisoes_sem_avaliacao = [
+            (divisao_id, divisao_nome) for divisao_id, divisao_nome in divisoes
+            if divisao_id not in avaliacoes_por_divisao
+        ]
+        self.pendencias = [
+            Pendencia(aluno_id, aluno_nome, divisao_id, divisao_nome, avaliacao_id, avaliacao_nome)
+            for divisao_id, divisao_nome in divisoes
+            for aluno_id, aluno_nome in alunos
+            for avaliacao_id, avaliacao_nome in avaliacoes_por_divisao.get(divisao_id, [])
+            if (aluno_id, avaliacao_id) not in lancadas
+        ]
+
+    @property
+    def valido(self):
+        """True quando o diário pode ser fechado"""
+        return not self.divisoes_sem_avaliacao and not self.pendencias
+
+    def mensagens(self):
+        """Mensagens legíveis: uma por divisão sem avaliação e uma por aluno/divisão pendente"""
+        mensagens = [
+            f'Nenhuma avaliação cadastrada para {divisao_nome}'
+            for _, divisao_nome in self.divisoes_sem_avaliacao
+        ]
+        vistos = set()
+        for pendencia in self.pendencias:
+            chave = (pendencia.aluno_id, pendencia.divisao_id)
+            if chave not in vistos:
+                vistos.add(chave)
+                mensagens.append(f'Aluno {pendencia.aluno_nome} - notas pendentes em {pendencia.divisao_nome}')
+        return mensagens
+
+    def materializar(self, usuario=None):
+        """
+        Grava as pendências em PendenciaAvaliacao (uma por aluno/divisão) em lote
+        (reabrindo as que voltaram a ocorrer) e marca como resolvidas as
+        pendências abertas que deixaram de existir.
+
+        Retorna a quantidade de pendências em aberto e de resolvidas.
+        """
+        tipo = 'NOTA_NAO_INFORMADA'
+        atuais = {(p.aluno_id, p.divisao_id) for p in self.pendencias}
+
+        with transaction.atomic():
+            abertas = PendenciaAvaliacao.objects.filter(
+                turma=self.turma,
+                disciplina=self.disciplina,
+                tipo_pendencia=tipo,
+                resolvida=False
+            )
+            resolvidas_ids = [
+                pk for pk, aluno_id, divisao_id in abertas.values_list('pk', 'aluno_id', 'divisao_periodo_id')
+                if (aluno_id, divisao_id) not in atuais
+            ]
+            resolvidas = PendenciaAvaliacao.objects.filter(pk__in=resolvidas_ids).update(
+                resolvida=True,
+                data_resolucao=timezone.now(),
+                usuario_resolucao=usuario
+            )
+
+            PendenciaAvaliacao.objects.bulk_create(
+                [
+                    PendenciaAvaliacao(
+                        turma=self.turma,
+                        disciplina=self.disciplina,
+                        divisao_periodo_id=divisao_id,
+                        aluno_id=aluno_id,
+                        tipo_pendencia=tipo
+                    )
+                    for aluno_id, divisao_id in sorted(atuais)
+                ],
+                update_conflicts=True,
+                unique_fields=['turma', 'disciplina', 'divisao_periodo', 'aluno', 'tipo_pendencia'],
+                update_fields=['resolvida', 'data_resolucao', 'usuario_resolucao'],
+            )
+
+        return {'pendentes': len(atuais), 'resolvidas': resolvidas}
+
+
+def validar_fechamento(turma, disciplina):
+    """Calcula as pendências que impedem o fechamento do diário da turma/disciplina"""
+    return ValidacaoFechamento(turma, disciplina)
@@ -0,0 +1,36 @@
+"""Tarefas em segundo plano do app (executadas por manage.py run_workers)"""
+from django.utils import timezone
+
+from utilitarios.decorators import repetir_se_bloqueado
+from utilitarios.fila import registrar_tarefa
+
+from .models import DiarioEletronico
+from .services import validar_fechamento
+
+
+@registrar_tarefa('diario.fechar_diario')
+def fechar_diario(tarefa, diario_id):
+    """
+    Valida as pendências do diário e, sem nenhuma, fecha-o em nome de quem
+    pediu; com pendências o diário continua aberto e elas vão no resultado.
+    """
+    diario = DiarioEletronico.objects.select_related('turma', 'disciplina').get(pk=diario_id)
+    tarefa.reportar_progresso(10, 'Verificando pendências de avaliações e notas')
+    pendencias = validar_fechamento(diario.turma, diario.disciplina).mensagens()
+    if pendencias:
+        return {
+            'fechado': False,
+            'pendencias': pendencias,
+            'mensagem': f'Não é possível fechar o diário: {len(pendencias)} pendência(s) encontrada(s).',
+        }
+
+    # Só a gravação é repetida se o banco estiver bloqueado
+    diario.diario_fechado = True
+    diario.data_fechamento = timezone.now()
+    diario.usuario_fechamento = tarefa.usuario
+    repetir_se_bloqueado(diario.save)()
+    return {
+        'fechado': True,
+        'pendencias': [],
+        'mensagem': f'Diário de {diario.disciplina.nome} - {diario.turma.nome} fechado com sucesso!',
+    }
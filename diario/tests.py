@@ -1,3 +1,123 @@
 from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+from datetime import date
+from turma.models import (
+    Turma, Disciplina, Enturmacao, TipoAvaliacao, Avaliacao, NotaAvaliacao,
+    DivisaoPeriodoLetivo, PendenciaAvaliacao
+)
+from alunos.models import Aluno
+from diario.models import DiarioEletronico
+from diario.services import validar_fechamento
+from utilitarios.fila import executar, reivindicar
 
-# Create your tests here.
+
+class ValidacaoFechamentoTest(TestCase):
+    """Testes para a validação de fechamento do diário"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+
+        self.turma = Turma.objects.create(
+            nome='9º Ano A',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_FUNDAMENTAL_II',
+            ano_serie='9_ANO',
+            turno='MATUTINO',
+            usuario_criacao=self.user
+        )
+        self.disciplina = Disciplina.objects.create(nome='Química', carga_horaria=60)
+        self.bimestre1 = DivisaoPeriodoLetivo.objects.create(
+            nome='1º Bimestre', tipo_divisao='BIMESTRE', periodo_letivo='2025', ordem=1,
+            data_inicio=date(2025, 2, 1), data_fim=date(2025, 4, 30)
+        )
+        self.bimestre2 = DivisaoPeriodoLetivo.objects.create(
+            nome='2º Bimestre', tipo_divisao='BIMESTRE', periodo_letivo='2025', ordem=2,
+            data_inicio=date(2025, 5, 1), data_fim=date(2025, 7, 15)
+        )
+        tipo = TipoAvaliacao.objects.create(nome='Prova')
+        self.prova = Avaliacao.objects.create(
+            turma=self.turma, disciplina=self.disciplina, divisao_periodo=self.bimestre1,
+            tipo_avaliacao=tipo, professor=self.user, nome='Prova 1', data_aplicacao=date(2025, 3, 1)
+        )
+        self.trabalho = Avaliacao.objects.create(
+            turma=self.turma, disciplina=self.disciplina, divisao_periodo=self.bimestre1,
+            tipo_avaliacao=tipo, professor=self.user, nome='Trabalho', data_aplicacao=date(2025, 4, 1)
+        )
+
+        self.alunos = []
+        for nome in ('Ana', 'Bruno'):
+            aluno = Aluno.objects.create(
+                nome=nome, data_nascimento=date(2010, 1, 1), sexo='F', usuario_cadastro=self.user
+            )
+            Enturmacao.objects.create(turma=self.turma, aluno=aluno, usuario_enturmacao=self.user)
+            self.alunos.append(aluno)
+
+        for avaliacao in (self.prova, self.trabalho):
+            NotaAvaliacao.objects.create(
+                avaliacao=avaliacao, aluno=self.alunos[0], nota=7, usuario_lancamento=self.user
+            )
+        NotaAvaliacao.objects.create(
+            avaliacao=self.prova, aluno=self.alunos[1], dispensado=True, usuario_lancamento=self.user
+        )
+
+    def test_pendencias_estruturadas(self):
+        """Teste 1: Verifica as pendências calculadas em consultas agrupadas"""
+        with self.assertNumQueries(4):
+            validacao = validar_fechamento(self.turma, self.disciplina)
+
+        self.assertFalse(validacao.valido)
+        self.assertEqual(validacao.divisoes_sem_avaliacao, [(self.bimestre2.pk, '2º Bimestre')])
+        self.assertEqual(len(validacao.pendencias), 1)
+        pendencia = validacao.pendencias[0]
+        self.assertEqual(pendencia.aluno_id, self.alunos[1].pk)
+        self.assertEqual(pendencia.avaliacao_id, self.trabalho.pk)
+        self.assertEqual(validacao.mensagens(), [
+            'Nenhuma avaliação cadastrada para 2º Bimestre',
+            'Aluno Bruno - notas pendentes em 1º Bimestre',
+        ])
+
+    def test_materializar_pendencias(self):
+        """Teste 2: Verifica a gravação e resolução em lote de PendenciaAvaliacao"""
+        resultado = validar_fechamento(self.turma, self.disciplina).materializar()
+        self.assertEqual(resultado, {'pendentes': 1, 'resolvidas': 0})
+        self.assertEqual(PendenciaAvaliacao.objects.filter(resolvida=False).count(), 1)
+
+        NotaAvaliacao.objects.create(
+            avaliacao=self.trabalho, aluno=self.alunos[1], nota=5, usuario_lancamento=self.user
+        )
+        resultado = validar_fechamento(self.turma, self.disciplina).materializar(self.user)
+        self.assertEqual(resultado, {'pendentes': 0, 'resolvidas': 1})
+        self.assertFalse(PendenciaAvaliacao.objects.filter(resolvida=False).exists())
+
+    def test_fechamento_em_segundo_plano(self):
+        """Teste 3: Verifica que a view enfileira o fechamento e a tarefa só fecha o diário sem pendências"""
+        diario = DiarioEletronico.objects.create(turma=self.turma, disciplina=self.disciplina, periodo_letivo='2025')
+        self.client.force_login(self.user)
+        url = reverse('diario:fechar_diario', args=[self.turma.pk, self.disciplina.pk])
+
+        resposta = self.client.post(url).json()
+        self.assertTrue(resposta['success'])
+        self.assertEqual(resposta['status_url'], reverse('utilitarios:tarefa_status', args=[resposta['tarefa']]))
+        self.assertEqual(self.client.get(resposta['status_url']).json()['status'], 'PENDENTE')
+
+        executar(reivindicar('teste'))
+        resultado = self.client.get(resposta['status_url']).json()['resultado']
+        self.assertFalse(resultado['fechado'])
+        self.assertEqual(len(resultado['pendencias']), 2)
+        diario.refresh_from_db()
+        self.assertFalse(diario.diario_fechado)
+
+        NotaAvaliacao.objects.create(
+            avaliacao=self.trabalho, aluno=self.alunos[1], nota=5, usuario_lancamento=self.user
+        )
+        self.bimestre2.delete()
+        self.client.post(url)
+        self.assertTrue(executar(reivindicar('teste')).resultado['fechado'])
+        diario.refresh_from_db()
+        self.assertTrue(diario.diario_fechado)
+        self.assertEqual(diario.usuario_fechamento, self.user)
@@ -6,16 +6,19 @@ from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.db import transaction
+from django.urls import reverse
 from django.utils import timezone
-from .models import DiarioEletronico, RegistroChamada, RegistroNota, DiarioOnline, ConteudoAula
+from .models import DiarioEletronico, RegistroChamada, DiarioOnline, ConteudoAula
 from turma.models import Turma, Disciplina, DivisaoPeriodoLetivo, Enturmacao, Avaliacao, AulaRegistrada, NotaAvaliacao
+from turma.services import GradeMatrix
+from utilitarios.fila import enfileirar
 from alunos.models import Aluno
 
 
 @login_required
 def diario_dashboard(request):
     """Dashboard do diário eletrônico - versão bonita"""
-    turmas = Turma.objects.all()
+    turmas = Turma.objects.with_ocupacao()
     total_turmas = turmas.count()
     diarios_ativos = total_turmas  # Para agora, consideramos todas as turmas como tendo diários ativos
 
@@ -33,12 +36,10 @@ def diario_home(request):
     from django.db.models import Avg, Count
     from turma.models import AulaRegistrada, NotaAvaliacao, RegistroFrequencia
 
-    turmas = Turma.objects.all()
+    turmas = Turma.objects.with_ocupacao()
 
     # Calcular estatísticas reais
-    total_alunos = 0
-    for turma in turmas:
-        total_alunos += turma.get_alunos_enturmados().count()
+    total_alunos = turmas.ocupacao_totais()['total_alunos']
 
     # Calcular frequência média real
     try:
@@ -160,37 +161,10 @@ def diario_divisao(request, turma_id, disciplina_id, divisao_id):
         divisao_periodo=divisao
     ).order_by('data_aplicacao')
 
-    # Buscar registros de notas para cada aluno - usando NotaAvaliacao
-    notas_por_aluno = {}
-    for aluno in alunos_turma:
-        # Buscar notas nas avaliações desta disciplina/divisão
-        notas_dict = {}
-        for avaliacao in avaliacoes:
-            try:
-                nota_avaliacao = NotaAvaliacao.objects.get(
-                    avaliacao=avaliacao,
-                    aluno=aluno
-                )
-                notas_dict[avaliacao.pk] = nota_avaliacao
-            except NotaAvaliacao.DoesNotExist:
-                notas_dict[avaliacao.pk] = None
-
-        notas_por_aluno[aluno.pk] = notas_dict
-
-    # Calcular médias dos alunos
-    medias_alunos = {}
-    for aluno in alunos_turma:
-        notas_validas = []
-        for avaliacao in avaliacoes:
-            nota_obj = notas_por_aluno[aluno.pk].get(avaliacao.pk)
-            if nota_obj and nota_obj.nota is not None:
-                notas_validas.append(float(nota_obj.nota))
-
-        if notas_validas:
-            media = sum(notas_validas) / len(notas_validas)
-            medias_alunos[aluno.pk] = media
-        else:
-            medias_alunos[aluno.pk] = None
+    # Matriz aluno × avaliação (uma consulta) e médias ponderadas por peso/valor máximo
+    matriz = GradeMatrix.build(alunos_turma, avaliacoes)
+    notas_por_aluno = matriz.grid()
+    medias_alunos = matriz.medias()
 
     # Buscar registros de chamada
     chamadas = RegistroChamada.objects.filter(
@@ -216,59 +190,27 @@ def diario_divisao(request, turma_id, disciplina_id, divisao_id):
 @login_required
 @require_POST
 def fechar_diario(request, turma_id, disciplina_id):
-    """Fechar o diário eletrônico após validações"""
+    """
+    Fechar o diário eletrônico após validações
+
+    A validação percorre alunos, avaliações e notas de todas as divisões: vai
+    para a fila (diario/tarefas.py) e a tela acompanha a tarefa por status_url.
+    """
     turma = get_object_or_404(Turma, pk=turma_id)
     disciplina = get_object_or_404(Disciplina, pk=disciplina_id)
 
-    try:
-        diario = DiarioEletronico.objects.get(turma=turma, disciplina=disciplina)
-
-        # Validações antes do fechamento
-        alunos_turma = turma.get_alunos_enturmados()
-        divisoes = DivisaoPeriodoLetivo.objects.filter(ativo=True)
-
-        pendencias = []
-
-        # Verificar se todos os alunos têm notas em todas as divisões
-        for divisao in divisoes:
-            avaliacoes_divisao = Avaliacao.objects.filter(
-                turma=turma,
-                disciplina=disciplina,
-                divisao_periodo=divisao
-            )
-
-            if not avaliacoes_divisao.exists():
-                pendencias.append(f'Nenhuma avaliação cadastrada para {divisao.nome}')
-                continue
-
-            for aluno in alunos_turma:
-                notas_aluno = RegistroNota.objects.filter(
-                    diario=diario,
-                    aluno=aluno,
-                    divisao_periodo=divisao
-                )
-
-                if notas_aluno.count() < avaliacoes_divisao.count():
-                    pendencias.append(f'Aluno {aluno.nome} - notas pendentes em {divisao.nome}')
-
-        # Se há pendências, retornar erro
-        if pendencias:
-            messages.error(request, f'Não é possível fechar o diário. Pendências encontradas: {"; ".join(pendencias[:5])}')
-            return JsonResponse({'success': False, 'errors': pendencias})
-
-        # Fechar o diário
-        diario.diario_fechado = True
-        diario.data_fechamento = timezone.now()
-        diario.usuario_fechamento = request.user
-        diario.save()
-
-        messages.success(request, f'Diário de {disciplina.nome} - {turma.nome} fechado com sucesso!')
-        return JsonResponse({'success': True, 'message': 'Diário fechado com sucesso!'})
-
-    except DiarioEletronico.DoesNotExist:
+    diario = DiarioEletronico.objects.filter(turma=turma, disciplina=disciplina).first()
+    if diario is None:
         messages.error(request, 'Diário eletrônico não encontrado.')
         return JsonResponse({'success': False, 'error': 'Diário não encontrado'})
 
+    tarefa = enfileirar('diario.fechar_diario', usuario=request.user, diario_id=diario.pk)
+    return JsonResponse({
+        'success': True,
+        'tarefa': tarefa.pk,
+        'status_url': reverse('utilitarios:tarefa_status', args=[tarefa.pk]),
+    })
+
 
 @login_required
 @require_POST
@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.db.models import Q, Count
 from django.core.paginator import Paginator
 from dashboard.models import AtividadeRecente
+from busca.services import buscar
 from alunos.models import Aluno
 from .models import ItinerarioFormativo, UnidadeCurricular, AssociacaoItinerarioUnidade, EnturmacaoItinerario
 from .forms import ItinerarioFormativoForm, UnidadeCurricularForm, EnturmacaoItinerarioForm
@@ -36,9 +37,7 @@ def itinerario_list(request):
     area_conhecimento = request.GET.get('area_conhecimento')
     
     if busca:
-        itinerarios = itinerarios.filter(
-            Q(nome__icontains=busca) | Q(habilidades__icontains=busca)
-        )
+        itinerarios = buscar(itinerarios, 'itinerario', busca)
     
     if area_conhecimento and area_conhecimento != 'TODAS':
         itinerarios = itinerarios.filter(areas_conhecimento=area_conhecimento)
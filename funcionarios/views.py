@@ -1,10 +1,11 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.http import JsonResponse
 from django.core.paginator import Paginator
 from dashboard.models import AtividadeRecente
+from busca.services import buscar
 from .models import (
     Funcionario, DocumentacaoFuncionario, DadosFuncionais, DuploVinculo,
     Habilitacao, Escolaridade, FormacaoSuperior, Disponibilidade,
@@ -69,11 +70,7 @@ def funcionario_list(request):
     
     # Aplicar filtros
     if search:
-        funcionarios = funcionarios.filter(
-            Q(nome__icontains=search) | 
-            Q(codigo__icontains=search) | 
-            Q(dados_funcionais__matricula__icontains=search)
-        )
+        funcionarios = buscar(funcionarios, 'funcionario', search)
     
     if cargo:
         funcionarios = funcionarios.filter(dados_funcionais__funcao=cargo)
@@ -115,7 +112,7 @@ def funcionario_busca_rede(request):
             funcionarios_encontrados = []
             
             if tipo_busca == 'nome':
-                funcionarios_encontrados = Funcionario.objects.filter(nome__icontains=busca)
+                funcionarios_encontrados = buscar(Funcionario.objects.all(), 'funcionario', busca)
             elif tipo_busca == 'cpf':
                 funcionarios_encontrados = Funcionario.objects.filter(documentacao__cpf=busca)
             elif tipo_busca == 'matricula':
@@ -0,0 +1,89 @@
+"""
+Perfis de banco de dados do GUTO, configuráveis por variáveis de ambiente.
+
+Este módulo é importado pelo settings.py e por isso não depende do Django.
+"""
+import os
+
+
+def _env_int(nome, padrao):
+    return int(os.environ.get(nome, padrao))
+
+
+def pragmas_sqlite():
+    """
+    PRAGMAs aplicados em toda nova conexão SQLite (variáveis GUTO_SQLITE_*).
+
+    WAL permite leituras simultâneas a uma escrita; synchronous=NORMAL é
+    seguro com WAL e evita um fsync por transação; busy_timeout faz a
+    conexão esperar o lock em vez de falhar com "database is locked".
+    """
+    return {
+        'journal_mode': os.environ.get('GUTO_SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('GUTO_SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _env_int('GUTO_SQLITE_BUSY_TIMEOUT', 5000),  # ms
+        'mmap_size': _env_int('GUTO_SQLITE_MMAP_SIZE', 128 * 1024 * 1024),  # bytes
+        'cache_size': _env_int('GUTO_SQLITE_CACHE_SIZE', -20000),  # negativo = KiB
+        'temp_store': os.environ.get('GUTO_SQLITE_TEMP_STORE', 'MEMORY'),
+    }
+
+
+def sqlite_database(nome_padrao):
+    """
+    Configuração do SQLite: PRAGMAs na abertura da conexão, transações
+    IMMEDIATE (o lock de escrita é obtido no BEGIN, quando o busy_timeout
+    ainda pode esperar por ele) e conexões persistentes (GUTO_DB_CONN_MAX_AGE).
+    """
+    pragmas = pragmas_sqlite()
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('GUTO_SQLITE_NAME', nome_padrao),
+        'CONN_MAX_AGE': _env_int('GUTO_DB_CONN_MAX_AGE', 600),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': pragmas['busy_timeout'] / 1000,
+            'transaction_mode': os.environ.get('GUTO_SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            'init_command': ';'.join(f'PRAGMA {nome}={valor}' for nome, valor in pragmas.items()),
+        },
+    }
+
+
+def postgres_database():
+    """
+    Configuração do PostgreSQL (variáveis GUTO_PG_*), com o pool de
+    conexões do psycopg 3 (psycopg[pool]) e statement_timeout por sessão.
+
+    Com o pool, o Django exige CONN_MAX_AGE = 0: as conexões são devolvidas
+    ao pool ao fim de cada requisição em vez de ficarem presas à thread.
+    """
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('GUTO_PG_NAME', 'guto'),
+        'USER': os.environ.get('GUTO_PG_USER', 'guto'),
+        'PASSWORD': os.environ.get('GUTO_PG_PASSWORD', ''),
+        'HOST': os.environ.get('GUTO_PG_HOST', 'localhost'),
+        'PORT': os.environ.get('GUTO_PG_PORT', '5432'),
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {
+                'min_size': _env_int('GUTO_PG_POOL_MIN', 2),
+                'max_size': _env_int('GUTO_PG_POOL_MAX', 10),
+                'timeout': _env_int('GUTO_PG_POOL_TIMEOUT', 10),  # s
+            },
+            'options': f"-c statement_timeout={_env_int('GUTO_PG_STATEMENT_TIMEOUT', 30000)}",  # ms
+        },
+    }
+
+
+def database_from_env(sqlite_padrao):
+    """
+    Banco padrão escolhido por GUTO_DB_ENGINE: 'sqlite' (padrão, para
+    desenvolvimento) ou 'postgresql'.
+    """
+    engine = os.environ.get('GUTO_DB_ENGINE', 'sqlite').lower()
+    if engine in ('postgres', 'postgresql'):
+        return postgres_database()
+    if engine != 'sqlite':
+        raise ValueError(f"GUTO_DB_ENGINE inválido: {engine!r} (use 'sqlite' ou 'postgresql')")
+    return sqlite_database(sqlite_padrao)
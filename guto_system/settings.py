@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .database import database_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -50,9 +53,11 @@ INSTALLED_APPS = [
     'transporte',
     'programa',
     'censo',
+    'busca',
 ]
 
 MIDDLEWARE = [
+    'utilitarios.middleware.PerfilRequisicaoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,13 +90,96 @@ WSGI_APPLICATION = 'guto_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite por padrão; GUTO_DB_ENGINE=postgresql usa o perfil PostgreSQL.
+# Perfis e variáveis de ambiente em guto_system/database.py
 DATABASES = {
+    'default': database_from_env(BASE_DIR / 'db.sqlite3'),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'guto-default',
     }
 }
 
+# Tempo (segundos) do resumo do dashboard em cache; os sinais dos models o invalidam antes
+DASHBOARD_RESUMO_TIMEOUT = 300
+
+# Tempo (segundos) dos relatórios de turmas em cache; a versão dos dados (opcoes/services.py) os invalida antes
+RELATORIOS_TIMEOUT = 600
+
+
+# Gravação de AtividadeRecente e RegistroAuditoria (utilitarios/auditoria.py)
+# 'assincrono': fila em memória gravada em lote por uma thread depois do commit;
+# 'sincrono': grava na própria requisição (durável junto com a transação).
+AUDITORIA_MODO = os.environ.get('GUTO_AUDITORIA_MODO', 'assincrono')
+AUDITORIA_LOTE = int(os.environ.get('GUTO_AUDITORIA_LOTE', '100'))
+AUDITORIA_INTERVALO_MS = int(os.environ.get('GUTO_AUDITORIA_INTERVALO_MS', '200'))
+AUDITORIA_FILA_MAXIMA = int(os.environ.get('GUTO_AUDITORIA_FILA_MAXIMA', '10000'))
+
+# Dias mantidos nas tabelas principais antes do archive_audit movê-los para o arquivo
+# (utilitarios/retencao.py); None desliga a retenção da tabela. Nas variáveis de
+# ambiente, valor vazio ou 0 equivale a None
+def _dias_retencao(variavel, padrao):
+    dias = int(os.environ.get(variavel, padrao).strip() or 0)
+    return dias or None
+
+
+RETENCAO_DIAS = {
+    'auditoria': _dias_retencao('GUTO_RETENCAO_AUDITORIA_DIAS', '365'),
+    'atividades': _dias_retencao('GUTO_RETENCAO_ATIVIDADES_DIAS', '90'),
+}
+
+# Tarefas em segundo plano (utilitarios/fila.py, executadas por manage.py run_workers)
+# 'fila' (padrão): executadas pelos trabalhadores; 'imediato': na própria requisição, sem trabalhadores
+TAREFAS_MODO = os.environ.get('GUTO_TAREFAS_MODO', 'fila')
+TAREFAS_MAX_TENTATIVAS = 3
+# Espera (segundos) antes de repetir uma tarefa que falhou; dobra a cada tentativa até o máximo
+TAREFAS_ESPERA_BASE = 10
+TAREFAS_ESPERA_MAXIMA = 3600
+# Sem progresso por este tempo (segundos) a execução é considerada abandonada
+TAREFAS_TEMPO_LIMITE = int(os.environ.get('GUTO_TAREFAS_TEMPO_LIMITE', '1800'))
+
+# Perfil de requisições (utilitarios.middleware.PerfilRequisicaoMiddleware)
+# Desligado por padrão; GUTO_PERFIL=1 liga. A amostragem (0 a 1) é a fração
+# das requisições medidas e o limite marca consultas repetidas como N+1.
+PERFIL_REQUISICOES = os.environ.get('GUTO_PERFIL') == '1'
+PERFIL_AMOSTRAGEM = float(os.environ.get('GUTO_PERFIL_AMOSTRAGEM', '1.0'))
+PERFIL_LIMITE_REPETICOES = int(os.environ.get('GUTO_PERFIL_LIMITE_REPETICOES', '5'))
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simples': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simples',
+        },
+    },
+    'loggers': {
+        'utilitarios': {
+            'handlers': ['console'],
+            'level': os.environ.get('GUTO_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
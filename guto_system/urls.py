@@ -48,6 +48,7 @@ urlpatterns = [
     path('transporte/', include('transporte.urls')),
     path('programa/', include('programa.urls')),
     path('censo/', include('censo.urls')),
+    path('busca/', include('busca.urls')),
 ]
 
 # Configuração para servir arquivos de mídia em desenvolvimento
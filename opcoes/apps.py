@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OpcoesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'opcoes'
+
+    def ready(self):
+        from .signals import conectar_sinais
+        conectar_sinais()
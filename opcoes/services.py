@@ -0,0 +1,171 @@
+"""
+Motor dos relatórios de turmas (RF605-RF607).
+
+Um FiltroRelatorio vira uma única consulta sobre Turma, com o total de
+alunos enturmados (Enturmacao) e de diários (DiarioEletronico) em
+subconsultas. O resultado fica em cache pela combinação de filtros mais a
+versão dos dados, incrementada pelos sinais sempre que uma turma,
+enturmação ou diário muda: a tela e a versão para impressão usam o mesmo
+resultado, e um relatório em cache nunca mostra dados desatualizados.
+
+A versão fica no banco (SequenciaCodigo), não no cache: o cache padrão é
+por processo, e uma alteração feita por outro processo (outro worker do
+servidor, run_workers, generate_network) precisa valer para todos.
+
+Fora do cache a tela não calcula o relatório: enfileira a tarefa
+'opcoes.gerar_relatorio' (opcoes/tarefas.py) e acompanha o progresso; o
+resultado fica na tarefa, já que o trabalhador não enxerga o cache do
+processo do servidor.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from diario.models import DiarioEletronico
+from turma.models import Turma, Enturmacao
+from utilitarios.fila import enfileirar
+from utilitarios.models import SequenciaCodigo, Tarefa
+from utilitarios.services import alocar_sequencia
+
+# Prefixo da SequenciaCodigo que guarda a versão dos dados dos relatórios
+CHAVE_VERSAO = 'relatorios:versao'
+
+TAREFA_RELATORIO = 'opcoes.gerar_relatorio'
+
+CAMPOS_FILTRO = ('periodo_letivo', 'tipo_ensino', 'ano_serie', 'turno', 'status_diario', 'situacao_turma')
+
+# Tipos de ensino do filtro -> tipos de ensino da turma; EJA e Educação
+# Especial ainda não existem como turma e não encontram nada
+TIPOS_ENSINO_TURMA = {
+    'INFANTIL': 'EDUCACAO_INFANTIL',
+    'FUNDAMENTAL_I': 'ENSINO_FUNDAMENTAL_I',
+    'FUNDAMENTAL_II': 'ENSINO_FUNDAMENTAL_II',
+    'MEDIO': 'ENSINO_MEDIO',
+}
+
+
+def _contagem_por_turma(queryset):
+    """Subconsulta com a quantidade de linhas do queryset de cada turma"""
+    contagem = queryset.filter(turma=OuterRef('pk')).order_by().values('turma').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(contagem, output_field=models.IntegerField()), 0)
+
+
+def _anos_series(texto):
+    """Códigos de ano/série cujo código ou nome é o texto digitado no filtro"""
+    texto = texto.strip().lower()
+    return [codigo for codigo, nome in Turma.ANO_SERIE_CHOICES if texto in (codigo.lower(), nome.lower())]
+
+
+def consultar_turmas(filtro):
+    """Turmas que atendem ao filtro, anotadas com total de alunos e de diários abertos"""
+    diarios = DiarioEletronico.objects.filter(periodo_letivo=filtro.periodo_letivo)
+    turmas = Turma.objects.filter(periodo_letivo=filtro.periodo_letivo).annotate(
+        total_alunos=_contagem_por_turma(Enturmacao.objects.filter(ativo=True)),
+        total_diarios=_contagem_por_turma(diarios),
+        diarios_abertos=_contagem_por_turma(diarios.filter(diario_fechado=False)),
+    )
+
+    if filtro.tipo_ensino != 'TODOS':
+        turmas = turmas.filter(tipo_ensino=TIPOS_ENSINO_TURMA.get(filtro.tipo_ensino, filtro.tipo_ensino))
+    if filtro.ano_serie:
+        turmas = turmas.filter(ano_serie__in=_anos_series(filtro.ano_serie))
+    if filtro.turno != 'TODOS':
+        turmas = turmas.filter(turno=filtro.turno)
+
+    # Diário aberto: algum diário da turma ainda não foi fechado; fechado: todos foram
+    if filtro.status_diario == 'ABERTO':
+        turmas = turmas.filter(diarios_abertos__gt=0)
+    elif filtro.status_diario == 'FECHADO':
+        turmas = turmas.filter(total_diarios__gt=0, diarios_abertos=0)
+
+    # Turma encerrada: diário da turma fechado ao final do período letivo
+    if filtro.situacao_turma == 'ATIVO':
+        turmas = turmas.filter(diario_fechado=False)
+    elif filtro.situacao_turma == 'ENCERRADO':
+        turmas = turmas.filter(diario_fechado=True)
+
+    return turmas.order_by('ano_serie', 'nome')
+
+
+def calcular_relatorio(filtro):
+    """Linhas e totais do relatório, prontos para a tela e para a impressão"""
+    turmas = []
+    for turma in consultar_turmas(filtro):
+        turmas.append({
+            'id': turma.pk,
+            'nome': turma.nome,
+            'tipo_ensino': turma.get_tipo_ensino_display(),
+            'ano_serie': turma.get_ano_serie_display(),
+            'turno': turma.get_turno_display(),
+            'alunos': turma.total_alunos,
+            'vagas': turma.vagas_total,
+            'diarios': turma.total_diarios,
+            'diarios_abertos': turma.diarios_abertos,
+            'status': 'Encerrada' if turma.diario_fechado else 'Ativa',
+        })
+    return {
+        'turmas_encontradas': turmas,
+        'total_turmas': len(turmas),
+        'total_alunos': sum(turma['alunos'] for turma in turmas),
+        'total_vagas': sum(turma['vagas'] for turma in turmas),
+        'data_geracao': timezone.now(),
+    }
+
+
+def versao_dados():
+    """Versão atual dos dados dos relatórios (uma consulta, igual em todos os processos)"""
+    return SequenciaCodigo.objects.filter(prefixo=CHAVE_VERSAO).values_list('ultimo_valor', flat=True).first() or 0
+
+
+def invalidar_relatorios(**kwargs):
+    """Incrementa a versão dos dados, descartando os relatórios em cache (os sinais chamam após o commit)"""
+    alocar_sequencia(CHAVE_VERSAO)
+
+
+def chave_relatorio(filtro):
+    """Chave de cache: hash dos campos do filtro mais a versão dos dados"""
+    valores = json.dumps({campo: getattr(filtro, campo) or '' for campo in CAMPOS_FILTRO}, sort_keys=True)
+    return f'relatorios:{versao_dados()}:{hashlib.sha256(valores.encode()).hexdigest()}'
+
+
+def obter_relatorio(filtro):
+    """Relatório do filtro a partir do cache, calculando quando ausente"""
+    return cache.get_or_set(
+        chave_relatorio(filtro),
+        lambda: calcular_relatorio(filtro),
+        getattr(settings, 'RELATORIOS_TIMEOUT', 600)
+    )
+
+
+def solicitar_relatorio(filtro, usuario):
+    """
+    Relatório do filtro para a tela: (relatório, None) quando já está no
+    cache ou numa tarefa concluída, (None, tarefa) enquanto a tarefa que o
+    calcula não termina. O mesmo filtro em cálculo não gera outra tarefa.
+    """
+    chave = chave_relatorio(filtro)
+    relatorio = cache.get(chave)
+    if relatorio is not None:
+        return relatorio, None
+
+    tarefa = Tarefa.objects.filter(
+        nome=TAREFA_RELATORIO, usuario=usuario, argumentos__chave=chave
+    ).exclude(status='FALHOU').order_by('-pk').first()
+    if tarefa is None:
+        tarefa = enfileirar(TAREFA_RELATORIO, usuario=usuario, filtro_id=filtro.pk, chave=chave)
+    if tarefa.status != 'CONCLUIDA':
+        return None, tarefa
+
+    # O resultado volta do JSON com a data de geração em texto
+    relatorio = {**tarefa.resultado, 'data_geracao': parse_datetime(tarefa.resultado['data_geracao'])}
+    cache.set(chave, relatorio, getattr(settings, 'RELATORIOS_TIMEOUT', 600))
+    return relatorio, None
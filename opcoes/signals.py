@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from diario.models import DiarioEletronico
+from turma.models import Turma, Enturmacao
+from .services import invalidar_relatorios
+
+MODELOS_RELATORIOS = [Turma, Enturmacao, DiarioEletronico]
+
+
+def invalidar_apos_commit(**kwargs):
+    """
+    Troca a versão só depois do commit, para que um relatório calculado por
+    outra requisição durante a transação não fique em cache com a versão nova
+    """
+    transaction.on_commit(invalidar_relatorios)
+
+
+def conectar_sinais():
+    """Troca a versão dos dados dos relatórios sempre que um model consultado muda"""
+    for model in MODELOS_RELATORIOS:
+        post_save.connect(invalidar_apos_commit, sender=model, dispatch_uid=f'opcoes_relatorios_save_{model._meta.label}')
+        post_delete.connect(invalidar_apos_commit, sender=model, dispatch_uid=f'opcoes_relatorios_delete_{model._meta.label}')
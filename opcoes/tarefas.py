@@ -0,0 +1,16 @@
+"""Tarefas em segundo plano do app (executadas por manage.py run_workers)"""
+from utilitarios.fila import registrar_tarefa
+
+from .models import FiltroRelatorio
+from .services import TAREFA_RELATORIO, calcular_relatorio
+
+
+@registrar_tarefa(TAREFA_RELATORIO)
+def gerar_relatorio(tarefa, filtro_id, chave):
+    """
+    Calcula o relatório do filtro; a tela busca o resultado na tarefa pela
+    `chave` de cache com que a solicitou (opcoes.services.solicitar_relatorio).
+    """
+    filtro = FiltroRelatorio.objects.select_related('tipo_relatorio').get(pk=filtro_id)
+    tarefa.reportar_progresso(10, f'Consultando turmas de {filtro.periodo_letivo}')
+    return calcular_relatorio(filtro)
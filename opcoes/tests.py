@@ -1,3 +1,138 @@
 from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from datetime import date
+from alunos.models import Aluno
+from diario.models import DiarioEletronico
+from turma.models import Turma, Disciplina, Enturmacao
+from opcoes.models import TipoRelatorio, FiltroRelatorio
+from opcoes.services import CHAVE_VERSAO, consultar_turmas, obter_relatorio
+from utilitarios.fila import executar, reivindicar
+from utilitarios.models import Tarefa
+from utilitarios.services import alocar_sequencia
 
-# Create your tests here.
+
+class GerarRelatorioTest(TestCase):
+    """Testes para o motor de relatórios de turmas"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.tipo = TipoRelatorio.objects.create(nome='BOLETIM')
+        self.disciplina = Disciplina.objects.create(nome='Matemática')
+        self.turma_a = self.criar_turma('5º Ano A', 'ENSINO_FUNDAMENTAL_I', '5_ANO', 'MATUTINO')
+        self.turma_b = self.criar_turma('5º Ano B', 'ENSINO_FUNDAMENTAL_I', '5_ANO', 'VESPERTINO')
+        self.turma_c = self.criar_turma('1º Ano EM', 'ENSINO_MEDIO', '1_ANO_EM', 'MATUTINO', diario_fechado=True)
+        self.criar_turma('5º Ano A', 'ENSINO_FUNDAMENTAL_I', '5_ANO', 'MATUTINO', periodo_letivo='2024')
+
+        for numero in range(3):
+            aluno = Aluno.objects.create(
+                nome=f'Aluno {numero}', data_nascimento=date(2015, 1, 1), sexo='M', usuario_cadastro=self.user
+            )
+            Enturmacao.objects.create(
+                turma=self.turma_a, aluno=aluno, usuario_enturmacao=self.user, ativo=numero < 2
+            )
+        for turma, fechado in [(self.turma_a, False), (self.turma_b, True), (self.turma_c, True)]:
+            DiarioEletronico.objects.create(
+                turma=turma, disciplina=self.disciplina, periodo_letivo='2025', diario_fechado=fechado
+            )
+
+    def criar_turma(self, nome, tipo_ensino, ano_serie, turno, periodo_letivo='2025', diario_fechado=False):
+        return Turma.objects.create(
+            nome=nome, periodo_letivo=periodo_letivo, tipo_ensino=tipo_ensino, ano_serie=ano_serie,
+            turno=turno, diario_fechado=diario_fechado, usuario_criacao=self.user
+        )
+
+    def criar_filtro(self, **campos):
+        return FiltroRelatorio.objects.create(
+            tipo_relatorio=self.tipo, usuario=self.user, periodo_letivo='2025', **campos
+        )
+
+    def test_filtros_compilados_em_uma_consulta(self):
+        """Teste 1: Verifica que cada filtro restringe as turmas numa única consulta"""
+        def nomes(**campos):
+            filtro = self.criar_filtro(**campos)
+            with self.assertNumQueries(1):
+                return [turma.nome for turma in consultar_turmas(filtro)]
+
+        self.assertEqual(nomes(), ['1º Ano EM', '5º Ano A', '5º Ano B'])
+        self.assertEqual(nomes(tipo_ensino='FUNDAMENTAL_I'), ['5º Ano A', '5º Ano B'])
+        self.assertEqual(nomes(tipo_ensino='EJA'), [])
+        self.assertEqual(nomes(ano_serie='5º ano'), ['5º Ano A', '5º Ano B'])
+        self.assertEqual(nomes(turno='VESPERTINO'), ['5º Ano B'])
+        self.assertEqual(nomes(status_diario='ABERTO'), ['5º Ano A'])
+        self.assertEqual(nomes(status_diario='FECHADO'), ['1º Ano EM', '5º Ano B'])
+        self.assertEqual(nomes(situacao_turma='ENCERRADO'), ['1º Ano EM'])
+
+        relatorio = obter_relatorio(self.criar_filtro(turno='MATUTINO', situacao_turma='ATIVO'))
+        self.assertEqual(relatorio['total_turmas'], 1)
+        self.assertEqual(relatorio['total_alunos'], 2)
+        self.assertEqual(relatorio['turmas_encontradas'][0]['diarios_abertos'], 1)
+
+    def test_cache_invalidado_pela_versao_dos_dados(self):
+        """Teste 2: Verifica o cache por filtro e a troca de versão quando os dados mudam"""
+        filtro = self.criar_filtro(tipo_ensino='FUNDAMENTAL_I')
+        mesmo_filtro = self.criar_filtro(tipo_ensino='FUNDAMENTAL_I')
+        self.assertEqual(obter_relatorio(filtro)['total_alunos'], 2)
+        # Outro filtro com os mesmos campos usa o mesmo resultado; só a versão é lida do banco
+        with self.assertNumQueries(1):
+            self.assertEqual(obter_relatorio(mesmo_filtro)['total_alunos'], 2)
+
+        # A versão só é trocada no commit da transação que alterou os dados
+        with self.captureOnCommitCallbacks(execute=True):
+            Enturmacao.objects.filter(turma=self.turma_a, ativo=True).first().delete()
+            self.assertEqual(obter_relatorio(filtro)['total_alunos'], 2)
+        self.assertEqual(obter_relatorio(filtro)['total_alunos'], 1)
+        DiarioEletronico.objects.filter(turma=self.turma_a).update(diario_fechado=True)
+        # update() não dispara sinais: o resultado em cache continua valendo até a próxima troca de versão
+        self.assertEqual(obter_relatorio(self.criar_filtro(status_diario='ABERTO'))['total_turmas'], 0)
+
+        # A versão fica no banco: a troca feita por outro processo vale aqui, mesmo sem passar pelo cache local
+        Enturmacao.objects.filter(turma=self.turma_a, ativo=True).update(ativo=False)
+        alocar_sequencia(CHAVE_VERSAO)
+        self.assertEqual(obter_relatorio(filtro)['total_alunos'], 0)
+
+    def test_tela_e_impressao_do_mesmo_resultado(self):
+        """Teste 3: Verifica que o relatório é calculado na fila e a tela e a impressão usam o mesmo resultado"""
+        filtro = self.criar_filtro(status_diario='FECHADO')
+        self.client.force_login(self.user)
+        url = reverse('opcoes:gerar_relatorio', args=[filtro.pk])
+
+        # Fora do cache a tela só enfileira o cálculo e acompanha a tarefa
+        andamento = self.client.get(url)
+        self.assertTemplateUsed(andamento, 'utilitarios/tarefa_andamento.html')
+        self.assertContains(andamento, reverse('utilitarios:tarefa_status', args=[andamento.context['tarefa'].pk]))
+        self.client.get(url)
+        self.assertEqual(Tarefa.objects.filter(nome='opcoes.gerar_relatorio').count(), 1)
+
+        # O trabalhador não compartilha o cache: a tela busca o resultado na tarefa
+        executar(reivindicar('teste'))
+        cache.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_turmas'], 2)
+        self.assertContains(response, '5º Ano B')
+        self.assertNotContains(response, '5º Ano A')
+
+        with self.assertNumQueries(4):  # sessão, usuário, filtro e versão dos dados
+            impressao = self.client.get(url, {'format': 'print'})
+        self.assertTemplateUsed(impressao, 'opcoes/documentos/relatorio_print.html')
+        self.assertEqual(impressao.context['data_geracao'], response.context['data_geracao'])
+        self.assertContains(impressao, '1º Ano EM')
+
+        outro = User.objects.create_user(username='outro', password='testpass123')
+        self.client.force_login(outro)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(TAREFAS_MODO='imediato')
+    def test_relatorio_sem_trabalhadores(self):
+        """Teste 4: Verifica que no modo imediato o relatório sai na própria requisição"""
+        filtro = self.criar_filtro(turno='VESPERTINO')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('opcoes:gerar_relatorio', args=[filtro.pk]))
+        self.assertTemplateUsed(response, 'opcoes/documentos/relatorio_resultado.html')
+        self.assertEqual(response.context['total_turmas'], 1)
+        self.assertEqual(Tarefa.objects.get(nome='opcoes.gerar_relatorio').status, 'CONCLUIDA')
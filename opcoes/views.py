@@ -4,9 +4,11 @@ from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.template.loader import get_template
 from django.core.paginator import Paginator
-from datetime import date, datetime
+from django.urls import reverse
+from datetime import date
 from .models import TipoRelatorio, FiltroRelatorio, CalendarioEscolar, EventoCalendario
 from .forms import FiltroRelatorioForm, CalendarioEscolarForm, EventoCalendarioForm
+from .services import solicitar_relatorio
 import calendar
 
 @login_required
@@ -53,7 +55,6 @@ def selecionar_relatorio(request, tipo_relatorio_id):
             filtro.usuario = request.user
             filtro.save()
             
-            # Gerar relatório (simulação)
             messages.success(request, f'Relatório "{tipo_relatorio}" gerado com sucesso!')
             return redirect('opcoes:gerar_relatorio', filtro_id=filtro.id)
     else:
@@ -75,21 +76,26 @@ def selecionar_relatorio(request, tipo_relatorio_id):
 @login_required
 def gerar_relatorio(request, filtro_id):
     """
-    Gerar e exibir relatório com base nos filtros aplicados
+    Gerar e exibir relatório com base nos filtros aplicados (RF607)
     """
-    filtro = get_object_or_404(FiltroRelatorio, pk=filtro_id, usuario=request.user)
+    filtro = get_object_or_404(
+        FiltroRelatorio.objects.select_related('tipo_relatorio'), pk=filtro_id, usuario=request.user
+    )
+    
+    # Tela e impressão usam o mesmo resultado em cache (opcoes/services.py);
+    # fora do cache o cálculo vai para a fila e a tela acompanha a tarefa
+    relatorio, tarefa = solicitar_relatorio(filtro, request.user)
+    if tarefa is not None:
+        return render(request, 'utilitarios/tarefa_andamento.html', {
+            'titulo': f'Relatório - {filtro.tipo_relatorio}',
+            'tarefa': tarefa,
+            'destino': request.get_full_path(),
+            'voltar': reverse('opcoes:selecionar_relatorio', args=[filtro.tipo_relatorio.pk]),
+        })
     
-    # Dados simulados para o relatório
     dados_relatorio = {
         'filtro': filtro,
-        'total_turmas': 15,
-        'total_alunos': 350,
-        'data_geracao': datetime.now(),
-        'turmas_encontradas': [
-            {'nome': '1º A - Matutino', 'alunos': 25, 'status': 'Ativo'},
-            {'nome': '2º B - Vespertino', 'alunos': 28, 'status': 'Ativo'},
-            {'nome': '3º C - Matutino', 'alunos': 22, 'status': 'Ativo'},
-        ]
+        **relatorio,
     }
     
     if request.GET.get('format') == 'print':
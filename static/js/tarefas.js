@@ -0,0 +1,38 @@
+/**
+ * GUTO - Acompanhamento de tarefas em segundo plano
+ * Consulta utilitarios:tarefa_status até a tarefa terminar (ver utilitarios/fila.py)
+ */
+
+window.GUTO = window.GUTO || {};
+
+/**
+ * Consulta a situação da tarefa a cada `intervalo` ms.
+ * aoProgresso(tarefa) a cada consulta em andamento, aoConcluir(tarefa) quando
+ * concluída e aoFalhar(mensagem) quando falhar ou a consulta der erro.
+ */
+window.GUTO.acompanharTarefa = function(url, { aoProgresso, aoConcluir, aoFalhar, intervalo = 1000 } = {}) {
+    function consultar() {
+        fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            })
+            .then(tarefa => {
+                if (tarefa.status === 'CONCLUIDA') {
+                    if (aoConcluir) aoConcluir(tarefa);
+                } else if (tarefa.status === 'FALHOU') {
+                    if (aoFalhar) aoFalhar(tarefa.erro || tarefa.mensagem || 'A tarefa falhou.');
+                } else {
+                    if (aoProgresso) aoProgresso(tarefa);
+                    setTimeout(consultar, intervalo);
+                }
+            })
+            .catch(erro => {
+                console.error('Erro ao consultar tarefa:', erro);
+                if (aoFalhar) aoFalhar('Não foi possível consultar o andamento da tarefa.');
+            });
+    }
+    consultar();
+};
@@ -6,6 +6,7 @@ from django.core.paginator import Paginator
 from django.db.models import Q, Count, Sum
 from django.utils import timezone
 from datetime import date, datetime, timedelta
+from busca.services import buscar
 from .models import (
     Motorista, Veiculo, Rota, PontoParada, AlunoTransporte, 
     RegistroViagem, ManutencaoVeiculo
@@ -114,11 +115,7 @@ def motorista_list(request):
     alerta = request.GET.get('alerta', '')
     
     if busca:
-        motoristas = motoristas.filter(
-            Q(nome__icontains=busca) | 
-            Q(cpf__icontains=busca) |
-            Q(cnh_numero__icontains=busca)
-        )
+        motoristas = buscar(motoristas, 'motorista', busca)
     
     if ativo == 'sim':
         motoristas = motoristas.filter(ativo=True)
@@ -265,11 +262,7 @@ def veiculo_list(request):
     alerta = request.GET.get('alerta', '')
     
     if busca:
-        veiculos = veiculos.filter(
-            Q(placa__icontains=busca) |
-            Q(marca__icontains=busca) |
-            Q(modelo__icontains=busca)
-        )
+        veiculos = buscar(veiculos, 'veiculo', busca)
     
     if status:
         if status == 'manutencao':
@@ -479,10 +472,7 @@ def aluno_transporte_list(request):
     situacao = request.GET.get('situacao', '')
     
     if busca:
-        alunos_transporte = alunos_transporte.filter(
-            Q(aluno__nome__icontains=busca) |
-            Q(responsavel_nome__icontains=busca)
-        )
+        alunos_transporte = buscar(alunos_transporte, 'aluno_transporte', busca)
     
     if rota_id:
         alunos_transporte = alunos_transporte.filter(rota_id=rota_id)
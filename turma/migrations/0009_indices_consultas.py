@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turma', '0008_alter_disciplina_codigo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='avaliacao',
+            index=models.Index(fields=['turma', 'disciplina', 'divisao_periodo'], name='avaliacao_turma_disc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='avaliacao',
+            index=models.Index(fields=['turma', '-data_aplicacao'], name='avaliacao_turma_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enturmacao',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['turma', 'aluno'], name='enturmacao_ativa_turma_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turma', '0009_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='avaliacao',
+            index=models.Index(fields=['-data_aplicacao', '-id'], name='avaliacao_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lancamentonota',
+            index=models.Index(fields=['-data_lancamento', '-id'], name='lancamento_nota_data_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turma', '0010_paginacao_cursor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='avaliacao',
+            index=models.Index(condition=models.Q(('notas_lancadas', False)), fields=['turma'], name='avaliacao_pendente_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator, DecimalValidator
 from datetime import date, datetime
@@ -42,6 +44,30 @@ class GrupoConceito(models.Model):
     def __str__(self):
         return self.nome
 
+class TurmaQuerySet(models.QuerySet):
+    """QuerySet de Turmas com anotações de ocupação calculadas no banco"""
+
+    def with_ocupacao(self):
+        """Anota cada turma com o total de alunos enturmados ativos (total_alunos_ativos)"""
+        ativos = Enturmacao.objects.filter(
+            turma=OuterRef('pk'),
+            ativo=True
+        ).order_by().values('turma').annotate(total=Count('pk')).values('total')
+        return self.annotate(
+            total_alunos_ativos=Coalesce(Subquery(ativos, output_field=models.IntegerField()), 0)
+        )
+
+    def ocupacao_totais(self):
+        """Retorna totais globais de ocupação das turmas do queryset em uma única consulta"""
+        totais = self.with_ocupacao().order_by().aggregate(
+            total_turmas=Count('pk'),
+            total_alunos=Coalesce(Sum('total_alunos_ativos'), 0),
+            total_vagas=Coalesce(Sum('vagas_total'), 0),
+        )
+        totais['vagas_disponiveis'] = totais['total_vagas'] - totais['total_alunos']
+        return totais
+
+
 class Turma(models.Model):
     """Model para Turmas"""
     TIPO_ENSINO_CHOICES = [
@@ -94,6 +120,8 @@ class Turma(models.Model):
     # Controle
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação", null=True, blank=True)
     usuario_criacao = models.ForeignKey(User, on_delete=models.PROTECT, verbose_name="Criado por", null=True, blank=True)
+
+    objects = TurmaQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Turma"
@@ -105,7 +133,9 @@ class Turma(models.Model):
         return f"{self.nome} - {self.periodo_letivo}"
     
     def get_total_alunos(self):
-        """Retorna total de alunos enturmados"""
+        """Retorna total de alunos enturmados (usa a anotação de with_ocupacao quando presente)"""
+        if hasattr(self, 'total_alunos_ativos'):
+            return self.total_alunos_ativos
         return self.enturmacoes.filter(ativo=True).count()
     
     def get_vagas_disponiveis(self):
@@ -198,7 +228,17 @@ class Disciplina(models.Model):
         super().save(*args, **kwargs)
 
     def gerar_codigo_automatico(self):
-        """Gera código estiloso baseado no nome da disciplina"""
+        """Gera código estiloso baseado no nome da disciplina (ex.: MAT001)"""
+        from utilitarios.services import proximo_codigo
+        return proximo_codigo(self.prefixo_codigo(), em_uso=Disciplina.codigos_em_uso)
+
+    @staticmethod
+    def codigos_em_uso(codigos):
+        """Retorna, entre os códigos informados, os que já pertencem a alguma disciplina"""
+        return Disciplina.objects.filter(codigo__in=codigos).order_by().values_list('codigo', flat=True)
+
+    def prefixo_codigo(self):
+        """Prefixo do código automático: sigla das disciplinas comuns ou iniciais do nome"""
         import re
 
         # Remover acentos e caracteres especiais
@@ -239,13 +279,7 @@ class Disciplina(models.Model):
         # Verificar se é uma disciplina especial
         for disciplina_key, codigo_base in codigos_especiais.items():
             if disciplina_key in nome_limpo:
-                # Gerar número sequencial
-                contador = 1
-                while True:
-                    codigo_proposto = f"{codigo_base}{contador:03d}"
-                    if not Disciplina.objects.filter(codigo=codigo_proposto).exists():
-                        return codigo_proposto
-                    contador += 1
+                return codigo_base
 
         # Para disciplinas não mapeadas, usar primeiras letras
         palavras = nome_limpo.split()
@@ -256,13 +290,7 @@ class Disciplina(models.Model):
             # Uma palavra só, pegar primeiras 3-4 letras
             codigo_base = palavras[0][:4] if len(palavras[0]) >= 4 else palavras[0]
 
-        # Gerar número sequencial
-        contador = 1
-        while True:
-            codigo_proposto = f"{codigo_base}{contador:03d}"
-            if not Disciplina.objects.filter(codigo=codigo_proposto).exists():
-                return codigo_proposto
-            contador += 1
+        return codigo_base
 
     def __str__(self):
         return self.nome
@@ -329,6 +357,10 @@ class LancamentoNota(models.Model):
         verbose_name = "Lançamento de Nota/Frequência"
         verbose_name_plural = "Lançamentos de Notas/Frequência"
         unique_together = ['turma', 'disciplina', 'divisao_periodo', 'aluno']
+        indexes = [
+            # Lista de lançamentos paginada por cursor (data_lancamento, id)
+            models.Index(fields=['-data_lancamento', '-id'], name='lancamento_nota_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.aluno.nome} - {self.disciplina.nome} - {self.divisao_periodo.nome}"
@@ -537,6 +569,12 @@ class Enturmacao(models.Model):
         verbose_name_plural = "Enturmações"
         unique_together = ['aluno', 'ativo']
         ordering = ['turma', 'aluno__nome']
+        indexes = [
+            # Alunos ativos da turma (diário, chamada, notas, enturmação)
+            models.Index(
+                fields=['turma', 'aluno'], condition=models.Q(ativo=True), name='enturmacao_ativa_turma_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.aluno.nome} - {self.turma.nome}"
@@ -615,6 +653,32 @@ class TipoAvaliacao(models.Model):
         return self.nome
 
 
+class AvaliacaoQuerySet(models.QuerySet):
+    """QuerySet de Avaliações com estatísticas de notas calculadas no banco"""
+
+    def with_estatisticas(self):
+        """
+        Anota cada avaliação com notas_lancadas_count, ausentes_count,
+        media_turma e completude_pct (notas lançadas / alunos ativos da turma)
+        """
+        alunos_ativos = Enturmacao.objects.filter(
+            turma=OuterRef('turma'),
+            ativo=True
+        ).order_by().values('turma').annotate(total=Count('pk')).values('total')
+        return self.annotate(
+            notas_lancadas_count=Count('notas', filter=Q(notas__nota__isnull=False)),
+            ausentes_count=Count('notas', filter=Q(notas__ausente=True)),
+            media_turma=Avg('notas__nota'),
+            alunos_ativos_count=Coalesce(Subquery(alunos_ativos, output_field=models.IntegerField()), 0),
+        ).annotate(
+            completude_pct=Coalesce(
+                Cast(F('notas_lancadas_count'), FloatField()) * 100 / NullIf(F('alunos_ativos_count'), 0),
+                0.0,
+                output_field=FloatField()
+            )
+        )
+
+
 class Avaliacao(models.Model):
     """Model para avaliações aplicadas"""
     turma = models.ForeignKey(Turma, on_delete=models.CASCADE, related_name='avaliacoes', verbose_name="Turma")
@@ -636,10 +700,23 @@ class Avaliacao(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
 
+    objects = AvaliacaoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Avaliação"
         verbose_name_plural = "Avaliações"
         ordering = ['-data_aplicacao', 'nome']
+        indexes = [
+            # Avaliações da turma/disciplina no diário, filtradas por divisão do período
+            models.Index(fields=['turma', 'disciplina', 'divisao_periodo'], name='avaliacao_turma_disc_idx'),
+            models.Index(fields=['turma', '-data_aplicacao'], name='avaliacao_turma_data_idx'),
+            # Lista geral paginada por cursor (data_aplicacao, id)
+            models.Index(fields=['-data_aplicacao', '-id'], name='avaliacao_data_idx'),
+            # Avaliações com notas pendentes (resumo do dashboard): só as pendentes entram no índice
+            models.Index(
+                fields=['turma'], condition=models.Q(notas_lancadas=False), name='avaliacao_pendente_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.nome} - {self.turma.nome} - {self.disciplina.nome}"
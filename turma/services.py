@@ -0,0 +1,362 @@
+"""Serviços de escrita em lote do módulo Turma/Diário"""
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from alunos.models import Aluno
+from dashboard.services import invalidar_resumo_dashboard
+from opcoes.services import invalidar_relatorios
+from utilitarios.decorators import repetir_se_bloqueado
+from utilitarios.services import alocar_codigos
+from .models import RegistroFrequencia, NotaAvaliacao, Enturmacao, Avaliacao, Disciplina
+
+
+@repetir_se_bloqueado
+def registrar_frequencias(aula, situacoes, usuario):
+    """
+    Registra a frequência de vários alunos de uma aula em lote.
+
+    `situacoes` é um dicionário {codigo_aluno: situacao}. Os registros
+    existentes da aula são carregados em uma única consulta e todas as
+    inclusões/alterações são gravadas com um único upsert, respeitando o
+    unique_together ['aula', 'aluno'] de RegistroFrequencia.
+
+    Retorna um dicionário com as quantidades de registros criados,
+    atualizados e inalterados.
+    """
+    resultado = {'criados': 0, 'atualizados': 0, 'inalterados': 0}
+
+    with transaction.atomic():
+        existentes = dict(
+            RegistroFrequencia.objects.filter(aula=aula).values_list('aluno_id', 'situacao')
+        )
+
+        registros = []
+        for aluno_id, situacao in situacoes.items():
+            situacao_atual = existentes.get(aluno_id)
+            if situacao_atual == situacao:
+                resultado['inalterados'] += 1
+                continue
+
+            resultado['criados' if situacao_atual is None else 'atualizados'] += 1
+            registros.append(RegistroFrequencia(
+                aula=aula,
+                aluno_id=aluno_id,
+                situacao=situacao,
+                usuario_registro=usuario
+            ))
+
+        if registros:
+            RegistroFrequencia.objects.bulk_create(
+                registros,
+                update_conflicts=True,
+                unique_fields=['aula', 'aluno'],
+                update_fields=['situacao'],
+            )
+
+    return resultado
+
+
+class GradeMatrix:
+    """
+    Matriz densa aluno × avaliação com as notas de uma turma/disciplina.
+
+    As notas são carregadas em uma única consulta sobre NotaAvaliacao
+    (com a Avaliacao via select_related). Células sem nota lançada ficam
+    como None. As médias são ponderadas pelo peso de cada avaliação e
+    normalizadas para a escala 0-10 pelo valor_maximo.
+    """
+
+    ESCALA = 10
+
+    def __init__(self, alunos, avaliacoes, notas):
+        self.alunos = list(alunos)
+        self.avaliacoes = list(avaliacoes)
+        self._celulas = {(nota.aluno_id, nota.avaliacao_id): nota for nota in notas}
+
+    @classmethod
+    def build(cls, alunos, avaliacoes):
+        """Monta a matriz para os alunos e avaliações informados"""
+        alunos = list(alunos)
+        avaliacoes = list(avaliacoes)
+        notas = NotaAvaliacao.objects.filter(
+            avaliacao__in=[avaliacao.pk for avaliacao in avaliacoes],
+            aluno__in=[aluno.pk for aluno in alunos]
+        ).select_related('avaliacao').order_by()
+        return cls(alunos, avaliacoes, notas)
+
+    @classmethod
+    def para_turma(cls, turma, disciplina, divisao=None):
+        """Monta a matriz dos alunos enturmados de uma turma para a disciplina (e divisão)"""
+        avaliacoes = Avaliacao.objects.filter(turma=turma, disciplina=disciplina)
+        if divisao is not None:
+            avaliacoes = avaliacoes.filter(divisao_periodo=divisao)
+        alunos = turma.get_alunos_enturmados().order_by('nome')
+        return cls.build(alunos, avaliacoes.order_by('data_aplicacao'))
+
+    def get(self, aluno_id, avaliacao_id):
+        """Retorna a NotaAvaliacao da célula ou None"""
+        return self._celulas.get((aluno_id, avaliacao_id))
+
+    def linha(self, aluno_id):
+        """Retorna {avaliacao_id: NotaAvaliacao ou None} para um aluno"""
+        return {avaliacao.pk: self.get(aluno_id, avaliacao.pk) for avaliacao in self.avaliacoes}
+
+    def grid(self):
+        """Retorna {aluno_id: {avaliacao_id: NotaAvaliacao ou None}}"""
+        return {aluno.pk: self.linha(aluno.pk) for aluno in self.alunos}
+
+    def notas_do_aluno(self, aluno_id):
+        """Retorna a lista de notas lançadas do aluno, na ordem das avaliações"""
+        return [nota for nota in self.linha(aluno_id).values() if nota is not None]
+
+    def media(self, aluno_id):
+        """Média ponderada (escala 0-10) das notas lançadas do aluno, ou None"""
+        soma = 0
+        soma_pesos = 0
+        for avaliacao in self.avaliacoes:
+            nota = self.get(aluno_id, avaliacao.pk)
+            if nota is None or nota.nota is None or nota.dispensado or not avaliacao.valor_maximo:
+                continue
+            soma += (nota.nota / avaliacao.valor_maximo) * self.ESCALA * avaliacao.peso
+            soma_pesos += avaliacao.peso
+        if not soma_pesos:
+            return None
+        return round(float(soma / soma_pesos), 2)
+
+    def medias(self):
+        """Retorna {aluno_id: média ponderada ou None}"""
+        return {aluno.pk: self.media(aluno.pk) for aluno in self.alunos}
+
+    def notas_lancadas(self, avaliacao_id):
+        """Quantidade de alunos da matriz com nota lançada na avaliação"""
+        return sum(
+            1 for aluno in self.alunos
+            if (nota := self.get(aluno.pk, avaliacao_id)) is not None and nota.nota is not None
+        )
+
+    def faltantes(self):
+        """Lista de (aluno, avaliacao) sem nota lançada e sem dispensa"""
+        return [
+            (aluno, avaliacao)
+            for aluno in self.alunos
+            for avaliacao in self.avaliacoes
+            if (nota := self.get(aluno.pk, avaliacao.pk)) is None
+            or (nota.nota is None and nota.conceito_id is None and not nota.dispensado)
+        ]
+
+
+def enturmacoes_ativas(alunos_ids):
+    """Retorna {codigo_aluno: Enturmacao ativa} para os alunos informados, em uma consulta"""
+    return {
+        enturmacao.aluno_id: enturmacao
+        for enturmacao in Enturmacao.objects.filter(
+            aluno__in=alunos_ids,
+            ativo=True
+        ).select_related('aluno', 'turma').order_by()
+    }
+
+
+@repetir_se_bloqueado
+def enturmar_alunos_em_lote(turma, alunos_ids, usuario):
+    """
+    Enturma vários alunos em uma turma com um número fixo de consultas.
+
+    Alunos com enturmação ativa em outra turma são transferidos: a
+    enturmação anterior é desativada ou, quando o aluno já possui uma
+    enturmação inativa, excluída (unique_together ['aluno', 'ativo']).
+    Alunos que excedem as vagas_total da turma não são enturmados.
+
+    Retorna uma lista, na ordem de `alunos_ids` (sem repetições), de
+    dicionários com o código informado, o status (ENTURMADO, TRANSFERIDO,
+    JA_ENTURMADO, SEM_VAGA ou NAO_ENCONTRADO), o aluno e a turma anterior.
+    """
+    codigos = list(dict.fromkeys(str(aluno_id) for aluno_id in alunos_ids))
+
+    with transaction.atomic():
+        alunos = Aluno.objects.in_bulk([int(codigo) for codigo in codigos if codigo.isdigit()])
+        ativas = enturmacoes_ativas(list(alunos))
+        vagas = turma.vagas_total - Enturmacao.objects.filter(turma=turma, ativo=True).count()
+
+        resultados = []
+        transferencias = []
+        novas = []
+        for codigo in codigos:
+            aluno = alunos.get(int(codigo)) if codigo.isdigit() else None
+            anterior = ativas.get(aluno.pk) if aluno else None
+            resultado = {
+                'aluno_id': codigo,
+                'aluno': aluno,
+                'turma_anterior': anterior.turma if anterior else None,
+            }
+            resultados.append(resultado)
+
+            if aluno is None:
+                resultado['status'] = 'NAO_ENCONTRADO'
+            elif anterior is not None and anterior.turma_id == turma.pk:
+                resultado['status'] = 'JA_ENTURMADO'
+            elif vagas <= 0:
+                resultado['status'] = 'SEM_VAGA'
+            else:
+                vagas -= 1
+                resultado['status'] = 'TRANSFERIDO' if anterior else 'ENTURMADO'
+                if anterior:
+                    transferencias.append(anterior)
+                novas.append(Enturmacao(
+                    turma=turma,
+                    aluno=aluno,
+                    ativo=True,
+                    usuario_enturmacao=usuario
+                ))
+
+        if transferencias:
+            transferidos = [enturmacao.aluno_id for enturmacao in transferencias]
+            com_inativa = set(
+                Enturmacao.objects.filter(
+                    aluno__in=transferidos,
+                    ativo=False
+                ).values_list('aluno_id', flat=True)
+            )
+            Enturmacao.objects.filter(
+                pk__in=[e.pk for e in transferencias if e.aluno_id in com_inativa]
+            ).delete()
+            Enturmacao.objects.filter(
+                pk__in=[e.pk for e in transferencias if e.aluno_id not in com_inativa]
+            ).update(
+                ativo=False,
+                data_desenturmacao=date.today(),
+                motivo_desenturmacao=f"Transferido para {turma.nome}",
+                usuario_desenturmacao=usuario
+            )
+
+        if novas:
+            Enturmacao.objects.bulk_create(novas)
+
+    # bulk_create/update não disparam post_save
+    invalidar_resumo_dashboard()
+    invalidar_relatorios()
+    return resultados
+
+
+def _converter_nota(valor):
+    """Converte o valor recebido em Decimal (None/'' limpam a nota); NaN e infinito são inválidos"""
+    if valor is None or valor == '':
+        return None
+    nota = Decimal(str(valor).replace(',', '.'))
+    if not nota.is_finite():
+        raise InvalidOperation
+    return nota
+
+
+def _converter_id(valor):
+    """Converte o id recebido em int, ou None se não for um número inteiro"""
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return None
+
+
+@repetir_se_bloqueado
+def lancar_notas_em_lote(turma, disciplina, alteracoes, usuario):
+    """
+    Lança (cria ou atualiza) várias notas de uma turma/disciplina de uma vez.
+
+    `alteracoes` é uma lista de dicionários {aluno_id, avaliacao_id, nota}.
+    Avaliações e alunos enturmados são carregados em duas consultas, cada
+    célula é validada em memória (avaliação da turma/disciplina, aluno
+    enturmado, 0 <= nota <= valor_maximo) e as células válidas são gravadas
+    com um único upsert em uma transação. Se a mesma célula aparecer mais
+    de uma vez, vale a última alteração.
+
+    Retorna a lista de resultados por célula, na ordem recebida.
+    """
+    avaliacoes_ids = {_converter_id(alteracao.get('avaliacao_id')) for alteracao in alteracoes} - {None}
+    alunos_ids = {_converter_id(alteracao.get('aluno_id')) for alteracao in alteracoes} - {None}
+
+    avaliacoes = Avaliacao.objects.filter(
+        turma=turma,
+        disciplina=disciplina
+    ).in_bulk(list(avaliacoes_ids))
+    enturmados = set(
+        Enturmacao.objects.filter(
+            turma=turma,
+            ativo=True,
+            aluno__in=list(alunos_ids)
+        ).values_list('aluno_id', flat=True)
+    )
+
+    resultados = []
+    celulas = {}
+    for alteracao in alteracoes:
+        aluno_id = alteracao.get('aluno_id')
+        avaliacao_id = alteracao.get('avaliacao_id')
+        resultado = {'aluno_id': aluno_id, 'avaliacao_id': avaliacao_id, 'success': False}
+        resultados.append(resultado)
+
+        avaliacao = avaliacoes.get(_converter_id(avaliacao_id))
+        if avaliacao is None:
+            resultado['message'] = 'Avaliação não encontrada para esta turma/disciplina.'
+            continue
+        aluno_pk = _converter_id(aluno_id)
+        if aluno_pk not in enturmados:
+            resultado['message'] = 'Aluno não enturmado nesta turma.'
+            continue
+
+        try:
+            nota = _converter_nota(alteracao.get('nota'))
+        except InvalidOperation:
+            resultado['message'] = 'Nota inválida.'
+            continue
+        if nota is not None and not (0 <= nota <= avaliacao.valor_maximo):
+            resultado['message'] = f'A nota deve estar entre 0 e {avaliacao.valor_maximo}.'
+            continue
+
+        resultado.update({
+            'success': True,
+            'nota': float(nota) if nota is not None else None,
+            'message': 'Nota salva com sucesso!',
+        })
+        celulas[(aluno_pk, avaliacao.pk)] = NotaAvaliacao(
+            avaliacao=avaliacao,
+            aluno_id=aluno_pk,
+            nota=nota,
+            usuario_lancamento=usuario
+        )
+
+    if celulas:
+        with transaction.atomic():
+            NotaAvaliacao.objects.bulk_create(
+                list(celulas.values()),
+                update_conflicts=True,
+                unique_fields=['avaliacao', 'aluno'],
+                update_fields=['nota', 'data_atualizacao'],
+            )
+
+    return resultados
+
+
+def criar_disciplinas_em_lote(disciplinas):
+    """
+    Cria várias disciplinas (instâncias não salvas) com um bulk_create.
+
+    As disciplinas sem código recebem códigos automáticos reservados com
+    uma alocação por prefixo (ex.: dez "Matemática" -> MAT001..MAT010),
+    pulando códigos já cadastrados ou informados no próprio lote.
+    """
+    disciplinas = list(disciplinas)
+    informados = {disciplina.codigo for disciplina in disciplinas if disciplina.codigo}
+
+    def em_uso(codigos):
+        return set(Disciplina.codigos_em_uso(codigos)) | (informados & set(codigos))
+
+    por_prefixo = {}
+    for disciplina in disciplinas:
+        if not disciplina.codigo:
+            por_prefixo.setdefault(disciplina.prefixo_codigo(), []).append(disciplina)
+
+    with transaction.atomic():
+        for prefixo, grupo in por_prefixo.items():
+            for disciplina, codigo in zip(grupo, alocar_codigos(prefixo, len(grupo), em_uso=em_uso)):
+                disciplina.codigo = codigo
+        return Disciplina.objects.bulk_create(disciplinas)
@@ -0,0 +1,28 @@
+"""Tarefas em segundo plano do app (executadas por manage.py run_workers)"""
+from utilitarios.fila import registrar_tarefa
+
+from .models import Turma
+from .services import enturmar_alunos_em_lote
+
+
+@registrar_tarefa('turma.enturmar_alunos')
+def enturmar_alunos(tarefa, turma_id, alunos_ids):
+    """
+    Enturma os alunos em lote em nome de quem pediu; o resultado traz o
+    status de cada código informado (ver enturmar_alunos_em_lote).
+    """
+    turma = Turma.objects.get(pk=turma_id)
+    tarefa.reportar_progresso(10, f'Enturmando {len(alunos_ids)} aluno(s) em {turma.nome}')
+    resultados = enturmar_alunos_em_lote(turma, alunos_ids, tarefa.usuario)
+    enturmados = sum(1 for r in resultados if r['status'] in ('ENTURMADO', 'TRANSFERIDO'))
+    sem_vaga = sum(1 for r in resultados if r['status'] == 'SEM_VAGA')
+
+    mensagem = f'{enturmados} aluno(s) enturmado(s) com sucesso!'
+    if sem_vaga:
+        mensagem += f' {sem_vaga} aluno(s) não enturmado(s) por falta de vagas.'
+    return {
+        'enturmados': enturmados,
+        'sem_vaga': sem_vaga,
+        'status': {r['aluno_id']: r['status'] for r in resultados},
+        'mensagem': mensagem,
+    }
@@ -1,8 +1,17 @@
-from django.test import TestCase, Client
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
 from datetime import date
-from turma.models import Turma, Disciplina, Enturmacao, Conceito, TipoAvaliacao, Avaliacao, NotaAvaliacao
+from decimal import Decimal
+from turma.models import (
+    Turma, Disciplina, Enturmacao, Conceito, TipoAvaliacao, Avaliacao, NotaAvaliacao,
+    AulaRegistrada, RegistroFrequencia, DivisaoPeriodoLetivo
+)
+from turma.services import registrar_frequencias, GradeMatrix, enturmar_alunos_em_lote, criar_disciplinas_em_lote
 from alunos.models import Aluno
+from utilitarios.fila import executar, reivindicar
 
 
 class TurmaModelTest(TestCase):
@@ -150,6 +159,33 @@ class DisciplinaModelTest(TestCase):
 
         self.assertEqual(str(disciplina), 'Português')
 
+    def test_codigos_sequenciais_sem_varredura(self):
+        """Teste 29: Verifica códigos sequenciais com número fixo de consultas, pulando códigos já usados"""
+        Disciplina.objects.create(nome='Matemática')
+        Disciplina.objects.create(nome='Matemática Aplicada', codigo='MAT002')
+
+        self.assertEqual(Disciplina.objects.create(nome='Matemática Financeira').codigo, 'MAT003')
+
+        # Alocação + verificação de uso + INSERT, independente de quantas já existem
+        with self.assertNumQueries(3):
+            quarta = Disciplina.objects.create(nome='Matemática Básica')
+        self.assertEqual(quarta.codigo, 'MAT004')
+        self.assertEqual(Disciplina.objects.create(nome='Robótica').codigo, 'ROBO001')
+
+    def test_criar_disciplinas_em_lote(self):
+        """Teste 30: Verifica a criação em lote com uma alocação de códigos por prefixo"""
+        Disciplina.objects.create(nome='História')
+        disciplinas = criar_disciplinas_em_lote(
+            [Disciplina(nome='História Geral') for _ in range(3)]
+            + [Disciplina(nome='História do Brasil', codigo='HIST003'), Disciplina(nome='Geografia')]
+        )
+
+        self.assertEqual(
+            [disciplina.codigo for disciplina in disciplinas],
+            ['HIST002', 'HIST004', 'HIST005', 'HIST003', 'GEO001']
+        )
+        self.assertEqual(Disciplina.objects.count(), 6)
+
 
 class EnturmacaoModelTest(TestCase):
     """Testes para o Model Enturmação (Camada de Domínio)"""
@@ -352,3 +388,403 @@ class TurmaViewsTest(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, '1º Ano D')
+
+
+class TurmaOcupacaoQuerySetTest(TestCase):
+    """Testes para as anotações de ocupação do TurmaQuerySet"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+
+        self.turma_a = Turma.objects.create(
+            nome='6º Ano A',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_FUNDAMENTAL_II',
+            ano_serie='6_ANO',
+            turno='MATUTINO',
+            vagas_total=20,
+            usuario_criacao=self.user
+        )
+        self.turma_b = Turma.objects.create(
+            nome='6º Ano B',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_FUNDAMENTAL_II',
+            ano_serie='6_ANO',
+            turno='VESPERTINO',
+            vagas_total=10,
+            usuario_criacao=self.user
+        )
+
+        for i in range(3):
+            aluno = Aluno.objects.create(
+                nome=f'Aluno {i}',
+                data_nascimento=date(2013, 1, 1),
+                sexo='F',
+                usuario_cadastro=self.user
+            )
+            Enturmacao.objects.create(
+                turma=self.turma_a,
+                aluno=aluno,
+                ativo=True,
+                usuario_enturmacao=self.user
+            )
+
+    def test_with_ocupacao_anota_total(self):
+        """Teste 19: Verifica a anotação de alunos ativos por turma"""
+        turmas = {t.pk: t for t in Turma.objects.with_ocupacao()}
+
+        with self.assertNumQueries(0):
+            self.assertEqual(turmas[self.turma_a.pk].get_total_alunos(), 3)
+            self.assertEqual(turmas[self.turma_a.pk].get_vagas_disponiveis(), 17)
+            self.assertEqual(turmas[self.turma_a.pk].get_percentual_ocupacao(), 15)
+            self.assertEqual(turmas[self.turma_b.pk].get_total_alunos(), 0)
+
+    def test_ocupacao_totais(self):
+        """Teste 20: Verifica os totais globais de ocupação em uma consulta"""
+        with self.assertNumQueries(1):
+            totais = Turma.objects.all().ocupacao_totais()
+
+        self.assertEqual(totais['total_turmas'], 2)
+        self.assertEqual(totais['total_alunos'], 3)
+        self.assertEqual(totais['total_vagas'], 30)
+        self.assertEqual(totais['vagas_disponiveis'], 27)
+
+
+class RegistrarFrequenciasServiceTest(TestCase):
+    """Testes para o serviço de frequência em lote"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+
+        self.turma = Turma.objects.create(
+            nome='7º Ano A',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_FUNDAMENTAL_II',
+            ano_serie='7_ANO',
+            turno='MATUTINO',
+            usuario_criacao=self.user
+        )
+        self.disciplina = Disciplina.objects.create(nome='Geografia', carga_horaria=60)
+        self.aula = AulaRegistrada.objects.create(
+            turma=self.turma,
+            disciplina=self.disciplina,
+            professor=self.user,
+            data_aula=date(2025, 3, 10),
+            horario_inicio='08:00',
+            horario_fim='12:00',
+            conteudo_programatico='Relevo'
+        )
+        self.alunos = [
+            Aluno.objects.create(
+                nome=f'Aluno {i}',
+                data_nascimento=date(2012, 1, 1),
+                sexo='M',
+                usuario_cadastro=self.user
+            )
+            for i in range(3)
+        ]
+
+    def test_registra_e_atualiza_em_lote(self):
+        """Teste 21: Verifica criação e atualização de frequências em lote"""
+        situacoes = {aluno.codigo: 'PRESENTE' for aluno in self.alunos}
+        resultado = registrar_frequencias(self.aula, situacoes, self.user)
+
+        self.assertEqual(resultado, {'criados': 3, 'atualizados': 0, 'inalterados': 0})
+        self.assertEqual(RegistroFrequencia.objects.filter(aula=self.aula).count(), 3)
+
+        situacoes[self.alunos[0].codigo] = 'AUSENTE'
+        with self.assertNumQueries(4):  # savepoint, leitura, upsert, release
+            resultado = registrar_frequencias(self.aula, situacoes, self.user)
+
+        self.assertEqual(resultado, {'criados': 0, 'atualizados': 1, 'inalterados': 2})
+        registro = RegistroFrequencia.objects.get(aula=self.aula, aluno=self.alunos[0])
+        self.assertEqual(registro.situacao, 'AUSENTE')
+        self.assertEqual(RegistroFrequencia.objects.filter(aula=self.aula).count(), 3)
+
+    def test_chamada_carrega_situacoes_sem_n_mais_1(self):
+        """Teste 28: Verifica que a chamada carrega as situações registradas sem uma consulta por aluno"""
+        for aluno in self.alunos:
+            Enturmacao.objects.create(turma=self.turma, aluno=aluno, usuario_enturmacao=self.user)
+        situacoes = {aluno.codigo: 'PRESENTE' for aluno in self.alunos}
+        situacoes[self.alunos[1].codigo] = 'AUSENTE'
+        registrar_frequencias(self.aula, situacoes, self.user)
+
+        divisao = DivisaoPeriodoLetivo.objects.create(
+            nome='1º Bimestre',
+            tipo_divisao='BIMESTRE',
+            periodo_letivo='2025',
+            ordem=1,
+            data_inicio=date(2025, 2, 1),
+            data_fim=date(2025, 4, 30)
+        )
+
+        self.client.login(username='testuser', password='testpass123')
+        url = (
+            f'/turmas/turma/{self.turma.pk}/fazer-chamada/'
+            f'?disciplina={self.disciplina.pk}&divisao={divisao.pk}&data=2025-03-10'
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [aluno.status_atual for aluno in response.context['alunos']], ['PRESENTE', 'AUSENTE', 'PRESENTE']
+        )
+
+        # Mais alunos registrados na aula não aumentam o número de consultas
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(url)
+        novo = Aluno.objects.create(
+            nome='Aluno 3', data_nascimento=date(2012, 1, 1), sexo='F', usuario_cadastro=self.user
+        )
+        Enturmacao.objects.create(turma=self.turma, aluno=novo, usuario_enturmacao=self.user)
+        registrar_frequencias(self.aula, {novo.codigo: 'ATRASADO'}, self.user)
+        with self.assertNumQueries(len(consultas)):
+            self.client.get(url)
+
+
+class GradeMatrixTest(TestCase):
+    """Testes para a matriz de notas aluno × avaliação"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+
+        self.turma = Turma.objects.create(
+            nome='8º Ano A',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_FUNDAMENTAL_II',
+            ano_serie='8_ANO',
+            turno='MATUTINO',
+            usuario_criacao=self.user
+        )
+        self.disciplina = Disciplina.objects.create(nome='Física', carga_horaria=60)
+        self.divisao = DivisaoPeriodoLetivo.objects.create(
+            nome='1º Bimestre',
+            tipo_divisao='BIMESTRE',
+            periodo_letivo='2025',
+            ordem=1,
+            data_inicio=date(2025, 2, 1),
+            data_fim=date(2025, 4, 30)
+        )
+        tipo = TipoAvaliacao.objects.create(nome='Prova')
+
+        self.prova = Avaliacao.objects.create(
+            turma=self.turma, disciplina=self.disciplina, divisao_periodo=self.divisao,
+            tipo_avaliacao=tipo, professor=self.user, nome='Prova 1',
+            data_aplicacao=date(2025, 3, 1), valor_maximo=10, peso=2
+        )
+        self.trabalho = Avaliacao.objects.create(
+            turma=self.turma, disciplina=self.disciplina, divisao_periodo=self.divisao,
+            tipo_avaliacao=tipo, professor=self.user, nome='Trabalho',
+            data_aplicacao=date(2025, 3, 15), valor_maximo=5, peso=1
+        )
+
+        self.ana = Aluno.objects.create(
+            nome='Ana', data_nascimento=date(2011, 1, 1), sexo='F', usuario_cadastro=self.user
+        )
+        self.bruno = Aluno.objects.create(
+            nome='Bruno', data_nascimento=date(2011, 1, 1), sexo='M', usuario_cadastro=self.user
+        )
+        for aluno in (self.ana, self.bruno):
+            Enturmacao.objects.create(turma=self.turma, aluno=aluno, usuario_enturmacao=self.user)
+
+        NotaAvaliacao.objects.create(avaliacao=self.prova, aluno=self.ana, nota=8, usuario_lancamento=self.user)
+        NotaAvaliacao.objects.create(avaliacao=self.trabalho, aluno=self.ana, nota=5, usuario_lancamento=self.user)
+        NotaAvaliacao.objects.create(avaliacao=self.prova, aluno=self.bruno, nota=6, usuario_lancamento=self.user)
+
+    def test_grid_densa(self):
+        """Teste 22: Verifica a matriz densa com células vazias"""
+        matriz = GradeMatrix.para_turma(self.turma, self.disciplina, self.divisao)
+        grid = matriz.grid()
+
+        self.assertEqual(grid[self.ana.pk][self.prova.pk].nota, 8)
+        self.assertIsNone(grid[self.bruno.pk][self.trabalho.pk])
+        self.assertEqual(matriz.notas_lancadas(self.prova.pk), 2)
+        self.assertEqual(matriz.faltantes(), [(matriz.alunos[1], matriz.avaliacoes[1])])
+
+    def test_avaliacao_with_estatisticas(self):
+        """Teste 26: Verifica as anotações de estatísticas do AvaliacaoQuerySet"""
+        NotaAvaliacao.objects.create(
+            avaliacao=self.trabalho, aluno=self.bruno, ausente=True, usuario_lancamento=self.user
+        )
+
+        with self.assertNumQueries(1):
+            avaliacoes = {a.pk: a for a in Avaliacao.objects.with_estatisticas()}
+
+        prova = avaliacoes[self.prova.pk]
+        self.assertEqual(prova.notas_lancadas_count, 2)
+        self.assertEqual(prova.ausentes_count, 0)
+        self.assertEqual(prova.media_turma, 7)
+        self.assertEqual(prova.completude_pct, 100.0)
+
+        trabalho = avaliacoes[self.trabalho.pk]
+        self.assertEqual(trabalho.notas_lancadas_count, 1)
+        self.assertEqual(trabalho.ausentes_count, 1)
+        self.assertEqual(trabalho.completude_pct, 50.0)
+
+    def test_lancar_notas_lote_view(self):
+        """Teste 27: Verifica o endpoint de lançamento de notas em lote"""
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+
+        response = client.post(
+            f'/turmas/turma/{self.turma.pk}/lancar-notas/lote/',
+            data={
+                'disciplina_id': self.disciplina.pk,
+                'notas': [
+                    {'aluno_id': self.bruno.pk, 'avaliacao_id': self.trabalho.pk, 'nota': '4,5'},
+                    {'aluno_id': self.ana.pk, 'avaliacao_id': self.prova.pk, 'nota': 9},
+                    {'aluno_id': self.ana.pk, 'avaliacao_id': self.trabalho.pk, 'nota': 6},
+                    # NaN e ids com dígitos que int() não aceita viram erro da célula, não 500
+                    {'aluno_id': self.bruno.pk, 'avaliacao_id': self.prova.pk, 'nota': 'NaN'},
+                    {'aluno_id': self.bruno.pk, 'avaliacao_id': self.prova.pk, 'nota': 'sNaN'},
+                    {'aluno_id': self.bruno.pk, 'avaliacao_id': '²', 'nota': 7},
+                    {'aluno_id': '²', 'avaliacao_id': self.prova.pk, 'nota': 7},
+                ]
+            },
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data['success'])
+        self.assertEqual(data['salvas'], 2)
+        self.assertEqual([r['success'] for r in data['resultados']], [True, True, False, False, False, False, False])
+        self.assertEqual(data['resultados'][3]['message'], 'Nota inválida.')
+        self.assertEqual(NotaAvaliacao.objects.get(avaliacao=self.trabalho, aluno=self.bruno).nota, Decimal('4.5'))
+        self.assertEqual(NotaAvaliacao.objects.get(avaliacao=self.prova, aluno=self.ana).nota, 9)
+        self.assertEqual(NotaAvaliacao.objects.get(avaliacao=self.trabalho, aluno=self.ana).nota, 5)
+
+        # Disciplina que não é um id inteiro: mesmo erro 400 do corpo inválido
+        for disciplina_id in ('abc', ['1'], {'id': 1}):
+            response = client.post(
+                f'/turmas/turma/{self.turma.pk}/lancar-notas/lote/',
+                data={'disciplina_id': disciplina_id, 'notas': []},
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.json()['success'])
+
+        # A página de lançamento envia as notas pendentes para este endpoint
+        pagina = client.get(
+            f'/turmas/turma/{self.turma.pk}/lancar-notas/?disciplina={self.disciplina.pk}&divisao={self.divisao.pk}'
+        )
+        self.assertContains(pagina, f'/turmas/turma/{self.turma.pk}/lancar-notas/lote/')
+
+    def test_media_ponderada(self):
+        """Teste 23: Verifica a média ponderada por peso e valor máximo"""
+        matriz = GradeMatrix.para_turma(self.turma, self.disciplina, self.divisao)
+
+        with self.assertNumQueries(0):
+            medias = matriz.medias()
+
+        # Ana: (8 * 2 + 10 * 1) / 3
+        self.assertEqual(medias[self.ana.pk], 8.67)
+        self.assertEqual(medias[self.bruno.pk], 6.0)
+
+
+class EnturmarAlunosEmLoteTest(TestCase):
+    """Testes para o serviço de enturmação em lote"""
+
+    def setUp(self):
+        """Configuração inicial"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+
+        self.origem = Turma.objects.create(
+            nome='1º Ano EM A',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_MEDIO',
+            ano_serie='1_ANO_EM',
+            turno='MATUTINO',
+            usuario_criacao=self.user
+        )
+        self.destino = Turma.objects.create(
+            nome='1º Ano EM B',
+            periodo_letivo='2025',
+            tipo_ensino='ENSINO_MEDIO',
+            ano_serie='1_ANO_EM',
+            turno='VESPERTINO',
+            vagas_total=3,
+            usuario_criacao=self.user
+        )
+        self.alunos = [
+            Aluno.objects.create(
+                nome=f'Aluno {i}',
+                data_nascimento=date(2009, 1, 1),
+                sexo='M',
+                usuario_cadastro=self.user
+            )
+            for i in range(4)
+        ]
+
+        # Aluno 0 já está no destino, aluno 1 está na origem
+        Enturmacao.objects.create(turma=self.destino, aluno=self.alunos[0], usuario_enturmacao=self.user)
+        Enturmacao.objects.create(turma=self.origem, aluno=self.alunos[1], usuario_enturmacao=self.user)
+
+    def test_resultados_por_aluno(self):
+        """Teste 24: Verifica enturmação, transferência, vagas e alunos inexistentes"""
+        ids = [str(aluno.codigo) for aluno in self.alunos] + ['999999']
+        resultados = enturmar_alunos_em_lote(self.destino, ids, self.user)
+
+        self.assertEqual(
+            [r['status'] for r in resultados],
+            ['JA_ENTURMADO', 'TRANSFERIDO', 'ENTURMADO', 'SEM_VAGA', 'NAO_ENCONTRADO']
+        )
+        self.assertEqual(resultados[1]['turma_anterior'], self.origem)
+        self.assertEqual(self.destino.get_total_alunos(), 3)
+
+        anterior = Enturmacao.objects.get(aluno=self.alunos[1], ativo=False)
+        self.assertEqual(anterior.turma, self.origem)
+        self.assertEqual(anterior.motivo_desenturmacao, 'Transferido para 1º Ano EM B')
+
+    def test_transferencia_com_enturmacao_inativa(self):
+        """Teste 25: Verifica transferência de aluno que já possui enturmação inativa"""
+        aluno = self.alunos[1]
+        Enturmacao.objects.filter(aluno=aluno).update(ativo=False)
+        Enturmacao.objects.create(turma=self.origem, aluno=aluno, usuario_enturmacao=self.user)
+        self.destino.vagas_total = 30
+        self.destino.save()
+
+        resultados = enturmar_alunos_em_lote(self.destino, [aluno.codigo], self.user)
+
+        self.assertEqual(resultados[0]['status'], 'TRANSFERIDO')
+        self.assertEqual(Enturmacao.objects.get(aluno=aluno, ativo=True).turma, self.destino)
+        self.assertEqual(Enturmacao.objects.filter(aluno=aluno).count(), 2)
+
+    def test_enturmacao_pela_fila(self):
+        """Teste 31: Verifica que a view enfileira a enturmação e a tela acompanha a tarefa"""
+        self.client.force_login(self.user)
+        url = f'/turmas/turmas/{self.destino.pk}/enturmar/'
+        dados = {'alunos': [self.alunos[1].codigo, self.alunos[2].codigo], 'confirmar_transferencia': '1'}
+
+        response = self.client.post(url, dados)
+        self.assertTemplateUsed(response, 'utilitarios/tarefa_andamento.html')
+        self.assertEqual(self.destino.get_total_alunos(), 1)
+
+        resultado = executar(reivindicar('teste')).resultado
+        self.assertEqual(resultado['enturmados'], 2)
+        self.assertEqual(resultado['status'][str(self.alunos[1].codigo)], 'TRANSFERIDO')
+        self.assertEqual(self.destino.get_total_alunos(), 3)
+
+        # Sem trabalhadores a enturmação acontece na própria requisição
+        with override_settings(TAREFAS_MODO='imediato'):
+            response = self.client.post(url, {'alunos': [self.alunos[3].codigo]})
+        self.assertRedirects(response, f'/turmas/turmas/{self.destino.pk}/', fetch_redirect_response=False)
+        mensagens = [str(mensagem) for mensagem in get_messages(response.wsgi_request)]
+        self.assertEqual(mensagens, [
+            '0 aluno(s) enturmado(s) com sucesso!', '1 aluno(s) não enturmado(s) por falta de vagas.'
+        ])
+
@@ -49,6 +49,7 @@ urlpatterns = [
     path('diario/turma/<int:turma_id>/', views.diario_turma, name='turma_diario'),
     path('turma/<int:turma_id>/fazer-chamada/', views.fazer_chamada, name='fazer_chamada'),
     path('turma/<int:turma_id>/lancar-notas/', views.lancar_notas_diario, name='lancar_notas_diario'),
+    path('turma/<int:turma_id>/lancar-notas/lote/', views.lancar_notas_lote, name='lancar_notas_lote'),
     path('turma/<int:turma_id>/gerenciar-avaliacoes/', views.gerenciar_avaliacoes_diario, name='gerenciar_avaliacoes_diario'),
     path('turma/<int:turma_id>/visualizar-avaliacoes/', views.visualizar_avaliacoes_diario, name='visualizar_avaliacoes_diario'),
     path('avaliacoes/<int:avaliacao_id>/editar/', views.editar_avaliacao_diario, name='editar_avaliacao_diario'),
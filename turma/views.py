@@ -1,11 +1,15 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Avg
+from django.db.models import Count
 from django.db import models
 from django.core.paginator import Paginator
 from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 from datetime import date, datetime
+from urllib.parse import urlencode
+import json
 from .models import (
     Conceito, Turma, Disciplina, LancamentoNota, AtestadoMedico,
     MediaGlobalConceito, RecuperacaoEspecial, ParecerDescritivo,
@@ -15,8 +19,14 @@ from .models import (
 )
 from diario.models import DiarioOnline, ConteudoAula
 from .forms import TurmaForm, DisciplinaForm, EnturmacaoForm
+from .services import (
+    registrar_frequencias, GradeMatrix, enturmacoes_ativas,
+    lancar_notas_em_lote, _converter_id
+)
 from alunos.models import Aluno
 from dashboard.models import AtividadeRecente
+from utilitarios.fila import enfileirar
+from utilitarios.paginacao import PaginadorCursor
 
 
 @login_required
@@ -63,21 +73,18 @@ def turmas_list(request):
     if turno:
         turmas = turmas.filter(turno=turno)
     
-    # Forçar recalculo dos dados das turmas para evitar cache
-    for turma in turmas:
-        # Força recálculo dos métodos para cada turma
-        turma._prefetched_objects_cache = {}
-    
-    paginator = Paginator(turmas, 12)
+    # Ocupação anotada no banco: cada linha da página já traz o total de alunos
+    paginator = Paginator(turmas.with_ocupacao(), 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Calcular estatísticas atualizadas
-    total_turmas = turmas.count()
-    total_alunos_enturmados = sum([turma.get_total_alunos() for turma in turmas])
-    total_vagas = sum([turma.vagas_total for turma in turmas])
+    # Estatísticas globais calculadas em uma única consulta agregada
+    totais = turmas.ocupacao_totais()
+    total_turmas = totais['total_turmas']
+    total_alunos_enturmados = totais['total_alunos']
+    total_vagas = totais['total_vagas']
     vagas_ocupadas = total_alunos_enturmados
-    vagas_disponiveis = total_vagas - vagas_ocupadas
+    vagas_disponiveis = totais['vagas_disponiveis']
     
     context = {
         'page_obj': page_obj,
@@ -109,7 +116,7 @@ def turma_create(request):
             messages.success(request, f'Turma "{turma.nome}" criada com sucesso!')
             
             # Registrar atividade
-            AtividadeRecente.objects.create(
+            AtividadeRecente.registrar_atividade(
                 usuario=request.user,
                 acao='CREATE',
                 modulo='AVALIACAO',
@@ -146,7 +153,7 @@ def turma_edit(request, pk):
             messages.success(request, f'Turma "{turma.nome}" editada com sucesso!')
             
             # Registrar atividade
-            AtividadeRecente.objects.create(
+            AtividadeRecente.registrar_atividade(
                 usuario=request.user,
                 acao='UPDATE',
                 modulo='AVALIACAO',
@@ -192,7 +199,7 @@ def turma_delete(request, pk):
         messages.success(request, f'Turma "{nome_turma}" excluída com sucesso!')
         
         # Registrar atividade
-        AtividadeRecente.objects.create(
+        AtividadeRecente.registrar_atividade(
             usuario=request.user,
             acao='DELETE',
             modulo='AVALIACAO',
@@ -231,7 +238,7 @@ def disciplina_create(request):
             messages.success(request, f'Disciplina "{disciplina.nome}" criada com sucesso!')
             
             # Registrar atividade
-            AtividadeRecente.objects.create(
+            AtividadeRecente.registrar_atividade(
                 usuario=request.user,
                 acao='CREATE',
                 modulo='AVALIACAO',
@@ -258,7 +265,7 @@ def disciplina_edit(request, pk):
             messages.success(request, f'Disciplina "{disciplina.nome}" editada com sucesso!')
             
             # Registrar atividade
-            AtividadeRecente.objects.create(
+            AtividadeRecente.registrar_atividade(
                 usuario=request.user,
                 acao='UPDATE',
                 modulo='AVALIACAO',
@@ -284,7 +291,7 @@ def disciplina_delete(request, pk):
         messages.success(request, f'Disciplina "{nome_disciplina}" excluída com sucesso!')
         
         # Registrar atividade
-        AtividadeRecente.objects.create(
+        AtividadeRecente.registrar_atividade(
             usuario=request.user,
             acao='DELETE',
             modulo='AVALIACAO',
@@ -300,7 +307,9 @@ def disciplina_delete(request, pk):
 @login_required
 def notas_list(request):
     """Lista os lançamentos de notas"""
-    lancamentos = LancamentoNota.objects.all().order_by('-data_lancamento')
+    lancamentos = LancamentoNota.objects.select_related(
+        'aluno', 'turma', 'disciplina', 'conceito', 'usuario_lancamento'
+    )
     
     # Filtros
     turma_id = request.GET.get('turma')
@@ -311,9 +320,8 @@ def notas_list(request):
     if disciplina_id:
         lancamentos = lancamentos.filter(disciplina_id=disciplina_id)
     
-    paginator = Paginator(lancamentos, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginador = PaginadorCursor(lancamentos, ('-data_lancamento', '-id'), por_pagina=20)
+    page_obj = paginador.get_pagina(depois=request.GET.get('depois'), antes=request.GET.get('antes'))
     
     turmas = Turma.objects.all().order_by('nome')
     disciplinas = Disciplina.objects.all().order_by('nome')
@@ -326,7 +334,10 @@ def notas_list(request):
         'current_filters': {
             'turma': turma_id,
             'disciplina': disciplina_id,
-        }
+        },
+        'filtros_query': urlencode({
+            chave: valor for chave, valor in {'turma': turma_id, 'disciplina': disciplina_id}.items() if valor
+        }),
     }
     return render(request, 'turma/notas_list.html', context)
 
@@ -384,7 +395,7 @@ def avaliacao_create(request, turma_id=None):
             messages.success(request, f'Avaliação "{nome}" criada com sucesso!')
             
             # Registrar atividade
-            AtividadeRecente.objects.create(
+            AtividadeRecente.registrar_atividade(
                 usuario=request.user,
                 acao='CREATE',
                 modulo='AVALIACAO',
@@ -435,16 +446,16 @@ def enturmar_alunos(request, pk):
         alunos_ids = request.POST.getlist('alunos')
         confirmar_transferencia = request.POST.get('confirmar_transferencia')
         
-        # Primeira passagem: verificar se há alunos já enturmados
-        alunos_ja_enturmados = []
-        for aluno_id in alunos_ids:
-            aluno = get_object_or_404(Aluno, codigo=aluno_id)
-            enturmacao_existente = Enturmacao.objects.filter(aluno=aluno, ativo=True).first()
-            if enturmacao_existente:
-                alunos_ja_enturmados.append({
-                    'aluno': aluno,
-                    'turma_atual': enturmacao_existente.turma
-                })
+        # Primeira passagem: verificar se há alunos já enturmados (uma consulta)
+        alunos_ja_enturmados = [
+            {
+                'aluno': enturmacao.aluno,
+                'turma_atual': enturmacao.turma
+            }
+            for enturmacao in enturmacoes_ativas(
+                [aluno_id for aluno_id in alunos_ids if aluno_id.isdigit()]
+            ).values()
+        ]
         
         # Se há alunos já enturmados e não foi confirmado, mostrar confirmação
         if alunos_ja_enturmados and not confirmar_transferencia:
@@ -459,45 +470,20 @@ def enturmar_alunos(request, pk):
             }
             return render(request, 'turma/enturmar_alunos.html', context)
         
-        # Processar enturmações (normal ou com confirmação)
-        for aluno_id in alunos_ids:
-            aluno = get_object_or_404(Aluno, codigo=aluno_id)
-            
-            # Verificar se o aluno já está enturmado em QUALQUER turma ativa
-            if not Enturmacao.objects.filter(aluno=aluno, ativo=True).exists():
-                Enturmacao.objects.create(
-                    turma=turma,
-                    aluno=aluno,
-                    data_enturmacao=date.today(),
-                    ativo=True,
-                    usuario_enturmacao=request.user
-                )
-            else:
-                # Se aluno já está em outra turma, desenturmar da anterior
-                enturmacao_anterior = Enturmacao.objects.get(aluno=aluno, ativo=True)
-                
-                # Verificar se já existe enturmação inativa para este aluno
-                if Enturmacao.objects.filter(aluno=aluno, ativo=False).exists():
-                    # Se já existe, deletar a enturmação anterior em vez de desativar
-                    enturmacao_anterior.delete()
-                else:
-                    # Se não existe, pode desativar normalmente
-                    enturmacao_anterior.ativo = False
-                    enturmacao_anterior.data_desenturmacao = date.today()
-                    enturmacao_anterior.motivo_desenturmacao = f"Transferido para {turma.nome}"
-                    enturmacao_anterior.usuario_desenturmacao = request.user
-                    enturmacao_anterior.save()
-                
-                # Criar nova enturmação
-                Enturmacao.objects.create(
-                    turma=turma,
-                    aluno=aluno,
-                    data_enturmacao=date.today(),
-                    ativo=True,
-                    usuario_enturmacao=request.user
-                )
+        # Processar enturmações (normal ou com confirmação) em lote, na fila (turma/tarefas.py)
+        tarefa = enfileirar('turma.enturmar_alunos', usuario=request.user, turma_id=turma.pk, alunos_ids=alunos_ids)
+        if tarefa.status != 'CONCLUIDA':
+            return render(request, 'utilitarios/tarefa_andamento.html', {
+                'titulo': f'Enturmação - {turma.nome}',
+                'tarefa': tarefa,
+                'destino': reverse('turma:turma_detail', args=[pk]),
+                'voltar': reverse('turma:enturmar_alunos', args=[pk]),
+            })
         
-        messages.success(request, f'{len(alunos_ids)} aluno(s) enturmado(s) com sucesso!')
+        # Já executada (TAREFAS_MODO = 'imediato')
+        messages.success(request, f'{tarefa.resultado["enturmados"]} aluno(s) enturmado(s) com sucesso!')
+        if tarefa.resultado['sem_vaga']:
+            messages.warning(request, f'{tarefa.resultado["sem_vaga"]} aluno(s) não enturmado(s) por falta de vagas.')
         return redirect('turma:turma_detail', pk=pk)
     
     # Alunos já enturmados nesta turma
@@ -564,7 +550,7 @@ def desenturmar_aluno(request, pk, aluno_id):
 @login_required
 def diario_dashboard(request):
     """Dashboard do diário eletrônico - versão bonita"""
-    turmas = Turma.objects.all()
+    turmas = Turma.objects.with_ocupacao()
     total_turmas = turmas.count()
     diarios_ativos = total_turmas  # Para agora, consideramos todas as turmas como tendo diários ativos
     
@@ -670,7 +656,7 @@ def gerenciar_disciplinas_turma(request, turma_id):
 @login_required
 def avaliacoes_list(request):
     """Lista todas as avaliações"""
-    avaliacoes = Avaliacao.objects.all().order_by('-data_aplicacao')
+    avaliacoes = Avaliacao.objects.select_related('turma', 'disciplina', 'tipo_avaliacao')
     
     # Filtros
     turma_id = request.GET.get('turma')
@@ -685,9 +671,8 @@ def avaliacoes_list(request):
     if tipo_id:
         avaliacoes = avaliacoes.filter(tipo_avaliacao_id=tipo_id)
     
-    paginator = Paginator(avaliacoes, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginador = PaginadorCursor(avaliacoes, ('-data_aplicacao', '-id'), por_pagina=20)
+    page_obj = paginador.get_pagina(depois=request.GET.get('depois'), antes=request.GET.get('antes'))
     
     turmas = Turma.objects.all().order_by('nome')
     disciplinas = Disciplina.objects.all().order_by('nome')
@@ -699,12 +684,17 @@ def avaliacoes_list(request):
         'turmas': turmas,
         'disciplinas': disciplinas,
         'tipos': tipos,
+        'total_avaliacoes': page_obj.total,
         'current_filters': {
             'turma': turma_id,
             'disciplina': disciplina_id,
             'tipo': tipo_id,
             'status': status,
-        }
+        },
+        'filtros_query': urlencode({
+            chave: valor for chave, valor in
+            {'turma': turma_id, 'disciplina': disciplina_id, 'tipo': tipo_id, 'status': status}.items() if valor
+        }),
     }
     return render(request, 'turma/avaliacoes_list.html', context)
 
@@ -712,25 +702,22 @@ def avaliacoes_list(request):
 @login_required
 def avaliacao_detail(request, pk):
     """Detalhe de uma avaliação"""
-    avaliacao = get_object_or_404(Avaliacao, pk=pk)
-    notas = NotaAvaliacao.objects.filter(avaliacao=avaliacao)
+    avaliacao = get_object_or_404(Avaliacao.objects.with_estatisticas(), pk=pk)
+    notas = NotaAvaliacao.objects.filter(avaliacao=avaliacao).select_related('aluno')
     
-    # Estatísticas
-    if notas.exists():
-        media = notas.aggregate(Avg('nota'))['nota__avg']
-        maior_nota = notas.aggregate(models.Max('nota'))['nota__max']
-        menor_nota = notas.aggregate(models.Min('nota'))['nota__min']
-    else:
-        media = maior_nota = menor_nota = None
+    # Estatísticas (média/contagens anotadas; maior e menor nota em uma consulta)
+    extremos = notas.aggregate(maior_nota=models.Max('nota'), menor_nota=models.Min('nota'))
     
     context = {
         'avaliacao': avaliacao,
         'notas': notas,
         'estatisticas': {
-            'media': media,
-            'maior_nota': maior_nota,
-            'menor_nota': menor_nota,
-            'total_notas': notas.count(),
+            'media': avaliacao.media_turma,
+            'maior_nota': extremos['maior_nota'],
+            'menor_nota': extremos['menor_nota'],
+            'total_notas': avaliacao.notas_lancadas_count,
+            'ausentes': avaliacao.ausentes_count,
+            'completude': avaliacao.completude_pct,
         }
     }
     return render(request, 'turma/avaliacao_detail.html', context)
@@ -752,7 +739,7 @@ def avaliacao_edit(request, pk):
         messages.success(request, f'Avaliação "{avaliacao.nome}" editada com sucesso!')
         
         # Registrar atividade
-        AtividadeRecente.objects.create(
+        AtividadeRecente.registrar_atividade(
             usuario=request.user,
             acao='UPDATE',
             modulo='AVALIACAO',
@@ -779,7 +766,7 @@ def avaliacao_delete(request, pk):
         messages.success(request, f'Avaliação "{nome_avaliacao}" excluída com sucesso!')
         
         # Registrar atividade
-        AtividadeRecente.objects.create(
+        AtividadeRecente.registrar_atividade(
             usuario=request.user,
             acao='DELETE',
             modulo='AVALIACAO',
@@ -813,7 +800,7 @@ def get_anos_series_por_tipo(request):
 @login_required
 def diario_home(request):
     """Página inicial do Diário Eletrônico - Seleção de turma"""
-    turmas = Turma.objects.all().order_by('nome')
+    turmas = Turma.objects.with_ocupacao().order_by('nome')
     
     context = {
         'turmas': turmas,
@@ -897,25 +884,19 @@ def fazer_chamada(request, turma_id):
     # Carregar registros de frequência existentes
     registros_freq = {}
     if aula_data:
-        registros = RegistroFrequencia.objects.filter(aula=aula_data)
-        for registro in registros:
-            registros_freq[registro.aluno.codigo] = registro.situacao
+        registros_freq = dict(
+            RegistroFrequencia.objects.filter(aula=aula_data).values_list('aluno_id', 'situacao')
+        )
     
     # Adicionar status atual aos alunos
     alunos_list = list(alunos)
     for aluno in alunos_list:
-        aluno.status_atual = registros_freq.get(aluno.codigo, 'PRESENTE')
+        aluno.status_atual = registros_freq.get(aluno.pk, 'PRESENTE')
     
     if request.method == 'POST':
         # Processar dados da chamada
         data_aula = request.POST.get('data_aula', date.today().strftime('%Y-%m-%d'))
         
-        # Debug: verificar dados recebidos
-        print(f"POST data: {request.POST}")
-        for key, value in request.POST.items():
-            if key.startswith('toggle_'):
-                print(f"{key}: {value}")
-        
         # Primeiro, criar ou buscar uma aula para hoje
         try:
             aula, aula_created = AulaRegistrada.objects.get_or_create(
@@ -935,24 +916,14 @@ def fazer_chamada(request, turma_id):
             messages.error(request, f'Erro ao criar aula: {str(e)}')
             return redirect('diario:chamada', turma_id=turma_id)
         
-        for aluno in alunos:
-            # Novo sistema de toggle - o JavaScript envia o status do toggle
+        # Novo sistema de toggle - o JavaScript envia o status do toggle
+        situacoes = {}
+        for aluno in alunos_list:
             status_toggle = request.POST.get(f'toggle_{aluno.codigo}', 'presente')
-            presente = status_toggle == 'presente'
-            
-            # Registrar ou atualizar presença
-            registro, created = RegistroFrequencia.objects.get_or_create(
-                aula=aula,  # Agora incluindo a aula obrigatória
-                aluno=aluno,
-                defaults={
-                    'situacao': 'PRESENTE' if presente else 'AUSENTE',
-                    'usuario_registro': request.user
-                }
-            )
-            
-            if not created:
-                registro.situacao = 'PRESENTE' if presente else 'AUSENTE'
-                registro.save()
+            situacoes[aluno.codigo] = 'PRESENTE' if status_toggle == 'presente' else 'AUSENTE'
+        
+        # Registrar ou atualizar presenças em lote
+        registrar_frequencias(aula, situacoes, request.user)
         
         messages.success(request, f'Chamada do dia {date.today().strftime("%d/%m/%Y")} registrada com sucesso!')
         return redirect('diario:disciplina', turma_id=turma_id, disciplina_id=disciplina.pk)
@@ -989,91 +960,43 @@ def lancar_notas_diario(request, turma_id):
     if divisao_id:
         divisao = get_object_or_404(DivisaoPeriodoLetivo, pk=divisao_id)
 
+    # Handle AJAX request for saving grades (uma célula, mesmo caminho do lote)
+    if request.method == 'POST' and request.headers.get('Content-Type') == 'application/json':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({'success': False, 'message': 'JSON inválido.'}, status=400)
+        resultado = lancar_notas_em_lote(turma, disciplina, [data], request.user)[0]
+        return JsonResponse({
+            'success': resultado['success'],
+            'message': resultado['message'],
+            'nota': resultado.get('nota')
+        })
+
     # Buscar alunos da turma
     alunos = Aluno.objects.filter(
         enturmacoes__turma=turma,
         enturmacoes__ativo=True
     ).order_by('nome')
 
-    # Buscar avaliações da turma e disciplina
+    # Buscar avaliações da turma e disciplina (com contagem de notas anotada)
     avaliacoes = Avaliacao.objects.filter(
         turma=turma,
         disciplina=disciplina
-    ).order_by('nome')
-    
-    # Buscar notas existentes da disciplina
-    notas_existentes = NotaAvaliacao.objects.filter(
-        avaliacao__turma=turma,
-        avaliacao__disciplina=disciplina,
-        aluno__in=alunos
-    ).select_related('avaliacao', 'aluno')
+    ).with_estatisticas().order_by('nome')
     
-    # Adicionar notas aos alunos
-    alunos_list = list(alunos)
+    # Buscar notas existentes da disciplina (matriz aluno × avaliação em uma consulta)
+    matriz = GradeMatrix.build(alunos, avaliacoes)
+    alunos_list = matriz.alunos
     notas_dict = {}
-    for nota in notas_existentes:
-        if nota.aluno.codigo not in notas_dict:
-            notas_dict[nota.aluno.codigo] = []
-        notas_dict[nota.aluno.codigo].append(nota)
     
     # Adicionar as notas como atributo aos alunos
     for aluno in alunos_list:
-        aluno.notas_existentes = notas_dict.get(aluno.codigo, [])
-    
-    # Handle AJAX request for saving grades
-    if request.method == 'POST' and request.headers.get('Content-Type') == 'application/json':
-        import json
-        try:
-            data = json.loads(request.body)
-            aluno_id = data.get('aluno_id')
-            avaliacao_id = data.get('avaliacao_id')
-            nota_valor = data.get('nota')
-            
-            aluno = get_object_or_404(Aluno, codigo=aluno_id)  # Aluno usa 'codigo' como PK
-            avaliacao = get_object_or_404(Avaliacao, id=avaliacao_id)
-            
-            # Criar ou atualizar a nota
-            nota_obj, created = NotaAvaliacao.objects.get_or_create(
-                aluno=aluno,
-                avaliacao=avaliacao,
-                defaults={
-                    'nota': nota_valor,
-                    'usuario_lancamento': request.user
-                }
-            )
-            
-            if not created:
-                nota_obj.nota = nota_valor
-                nota_obj.save()
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Nota {nota_valor} salva com sucesso!',
-                'nota': float(nota_valor) if nota_valor else None
-            })
-        except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            print(f"Erro ao salvar nota: {error_detail}")
-            return JsonResponse({
-                'success': False,
-                'message': f'Erro ao salvar nota: {str(e)}',
-                'error_detail': error_detail,
-                'debug_info': {
-                    'aluno_id': data.get('aluno_id'),
-                    'avaliacao_id': data.get('avaliacao_id'),
-                    'nota_valor': data.get('nota'),
-                    'turma_id': turma.id,
-                    'disciplina_id': disciplina.id
-                }
-            })
-    
-    # Adicionar contagem real de notas para cada avaliação
-    for avaliacao in avaliacoes:
-        avaliacao.notas_existentes_count = NotaAvaliacao.objects.filter(
-            avaliacao=avaliacao,
-            nota__isnull=False
-        ).count()
+        aluno.notas_existentes = matriz.notas_do_aluno(aluno.codigo)
+        if aluno.notas_existentes:
+            notas_dict[aluno.codigo] = aluno.notas_existentes
     
     # Buscar tipos de avaliação para o formulário
     tipos_avaliacao = TipoAvaliacao.objects.all().order_by('nome')
@@ -1092,6 +1015,43 @@ def lancar_notas_diario(request, turma_id):
     return render(request, 'diario/lancar_notas_diario.html', context)
 
 
+@login_required
+@require_POST
+def lancar_notas_lote(request, turma_id):
+    """
+    Endpoint JSON para lançamento de várias notas de uma vez.
+
+    Corpo: {"disciplina_id": 1, "notas": [{"aluno_id": 1, "avaliacao_id": 2, "nota": 7.5}, ...]}
+    """
+    turma = get_object_or_404(Turma, pk=turma_id)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'message': 'JSON inválido.'}, status=400)
+
+    alteracoes = data.get('notas')
+    if not isinstance(alteracoes, list) or not all(isinstance(item, dict) for item in alteracoes):
+        return JsonResponse({'success': False, 'message': 'Informe a lista de notas.'}, status=400)
+
+    disciplina_id = _converter_id(data.get('disciplina_id') or request.GET.get('disciplina'))
+    if disciplina_id is None:
+        return JsonResponse({'success': False, 'message': 'Informe a disciplina.'}, status=400)
+
+    disciplina = get_object_or_404(Disciplina, pk=disciplina_id)
+    resultados = lancar_notas_em_lote(turma, disciplina, alteracoes, request.user)
+    salvas = sum(1 for resultado in resultados if resultado['success'])
+
+    return JsonResponse({
+        'success': salvas == len(resultados),
+        'salvas': salvas,
+        'erros': len(resultados) - salvas,
+        'resultados': resultados,
+    })
+
+
 @login_required
 def gerenciar_avaliacoes_diario(request, turma_id):
     """Gerencia avaliações no contexto do diário"""
@@ -1158,15 +1118,11 @@ def gerenciar_avaliacoes_diario(request, turma_id):
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({'success': False, 'error': error_msg})
     
-    # Buscar avaliações da turma e disciplina
+    # Buscar avaliações da turma e disciplina com estatísticas de notas
     avaliacoes = Avaliacao.objects.filter(
         turma=turma,
         disciplina=disciplina
-    ).order_by('nome')
-    
-    # Adicionar contagem de notas para cada avaliação
-    for avaliacao in avaliacoes:
-        avaliacao.total_notas_lancadas = NotaAvaliacao.objects.filter(avaliacao=avaliacao).count()
+    ).with_estatisticas().order_by('nome')
     
     # Buscar tipos de avaliação
     tipos_avaliacao = TipoAvaliacao.objects.all().order_by('nome')
@@ -1200,15 +1156,11 @@ def visualizar_avaliacoes_diario(request, turma_id):
     if divisao_id:
         divisao = get_object_or_404(DivisaoPeriodoLetivo, pk=divisao_id)
 
-    # Buscar avaliações da turma e disciplina
+    # Buscar avaliações da turma e disciplina com estatísticas de notas
     avaliacoes = Avaliacao.objects.filter(
         turma=turma,
         disciplina=disciplina
-    ).order_by('nome')
-
-    # Adicionar contagem de notas para cada avaliação
-    for avaliacao in avaliacoes:
-        avaliacao.total_notas_lancadas = NotaAvaliacao.objects.filter(avaliacao=avaliacao).count()
+    ).with_estatisticas().order_by('nome')
 
     context = {
         'turma': turma,
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class UtilitariosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'utilitarios'
+
+    def ready(self):
+        # Registra as tarefas em segundo plano (módulos tarefas.py dos apps, ver utilitarios/fila.py)
+        autodiscover_modules('tarefas')
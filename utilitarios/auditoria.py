@@ -0,0 +1,223 @@
+"""
+Gravação dos registros de atividade (AtividadeRecente) e de auditoria
+(RegistroAuditoria) fora do caminho da requisição.
+
+No modo AUDITORIA_MODO = 'assincrono' (padrão) os registros entram, após o
+commit da transação da requisição, numa fila em memória limitada que uma
+thread grava com bulk_create a cada AUDITORIA_LOTE registros ou
+AUDITORIA_INTERVALO_MS milissegundos. Com a fila cheia, ou depois do
+encerramento do processo ter começado, o registro é gravado na hora.
+Um lote que o banco recusa (ex.: conexão perdida) é regravado registro a
+registro. Registros ainda na fila são gravados no encerramento (atexit), mas
+se perdem se o processo for morto; quem precisa de durabilidade usa o modo
+'sincrono', que grava na própria requisição e transação.
+
+Como a data (auto_now_add) é preenchida na gravação, um registro assíncrono
+pode ficar com até AUDITORIA_INTERVALO_MS de diferença do momento da ação.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('assincrono', 'sincrono')
+
+
+class EscritorAuditoria:
+    """Fila limitada de registros gravados em lote por uma thread em segundo plano"""
+
+    def __init__(self, lote=100, intervalo_ms=200, fila_maxima=10000):
+        self.lote = lote
+        self.intervalo = intervalo_ms / 1000
+        self.fila = queue.Queue(maxsize=fila_maxima)
+        self._thread = None
+        self._trava = threading.Lock()
+        self._encerrando = threading.Event()
+
+    def enviar(self, instancia):
+        """Enfileira a instância (não salva) quando a transação atual for confirmada"""
+        transaction.on_commit(lambda: self._enfileirar(instancia))
+
+    def _enfileirar(self, instancia):
+        if self._encerrando.is_set():
+            _gravar_agora(instancia)
+            return
+        self._iniciar()
+        try:
+            self.fila.put_nowait(instancia)
+        except queue.Full:
+            logger.warning('Fila de auditoria cheia; gravando %s na própria requisição', instancia._meta.label)
+            _gravar_agora(instancia)
+
+    def _iniciar(self):
+        with self._trava:
+            if self._thread is None:
+                atexit.register(self.encerrar)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name='escritor-auditoria', daemon=True)
+                self._thread.start()
+
+    def _executar(self):
+        try:
+            while True:
+                pendentes = self._coletar()
+                if pendentes:
+                    # A thread vive mais que CONN_MAX_AGE e que reinícios do banco: descarta a conexão vencida
+                    close_old_connections()
+                    self._gravar(pendentes)
+                elif self._encerrando.is_set():
+                    break
+        finally:
+            connections.close_all()
+
+    def _coletar(self):
+        """Espera o primeiro registro e junta os seguintes até completar o lote ou o intervalo"""
+        try:
+            pendentes = [self.fila.get(timeout=self.intervalo)]
+        except queue.Empty:
+            return []
+        limite = time.monotonic() + self.intervalo
+        while len(pendentes) < self.lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                pendentes.append(self.fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return pendentes
+
+    def _gravar(self, pendentes):
+        por_model = {}
+        for instancia in pendentes:
+            por_model.setdefault(type(instancia), []).append(instancia)
+        try:
+            for model, instancias in por_model.items():
+                try:
+                    model.objects.bulk_create(instancias)
+                except Exception:
+                    logger.exception(
+                        'Falha ao gravar %s registros de %s em lote; gravando um a um',
+                        len(instancias), model._meta.label
+                    )
+                    instancias = self._gravar_um_a_um(instancias)
+                try:
+                    _apos_gravar(model, instancias)
+                except Exception:
+                    logger.exception('Falha ao atualizar os dados derivados de %s', model._meta.label)
+        finally:
+            for _ in pendentes:
+                self.fila.task_done()
+
+    def _gravar_um_a_um(self, instancias):
+        """Grava cada registro separadamente (só o que falhar de novo é perdido); retorna os gravados"""
+        if not transaction.get_connection().in_atomic_block:
+            # Se o lote falhou por conexão perdida, reconecta antes de tentar de novo
+            close_old_connections()
+        gravadas = []
+        for instancia in instancias:
+            try:
+                instancia.save()
+                gravadas.append(instancia)
+            except Exception:
+                logger.exception('Registro de %s descartado: %r', instancia._meta.label, instancia.__dict__)
+        return gravadas
+
+    def descarregar(self):
+        """Bloqueia até todos os registros enfileirados serem gravados"""
+        if self._thread is not None and self._thread.is_alive():
+            self.fila.join()
+
+    def encerrar(self, timeout=5):
+        """Para a thread gravando o que estiver na fila; o que sobrar é gravado aqui mesmo"""
+        self._encerrando.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        restantes = []
+        while True:
+            try:
+                restantes.append(self.fila.get_nowait())
+            except queue.Empty:
+                break
+        if restantes:
+            self._gravar(restantes)
+
+
+def atualizar_usuarios_auditados(registros):
+    """Inclui ou atualiza na tabela UsuarioAuditado os autores dos registros de auditoria"""
+    from .models import UsuarioAuditado
+
+    ultimas = {}
+    for registro in registros:
+        if registro.usuario_id not in ultimas or registro.data_acao > ultimas[registro.usuario_id]:
+            ultimas[registro.usuario_id] = registro.data_acao
+    UsuarioAuditado.objects.bulk_create(
+        [UsuarioAuditado(usuario_id=usuario_id, ultima_acao=data) for usuario_id, data in ultimas.items()],
+        update_conflicts=True,
+        unique_fields=['usuario'],
+        update_fields=['ultima_acao'],
+    )
+
+
+def _apos_gravar(model, instancias):
+    from .models import RegistroAuditoria
+
+    if model is RegistroAuditoria:
+        atualizar_usuarios_auditados(instancias)
+
+
+def _gravar_agora(instancia):
+    instancia.save()
+    _apos_gravar(type(instancia), [instancia])
+
+
+_escritor = None
+_trava_escritor = threading.Lock()
+
+
+def obter_escritor():
+    """Escritor do processo, criado na primeira utilização com as configurações AUDITORIA_*"""
+    global _escritor
+    with _trava_escritor:
+        if _escritor is None:
+            _escritor = EscritorAuditoria(
+                lote=settings.AUDITORIA_LOTE,
+                intervalo_ms=settings.AUDITORIA_INTERVALO_MS,
+                fila_maxima=settings.AUDITORIA_FILA_MAXIMA,
+            )
+        return _escritor
+
+
+def registrar(instancia):
+    """Grava uma instância (não salva) de AtividadeRecente ou RegistroAuditoria conforme AUDITORIA_MODO"""
+    modo = settings.AUDITORIA_MODO
+    if modo not in MODOS:
+        raise ImproperlyConfigured(f'AUDITORIA_MODO deve ser um de {MODOS}, não {modo!r}.')
+    if modo == 'sincrono':
+        _gravar_agora(instancia)
+    else:
+        obter_escritor().enviar(instancia)
+    return instancia
+
+
+def registrar_auditoria(request, acao, tela, funcionalidade, descricao, dados_alterados=None):
+    """Registra uma ação do usuário da requisição na auditoria (RF2002)"""
+    from .models import RegistroAuditoria
+
+    return registrar(RegistroAuditoria(
+        usuario=request.user,
+        acao=acao,
+        tela=tela,
+        funcionalidade=funcionalidade,
+        descricao=descricao,
+        ip_address=request.META.get('REMOTE_ADDR') or None,
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        dados_alterados=dados_alterados,
+    ))
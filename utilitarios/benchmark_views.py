@@ -0,0 +1,177 @@
+"""
+Benchmark das principais views: quantidade de consultas SQL, tempo de
+resposta e pico de memória de cada uma, com um orçamento de consultas
+declarado por view.
+
+Os casos usam objetos reais do banco (de preferência uma rede gerada com
+`generate_network`). O comando `benchmark_views` grava os resultados em
+JSON para comparação entre commits; o teste `BenchmarkViewsTest` falha
+quando alguma view ultrapassa o orçamento.
+"""
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+@dataclass(frozen=True)
+class CasoBenchmark:
+    """
+    View medida pelo benchmark. `args` e `parametros` são funções que
+    recebem o contexto (ver contexto_benchmark) e retornam os argumentos
+    da URL e a query string.
+    """
+    nome: str
+    url: str
+    orcamento: int
+    args: object = None
+    parametros: object = None
+
+    def montar_url(self, contexto):
+        args = self.args(contexto) if self.args else []
+        return reverse(self.url, args=args)
+
+    def montar_parametros(self, contexto):
+        return self.parametros(contexto) if self.parametros else {}
+
+
+def _turma(contexto):
+    return [contexto['turma']]
+
+
+def _divisao(contexto):
+    return {'disciplina': contexto['disciplina'], 'divisao': contexto['divisao']}
+
+
+# Orçamentos medidos com a sessão autenticada (2 consultas incluídas); não
+# dependem do tamanho da rede, então uma consulta a mais indica N+1.
+CASOS = [
+    CasoBenchmark('turmas_list', 'turma:turmas_list', 5),
+    CasoBenchmark(
+        'diario_divisao', 'diario:divisao', 11,
+        args=lambda c: [c['turma'], c['disciplina'], c['divisao']],
+    ),
+    CasoBenchmark('fazer_chamada', 'turma:fazer_chamada', 7, args=_turma, parametros=_divisao),
+    CasoBenchmark('lancar_notas_diario', 'turma:lancar_notas_diario', 10, args=_turma, parametros=_divisao),
+    CasoBenchmark('aluno_list', 'alunos:aluno_list', 8),
+    CasoBenchmark('aluno_list_busca', 'alunos:aluno_list', 8, parametros=lambda c: {'busca': c['termo_busca']}),
+    CasoBenchmark('dashboard_home', 'dashboard:home', 3),
+    CasoBenchmark('censo_home', 'censo:censo_home', 6),
+    CasoBenchmark('censo_escolar_ano', 'censo:censo_escolar_ano', 4, args=lambda c: [c['ano']]),
+    CasoBenchmark(
+        'censo_estatisticas', 'censo:relatorio_estatisticas', 4, parametros=lambda c: {'ano': c['ano']}
+    ),
+    CasoBenchmark('censo_matriculas', 'censo:relatorio_matriculas', 4),
+    CasoBenchmark('transporte_home', 'transporte:transporte_home', 9),
+    CasoBenchmark('avaliacoes_list', 'turma:avaliacoes_list', 4),
+    CasoBenchmark('notas_list', 'turma:notas_list', 5),
+    CasoBenchmark('auditoria', 'utilitarios:auditoria', 5),
+]
+
+
+def contexto_benchmark():
+    """Escolhe no banco a turma, a disciplina e a divisão usadas pelos casos"""
+    from alunos.models import Aluno
+    from turma.models import Avaliacao
+
+    avaliacao = Avaliacao.objects.filter(
+        turma__enturmacoes__ativo=True
+    ).select_related('turma').order_by('pk').first()
+    if avaliacao is None:
+        raise ValueError('O benchmark precisa de uma turma com alunos e avaliações (use generate_network).')
+    nome = Aluno.objects.order_by('pk').values_list('nome', flat=True).first()
+    return {
+        'turma': avaliacao.turma_id,
+        'disciplina': avaliacao.disciplina_id,
+        'divisao': avaliacao.divisao_periodo_id,
+        'ano': int(avaliacao.turma.periodo_letivo),
+        'termo_busca': nome.split()[0],
+    }
+
+
+@dataclass
+class ResultadoBenchmark:
+    nome: str
+    url: str
+    status: int
+    consultas: int
+    orcamento: int
+    tempos_ms: list = field(default_factory=list)
+    memoria_pico_kb: float = 0.0
+
+    @property
+    def dentro_do_orcamento(self):
+        return self.status == 200 and self.consultas <= self.orcamento
+
+    def como_dict(self):
+        return {
+            'url': self.url,
+            'status': self.status,
+            'consultas': self.consultas,
+            'orcamento': self.orcamento,
+            'tempo_ms': {
+                'mediana': round(statistics.median(self.tempos_ms), 2),
+                'minimo': round(min(self.tempos_ms), 2),
+                'maximo': round(max(self.tempos_ms), 2),
+            },
+            'memoria_pico_kb': round(self.memoria_pico_kb, 1),
+        }
+
+
+def medir(client, caso, contexto, repeticoes=3):
+    """
+    Mede uma view: uma requisição de aquecimento, uma com tracemalloc para
+    o pico de memória e `repeticoes` cronometradas. A quantidade de consultas
+    é a maior observada depois do aquecimento, que pode criar registros na
+    primeira visita (ex.: o diário da disciplina).
+    """
+    url = caso.montar_url(contexto)
+    parametros = caso.montar_parametros(contexto)
+
+    def requisitar():
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            resposta = client.get(url, parametros)
+            if resposta.streaming:
+                b''.join(resposta.streaming_content)
+            tempo = (time.perf_counter() - inicio) * 1000
+        return resposta.status_code, len(consultas), tempo
+
+    status, _, _ = requisitar()
+
+    tracemalloc.start()
+    try:
+        _, maximo_consultas, _ = requisitar()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tempos = []
+    for _ in range(repeticoes):
+        status_atual, total, tempo = requisitar()
+        status = status if status != 200 else status_atual
+        maximo_consultas = max(maximo_consultas, total)
+        tempos.append(tempo)
+
+    return ResultadoBenchmark(
+        nome=caso.nome,
+        url=url,
+        status=status,
+        consultas=maximo_consultas,
+        orcamento=caso.orcamento,
+        tempos_ms=tempos,
+        memoria_pico_kb=pico / 1024,
+    )
+
+
+def executar_benchmark(usuario, casos=None, repeticoes=3, contexto=None):
+    """Executa os casos autenticado como `usuario` e retorna a lista de resultados"""
+    client = Client()
+    client.force_login(usuario)
+    contexto = contexto or contexto_benchmark()
+    return [medir(client, caso, contexto, repeticoes) for caso in (casos or CASOS)]
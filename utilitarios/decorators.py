@@ -0,0 +1,51 @@
+import logging
+import time
+from functools import wraps
+
+from django.db import OperationalError, transaction
+
+logger = logging.getLogger(__name__)
+
+MENSAGENS_BLOQUEIO = ('database is locked', 'database table is locked')
+
+
+def bloqueio_transitorio(erro):
+    """True para erros de lock do SQLite que podem ser resolvidos tentando de novo"""
+    return any(mensagem in str(erro) for mensagem in MENSAGENS_BLOQUEIO)
+
+
+def repetir_se_bloqueado(funcao=None, *, tentativas=3, espera=0.1):
+    """
+    Repete a função de gravação quando o banco responde "database is
+    locked", até `tentativas` vezes com espera exponencial (espera,
+    2×espera, ...).
+
+    A função deve gravar em uma única transação (como os serviços de lote
+    de turma/services.py), para que uma tentativa que falhou não deixe nada
+    gravado. Use na gravação, não na view: repetir a view inteira
+    duplicaria mensagens e outros efeitos fora do banco. Dentro de um bloco
+    atômico externo a transação não pode ser repetida, então o erro é
+    propagado normalmente.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if transaction.get_connection().in_atomic_block:
+                return func(*args, **kwargs)
+
+            for tentativa in range(1, tentativas + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as erro:
+                    if tentativa == tentativas or not bloqueio_transitorio(erro):
+                        raise
+                    logger.warning(
+                        'Banco bloqueado em %s (tentativa %s de %s), repetindo',
+                        func.__qualname__, tentativa, tentativas
+                    )
+                    time.sleep(espera * 2 ** (tentativa - 1))
+        return wrapper
+
+    if funcao is not None:
+        return decorator(funcao)
+    return decorator
@@ -0,0 +1,158 @@
+"""
+Fila de tarefas em segundo plano gravada no próprio banco (model Tarefa),
+sem broker externo.
+
+As funções de tarefa ficam nos módulos `tarefas.py` dos apps, registradas
+com @registrar_tarefa('app.nome'), e recebem a Tarefa seguida dos
+argumentos passados a enfileirar(). Os trabalhadores (`manage.py
+run_workers`) reivindicam as pendentes com um UPDATE condicional, que no
+SQLite e no PostgreSQL garante que só um trabalhador fica com cada tarefa.
+
+Uma tarefa que levanta exceção volta para a fila com espera exponencial
+(TAREFAS_ESPERA_BASE, 2×, 4×... até TAREFAS_ESPERA_MAXIMA) até esgotar
+max_tentativas. Uma execução sem progresso por TAREFAS_TEMPO_LIMITE
+segundos (trabalhador morto) pode ser assumida por outro trabalhador.
+
+Com TAREFAS_MODO = 'imediato' (instalações sem trabalhadores, testes)
+enfileirar() executa a tarefa na hora, e a tela recebe a tarefa já
+finalizada; sem trabalhador para repeti-la, uma falha é definitiva.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('fila', 'imediato')
+
+REGISTRO = {}
+
+
+def registrar_tarefa(nome):
+    """Decorator que registra a função como tarefa `nome` (ex.: 'utilitarios.arquivar_auditoria')"""
+    def decorator(funcao):
+        REGISTRO[nome] = funcao
+        return funcao
+    return decorator
+
+
+def enfileirar(nome, *, usuario=None, atraso=None, max_tentativas=None, **argumentos):
+    """
+    Cria a tarefa `nome` com os argumentos (serializáveis em JSON) para os
+    trabalhadores executarem; `atraso` (segundos ou timedelta) adia o início.
+    Dentro de uma transação a tarefa só fica visível após o commit.
+    No modo 'imediato' a tarefa já volta executada.
+    """
+    modo = settings.TAREFAS_MODO
+    if modo not in MODOS:
+        raise ImproperlyConfigured(f'TAREFAS_MODO deve ser um de {MODOS}, não {modo!r}.')
+    if nome not in REGISTRO:
+        raise ValueError(f'Tarefa não registrada: {nome}')
+    if isinstance(atraso, (int, float)):
+        atraso = timedelta(seconds=atraso)
+    if modo == 'imediato':
+        agora = timezone.now()
+        tarefa = Tarefa.objects.create(
+            nome=nome,
+            argumentos=argumentos,
+            usuario=usuario,
+            status='EXECUTANDO',
+            tentativas=1,
+            max_tentativas=1,
+            trabalhador='imediato',
+            executar_apos=agora,
+            data_inicio=agora,
+            bloqueada_ate=agora + timedelta(seconds=settings.TAREFAS_TEMPO_LIMITE),
+        )
+        # Mesmos argumentos que um trabalhador receberia (lidos do JSON gravado)
+        tarefa.refresh_from_db(fields=['argumentos'])
+        return executar(tarefa)
+    return Tarefa.objects.create(
+        nome=nome,
+        argumentos=argumentos,
+        usuario=usuario,
+        max_tentativas=max_tentativas or settings.TAREFAS_MAX_TENTATIVAS,
+        executar_apos=timezone.now() + (atraso or timedelta()),
+    )
+
+
+def espera_nova_tentativa(tentativa):
+    """Espera antes da próxima execução depois da `tentativa`-ésima falha"""
+    return timedelta(seconds=min(
+        settings.TAREFAS_ESPERA_BASE * 2 ** (tentativa - 1),
+        settings.TAREFAS_ESPERA_MAXIMA,
+    ))
+
+
+def reivindicar(trabalhador, candidatas=10):
+    """
+    Marca como EXECUTANDO a próxima tarefa disponível e a retorna (None se
+    não houver). Disponíveis são as pendentes já no horário e as execuções
+    abandonadas; o UPDATE só acontece se a tarefa não mudou desde a leitura,
+    então dois trabalhadores nunca ficam com a mesma.
+    """
+    agora = timezone.now()
+    disponiveis = Tarefa.objects.filter(
+        Q(status='PENDENTE', executar_apos__lte=agora) | Q(status='EXECUTANDO', bloqueada_ate__lt=agora)
+    ).order_by('executar_apos', 'id').values_list('pk', 'status', 'tentativas', 'max_tentativas')[:candidatas]
+
+    for pk, status, tentativas, max_tentativas in disponiveis:
+        mesma_versao = Tarefa.objects.filter(pk=pk, status=status, tentativas=tentativas)
+        if status == 'EXECUTANDO' and tentativas >= max_tentativas:
+            mesma_versao.update(
+                status='FALHOU', erro='Execução abandonada pelo trabalhador', data_fim=agora, bloqueada_ate=None
+            )
+            continue
+        if mesma_versao.update(
+            status='EXECUTANDO',
+            tentativas=tentativas + 1,
+            trabalhador=trabalhador,
+            data_inicio=agora,
+            data_fim=None,
+            bloqueada_ate=agora + timedelta(seconds=settings.TAREFAS_TEMPO_LIMITE),
+        ):
+            return Tarefa.objects.get(pk=pk)
+    return None
+
+
+def executar(tarefa):
+    """Executa uma tarefa reivindicada e grava o resultado, o erro ou a nova tentativa"""
+    # Só grava se nenhum outro trabalhador assumiu a tarefa nesse meio tempo
+    esta_execucao = Tarefa.objects.filter(pk=tarefa.pk, status='EXECUTANDO', tentativas=tarefa.tentativas)
+    funcao = REGISTRO.get(tarefa.nome)
+    if funcao is None:
+        esta_execucao.update(
+            status='FALHOU', erro=f'Tarefa não registrada: {tarefa.nome}', data_fim=timezone.now(), bloqueada_ate=None
+        )
+        tarefa.refresh_from_db()
+        return tarefa
+
+    try:
+        resultado = funcao(tarefa, **tarefa.argumentos)
+        esta_execucao.update(
+            status='CONCLUIDA', progresso=100, resultado=resultado, erro='',
+            data_fim=timezone.now(), bloqueada_ate=None
+        )
+    except Exception:
+        erro = traceback.format_exc()
+        agora = timezone.now()
+        if tarefa.tentativas < tarefa.max_tentativas:
+            espera = espera_nova_tentativa(tarefa.tentativas)
+            logger.warning(
+                'Tarefa %s #%s falhou (tentativa %s de %s); nova tentativa em %ss',
+                tarefa.nome, tarefa.pk, tarefa.tentativas, tarefa.max_tentativas, int(espera.total_seconds()),
+                exc_info=True
+            )
+            esta_execucao.update(status='PENDENTE', erro=erro, executar_apos=agora + espera, bloqueada_ate=None)
+        else:
+            logger.error('Tarefa %s #%s falhou após %s tentativas', tarefa.nome, tarefa.pk, tarefa.tentativas, exc_info=True)
+            esta_execucao.update(status='FALHOU', erro=erro, data_fim=agora, bloqueada_ate=None)
+    tarefa.refresh_from_db()
+    return tarefa
@@ -0,0 +1,527 @@
+"""
+Gerador de uma rede escolar sintética para testes de desempenho.
+
+A rede (secretaria, escolas, turmas, alunos, matrículas, enturmações,
+avaliações, notas, aulas, frequências, funcionários e transporte) é
+determinística para a mesma semente e gravada com bulk_create em lotes,
+dentro de uma única transação. As notas e frequências, que são milhões de
+linhas em uma rede grande, são gravadas com executemany a partir de tuplas
+já convertidas, sem instanciar os modelos.
+"""
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from alunos.models import Aluno, Matricula
+from funcionarios.models import Funcionario, DocumentacaoFuncionario, DadosFuncionais
+from transporte.models import Motorista, Veiculo, Rota, PontoParada, AlunoTransporte
+from turma.models import (
+    Turma, Disciplina, DivisaoPeriodoLetivo, Enturmacao, TipoAvaliacao, Avaliacao, NotaAvaliacao,
+    AulaRegistrada, RegistroFrequencia,
+)
+from .models import Instituicao
+
+NOMES_MASCULINOS = [
+    'João', 'Pedro', 'Gabriel', 'Lucas', 'Matheus', 'Rafael', 'Bruno', 'Felipe', 'Thiago', 'Diego',
+    'Arthur', 'Enzo', 'Davi', 'Miguel', 'Heitor', 'Bernardo', 'Samuel', 'Gustavo', 'Vinícius', 'Caio',
+]
+NOMES_FEMININOS = [
+    'Maria', 'Ana', 'Beatriz', 'Giovanna', 'Isabela', 'Júlia', 'Larissa', 'Manuela', 'Nicole', 'Sofia',
+    'Alice', 'Helena', 'Laura', 'Valentina', 'Lívia', 'Cecília', 'Lorena', 'Clara', 'Yasmin', 'Heloísa',
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Costa', 'Lima', 'Ferreira', 'Alves', 'Rodrigues', 'Gomes',
+    'Martins', 'Ribeiro', 'Carvalho', 'Pereira', 'Nascimento', 'Almeida', 'Barbosa', 'Rocha', 'Moreira', 'Conceição',
+]
+DISCIPLINAS = [
+    'Língua Portuguesa', 'Matemática', 'Ciências', 'História', 'Geografia', 'Educação Física', 'Artes', 'Inglês',
+]
+
+# (ano_serie da Turma, tipo_ensino da Turma, tipo_ensino da Matrícula, idade de referência)
+SERIES = [
+    ('1_ANO', 'ENSINO_FUNDAMENTAL_I', 'FUNDAMENTAL_I', 6),
+    ('2_ANO', 'ENSINO_FUNDAMENTAL_I', 'FUNDAMENTAL_I', 7),
+    ('3_ANO', 'ENSINO_FUNDAMENTAL_I', 'FUNDAMENTAL_I', 8),
+    ('4_ANO', 'ENSINO_FUNDAMENTAL_I', 'FUNDAMENTAL_I', 9),
+    ('5_ANO', 'ENSINO_FUNDAMENTAL_I', 'FUNDAMENTAL_I', 10),
+    ('6_ANO', 'ENSINO_FUNDAMENTAL_II', 'FUNDAMENTAL_II', 11),
+    ('7_ANO', 'ENSINO_FUNDAMENTAL_II', 'FUNDAMENTAL_II', 12),
+    ('8_ANO', 'ENSINO_FUNDAMENTAL_II', 'FUNDAMENTAL_II', 13),
+    ('9_ANO', 'ENSINO_FUNDAMENTAL_II', 'FUNDAMENTAL_II', 14),
+    ('1_ANO_EM', 'ENSINO_MEDIO', 'MEDIO', 15),
+    ('2_ANO_EM', 'ENSINO_MEDIO', 'MEDIO', 16),
+    ('3_ANO_EM', 'ENSINO_MEDIO', 'MEDIO', 17),
+]
+ROTULOS_SERIE = dict(Turma.ANO_SERIE_CHOICES)
+TURNOS = ['MATUTINO', 'VESPERTINO']
+
+# Situações da chamada com os pesos usados no sorteio
+SITUACOES_FREQUENCIA = ['PRESENTE'] * 90 + ['AUSENTE'] * 7 + ['JUSTIFICADO'] * 2 + ['ATRASADO']
+NOTAS = [Decimal(n) / 10 for n in range(101)]
+
+# Cache de páginas do SQLite durante a carga (KiB); mantém os índices das tabelas grandes em memória
+CACHE_CARGA_SQLITE = 256 * 1024
+
+
+@dataclass
+class ParametrosRede:
+    """Tamanho da rede gerada; os padrões produzem uma rede pequena"""
+    alunos: int = 5000
+    escolas: int = 5
+    alunos_por_turma: int = 30
+    disciplinas: int = 6
+    avaliacoes: int = 2
+    aulas: int = 4
+    funcionarios_por_escola: int = 20
+    rotas_por_escola: int = 3
+    ano: int = date.today().year
+    semente: int = 42
+    lote: int = 2000
+
+
+class GeradorRede:
+    """
+    Gera a rede descrita por `ParametrosRede`.
+
+    `avaliacoes` e `aulas` são quantidades por turma e disciplina; cada
+    avaliação recebe nota de todos os alunos da turma e cada aula, a
+    frequência de todos eles. `progresso` recebe mensagens de andamento.
+    """
+
+    def __init__(self, parametros, progresso=None):
+        self.p = parametros
+        self.rng = random.Random(parametros.semente)
+        self.progresso = progresso or (lambda mensagem: None)
+        self.totais = {}
+        self._identificadores = set()
+
+    @property
+    def codigo_rede(self):
+        return f'SME-{self.p.semente}'
+
+    def rede_existe(self):
+        return Instituicao.objects.filter(codigo=self.codigo_rede).exists()
+
+    def gerar(self):
+        """Grava toda a rede e retorna {modelo: quantidade de registros}"""
+        with self._cache_ampliado(), transaction.atomic():
+            self.usuario, _ = User.objects.get_or_create(
+                username='rede_sintetica', defaults={'password': UNUSABLE_PASSWORD_PREFIX}
+            )
+            self._criar_referencias()
+            for numero_escola, alunos_escola in enumerate(self._alunos_por_escola(), start=1):
+                self._gerar_escola(numero_escola, alunos_escola)
+                self.progresso(f'Escola {numero_escola}/{self.p.escolas}: {alunos_escola} alunos')
+        return self.totais
+
+    # Auxiliares ----------------------------------------------------------------
+
+    @contextmanager
+    def _cache_ampliado(self):
+        """Amplia o cache do SQLite durante a carga e restaura o valor da conexão ao final"""
+        if connection.vendor != 'sqlite':
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            anterior = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA cache_size = -{CACHE_CARGA_SQLITE}')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA cache_size = {int(anterior)}')
+
+    def _inserir(self, modelo, objetos):
+        """bulk_create em lotes de `lote` objetos; retorna os objetos com pk"""
+        criados = []
+        objetos = iter(objetos)
+        while lote := list(islice(objetos, self.p.lote)):
+            criados.extend(modelo.objects.bulk_create(lote))
+        self._contar(modelo, len(criados))
+        return criados
+
+    def _inserir_linhas(self, modelo, campos, linhas):
+        """
+        INSERT com executemany em lotes de `lote` linhas. As tuplas devem
+        trazer os valores já preparados para o banco (ver _preparar).
+        """
+        quote_name = connection.ops.quote_name
+        colunas = ', '.join(quote_name(modelo._meta.get_field(campo).column) for campo in campos)
+        sql = (
+            f'INSERT INTO {quote_name(modelo._meta.db_table)} ({colunas}) '
+            f'VALUES ({", ".join(["%s"] * len(campos))})'
+        )
+        total = 0
+        linhas = iter(linhas)
+        with connection.cursor() as cursor:
+            while lote := list(islice(linhas, self.p.lote)):
+                cursor.executemany(sql, lote)
+                total += len(lote)
+        self._contar(modelo, total)
+
+    @staticmethod
+    def _preparar(modelo, campo, valor):
+        """Converte o valor como o ORM faria ao salvar o campo"""
+        return modelo._meta.get_field(campo).get_db_prep_save(valor, connection)
+
+    def _contar(self, modelo, quantidade):
+        nome = str(modelo._meta.verbose_name_plural)
+        self.totais[nome] = self.totais.get(nome, 0) + quantidade
+
+    def _nome(self, sexo):
+        primeiro = self.rng.choice(NOMES_MASCULINOS if sexo == 'M' else NOMES_FEMININOS)
+        return f'{primeiro} {self.rng.choice(SOBRENOMES)} {self.rng.choice(SOBRENOMES)}'
+
+    def _identificador(self, gerar):
+        """Sorteia um identificador (CPF, placa...) ainda não usado nesta rede"""
+        while True:
+            valor = gerar()
+            if valor not in self._identificadores:
+                self._identificadores.add(valor)
+                return valor
+
+    def _cpf(self):
+        return self._identificador(lambda: '{}{}{}.{}{}{}.{}{}{}-{}{}'.format(*self.rng.choices('0123456789', k=11)))
+
+    def _digitos(self, quantidade):
+        return self._identificador(lambda: ''.join(self.rng.choices('0123456789', k=quantidade)))
+
+    def _alunos_por_escola(self):
+        base, resto = divmod(self.p.alunos, self.p.escolas)
+        return [base + (1 if indice < resto else 0) for indice in range(self.p.escolas)]
+
+    def _dias_letivos(self):
+        """Dias úteis do ano letivo (fevereiro a novembro)"""
+        dia, fim = date(self.p.ano, 2, 3), date(self.p.ano, 11, 30)
+        dias = []
+        while dia <= fim:
+            if dia.weekday() < 5:
+                dias.append(dia)
+            dia += timedelta(days=1)
+        return dias
+
+    # Referências compartilhadas pelas escolas -----------------------------------
+
+    def _criar_referencias(self):
+        ano = self.p.ano
+        self.rede = Instituicao.objects.create(
+            nome=f'Secretaria Municipal de Educação (rede {self.p.semente})',
+            codigo=self.codigo_rede,
+            tipo_instituicao='SME',
+        )
+        self._contar(Instituicao, 1)
+
+        self.disciplinas = []
+        for nome in DISCIPLINAS[:self.p.disciplinas]:
+            disciplina = Disciplina.objects.filter(nome=nome).first() or Disciplina.objects.create(nome=nome)
+            self.disciplinas.append(disciplina)
+
+        bimestres = [
+            (date(ano, 2, 3), date(ano, 4, 17)),
+            (date(ano, 4, 22), date(ano, 7, 4)),
+            (date(ano, 7, 21), date(ano, 9, 30)),
+            (date(ano, 10, 1), date(ano, 12, 12)),
+        ]
+        self.divisoes = [
+            DivisaoPeriodoLetivo.objects.get_or_create(
+                periodo_letivo=str(ano), ordem=ordem,
+                defaults={
+                    'nome': f'{ordem}º Bimestre', 'tipo_divisao': 'BIMESTRE',
+                    'data_inicio': inicio, 'data_fim': fim,
+                }
+            )[0]
+            for ordem, (inicio, fim) in enumerate(bimestres, start=1)
+        ]
+        self.tipos_avaliacao = [
+            TipoAvaliacao.objects.get_or_create(nome=nome)[0] for nome in ('Prova', 'Trabalho')
+        ]
+        self.dias_letivos = self._dias_letivos()
+
+    # Escola ------------------------------------------------------------------------
+
+    def _gerar_escola(self, numero, total_alunos):
+        escola = Instituicao.objects.create(
+            nome=f'Escola Municipal {numero:03d} (rede {self.p.semente})',
+            codigo=f'{self.codigo_rede}-E{numero:03d}',
+            tipo_instituicao='ESCOLA',
+            instituicao_pai=self.rede,
+        )
+        self._contar(Instituicao, 1)
+
+        professores = self._gerar_funcionarios(escola)
+        turmas = self._gerar_turmas(escola, total_alunos)
+        alunos_por_turma = self._gerar_alunos(turmas, total_alunos)
+        self._gerar_avaliacoes(turmas, alunos_por_turma, professores)
+        self._gerar_aulas(turmas, alunos_por_turma, professores)
+        self._gerar_transporte(escola, [aluno for alunos in alunos_por_turma.values() for aluno in alunos])
+
+    def _gerar_funcionarios(self, escola):
+        """Funcionários da escola; os docentes ganham um usuário para lançar aulas e notas"""
+        funcionarios = []
+        for _ in range(self.p.funcionarios_por_escola):
+            sexo = self.rng.choice('MF')
+            funcionarios.append(Funcionario(
+                nome=self._nome(sexo),
+                data_nascimento=date(self.p.ano - self.rng.randint(22, 65), self.rng.randint(1, 12), self.rng.randint(1, 28)),
+                sexo=sexo,
+                estado_civil=self.rng.choice(['SOLTEIRO', 'CASADO', 'DIVORCIADO']),
+                cor_raca=self.rng.choice(['BRANCA', 'PRETA', 'PARDA', 'AMARELA', 'INDIGENA']),
+                naturalidade='Vitória',
+                uf_nascimento='ES',
+                nome_mae=self._nome('F'),
+                endereco=escola.nome,
+                numero=str(self.rng.randint(1, 999)),
+                bairro='Centro',
+                cidade='Vitória',
+                uf='ES',
+                usuario_cadastro=self.usuario,
+            ))
+        funcionarios = self._inserir(Funcionario, funcionarios)
+
+        self._inserir(DocumentacaoFuncionario, (
+            DocumentacaoFuncionario(
+                funcionario_id=funcionario.pk, rg=self._digitos(9), rg_orgao_expedidor='SSP', rg_uf='ES', cpf=self._cpf()
+            )
+            for funcionario in funcionarios
+        ))
+        docentes = max(1, len(funcionarios) * 7 // 10)
+        self._inserir(DadosFuncionais, (
+            DadosFuncionais(
+                funcionario_id=funcionario.pk,
+                matricula=f'{self.p.semente}-{funcionario.pk:07d}',
+                funcao='DOCENTE' if indice < docentes else self.rng.choice(['SECRETARIO_ESCOLAR', 'AUXILIAR_SERVICOS_GERAIS', 'VIGIA']),
+                situacao_funcional='ATIVO',
+                tipo_vinculo=self.rng.choice(['CONCURSADO_EFETIVO', 'CONTRATO_TEMPORARIO']),
+                data_admissao=date(self.p.ano - self.rng.randint(0, 20), 2, 1),
+            )
+            for indice, funcionario in enumerate(funcionarios)
+        ))
+        professores = self._inserir(User, (
+            User(
+                username=f'prof{self.p.semente}_{funcionario.pk}',
+                first_name=funcionario.nome.split()[0],
+                password=UNUSABLE_PASSWORD_PREFIX,
+            )
+            for funcionario in funcionarios[:docentes]
+        ))
+        return professores or [self.usuario]
+
+    def _gerar_turmas(self, escola, total_alunos):
+        quantidade = -(-total_alunos // self.p.alunos_por_turma)
+        turmas = []
+        for indice in range(quantidade):
+            ano_serie, tipo_ensino, _, _ = SERIES[indice % len(SERIES)]
+            turmas.append(Turma(
+                nome=f'{escola.codigo} {ROTULOS_SERIE[ano_serie]}{" EM" if tipo_ensino == "ENSINO_MEDIO" else ""} '
+                     f'{indice // len(SERIES) + 1:02d}',
+                periodo_letivo=str(self.p.ano),
+                tipo_ensino=tipo_ensino,
+                ano_serie=ano_serie,
+                turno=TURNOS[indice % len(TURNOS)],
+                vagas_total=self.p.alunos_por_turma + 5,
+                usuario_criacao=self.usuario,
+            ))
+        return self._inserir(Turma, turmas)
+
+    def _gerar_alunos(self, turmas, total_alunos):
+        """Alunos com matrícula ativa no ano e enturmados; retorna {turma: [alunos]}"""
+        serie = {ano_serie: (tipo_matricula, idade) for ano_serie, _, tipo_matricula, idade in SERIES}
+        destinos = []
+        for indice in range(total_alunos):
+            destinos.append(turmas[indice // self.p.alunos_por_turma])
+
+        alunos = []
+        for turma in destinos:
+            sexo = self.rng.choice('MF')
+            idade = serie[turma.ano_serie][1] + (1 if self.rng.random() < 0.1 else 0)
+            alunos.append(Aluno(
+                nome=self._nome(sexo),
+                data_nascimento=date(self.p.ano - idade, self.rng.randint(1, 12), self.rng.randint(1, 28)),
+                sexo=sexo,
+                nome_mae=self._nome('F'),
+                tipo_arquivo='CORRENTE',
+                usuario_cadastro=self.usuario,
+            ))
+        alunos = self._inserir(Aluno, alunos)
+
+        agora = self._preparar(Matricula, 'data_cadastro', timezone.now())
+        datas_matricula = [self._preparar(Matricula, 'data_matricula', date(self.p.ano, 1, dia)) for dia in range(5, 31)]
+        condicoes = ['CONTINUIDADE'] * 8 + ['NOVATO', 'NOVATO_ESCOLA']
+        self._inserir_linhas(Matricula, [
+            'aluno', 'ano_administrativo', 'tipo_ensino', 'serie_ano', 'tipo_matricula', 'turno_preferencial',
+            'data_matricula', 'possui_dependencia', 'condicao_anterior', 'status', 'condicoes_especiais_avaliacao',
+            'data_cadastro', 'data_atualizacao', 'usuario_cadastro',
+        ], (
+            (
+                aluno.pk, self.p.ano, serie[turma.ano_serie][0], ROTULOS_SERIE[turma.ano_serie], 'REGULAR',
+                turma.turno, self.rng.choice(datas_matricula), False, self.rng.choice(condicoes), 'ATIVA', False,
+                agora, agora, self.usuario.pk,
+            )
+            for aluno, turma in zip(alunos, destinos)
+        ))
+
+        hoje = self._preparar(Enturmacao, 'data_enturmacao', date.today())
+        self._inserir_linhas(
+            Enturmacao, ['turma', 'aluno', 'data_enturmacao', 'ativo', 'usuario_enturmacao'],
+            ((turma.pk, aluno.pk, hoje, True, self.usuario.pk) for aluno, turma in zip(alunos, destinos))
+        )
+
+        alunos_por_turma = {turma.pk: [] for turma in turmas}
+        for aluno, turma in zip(alunos, destinos):
+            alunos_por_turma[turma.pk].append(aluno.pk)
+        return alunos_por_turma
+
+    def _gerar_avaliacoes(self, turmas, alunos_por_turma, professores):
+        avaliacoes = []
+        for turma in turmas:
+            for numero_disciplina, disciplina in enumerate(self.disciplinas):
+                professor = professores[(turma.pk + numero_disciplina) % len(professores)]
+                for indice in range(self.p.avaliacoes):
+                    divisao = self.divisoes[indice % len(self.divisoes)]
+                    tipo = self.tipos_avaliacao[indice % len(self.tipos_avaliacao)]
+                    avaliacoes.append(Avaliacao(
+                        turma_id=turma.pk,
+                        disciplina_id=disciplina.pk,
+                        divisao_periodo_id=divisao.pk,
+                        tipo_avaliacao_id=tipo.pk,
+                        professor_id=professor.pk,
+                        nome=f'{tipo.nome} {indice + 1}',
+                        data_aplicacao=divisao.data_inicio + timedelta(days=self.rng.randint(10, 60)),
+                        notas_lancadas=True,
+                    ))
+        avaliacoes = self._inserir(Avaliacao, avaliacoes)
+
+        notas = [self._preparar(NotaAvaliacao, 'nota', nota) for nota in NOTAS]
+        agora = self._preparar(NotaAvaliacao, 'data_lancamento', timezone.now())
+
+        def linhas():
+            for avaliacao in avaliacoes:
+                for aluno_id in alunos_por_turma[avaliacao.turma_id]:
+                    ausente = self.rng.random() < 0.03
+                    nota = None if ausente else self.rng.choice(notas)
+                    yield (avaliacao.pk, aluno_id, nota, ausente, False, agora, agora, avaliacao.professor_id)
+        self._inserir_linhas(NotaAvaliacao, [
+            'avaliacao', 'aluno', 'nota', 'ausente', 'dispensado', 'data_lancamento', 'data_atualizacao',
+            'usuario_lancamento',
+        ], linhas())
+
+    def _gerar_aulas(self, turmas, alunos_por_turma, professores):
+        aulas = []
+        for turma in turmas:
+            dias = self.rng.sample(self.dias_letivos, min(self.p.aulas, len(self.dias_letivos)))
+            for numero_disciplina, disciplina in enumerate(self.disciplinas):
+                professor = professores[(turma.pk + numero_disciplina) % len(professores)]
+                inicio = time(7 + numero_disciplina, 0)
+                for dia in dias:
+                    aulas.append(AulaRegistrada(
+                        turma_id=turma.pk,
+                        disciplina_id=disciplina.pk,
+                        professor_id=professor.pk,
+                        data_aula=dia,
+                        horario_inicio=inicio,
+                        horario_fim=time(7 + numero_disciplina, 50),
+                        conteudo_programatico=f'{disciplina.nome} - aula de {dia.strftime("%d/%m")}',
+                        chamada_realizada=True,
+                    ))
+        aulas = self._inserir(AulaRegistrada, aulas)
+
+        agora = self._preparar(RegistroFrequencia, 'data_registro', timezone.now())
+
+        def linhas():
+            for aula in aulas:
+                for aluno_id in alunos_por_turma[aula.turma_id]:
+                    yield (aula.pk, aluno_id, self.rng.choice(SITUACOES_FREQUENCIA), agora, aula.professor_id)
+        self._inserir_linhas(
+            RegistroFrequencia, ['aula', 'aluno', 'situacao', 'data_registro', 'usuario_registro'], linhas()
+        )
+
+    def _gerar_transporte(self, escola, alunos):
+        """Rotas com veículo, motorista e pontos; cerca de 10% dos alunos usam o transporte"""
+        if not self.p.rotas_por_escola:
+            return
+        rotas = []
+        for indice in range(self.p.rotas_por_escola):
+            letras = ''.join(self.rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))
+            veiculo = Veiculo(
+                placa=self._identificador(lambda: letras + ''.join(self.rng.choices('0123456789', k=4))),
+                tipo_veiculo=self.rng.choice(['ONIBUS', 'MICRO_ONIBUS', 'VAN']),
+                marca='Mercedes-Benz',
+                modelo='OF-1519',
+                ano_fabricacao=self.p.ano - self.rng.randint(0, 15),
+                cor='Amarelo',
+                capacidade_passageiros=self.rng.choice([15, 30, 44]),
+                renavam=self._digitos(11),
+                chassi=self._digitos(17),
+                usuario_cadastro=self.usuario,
+            )
+            motorista = Motorista(
+                nome=self._nome('M'),
+                cpf=self._cpf(),
+                data_nascimento=date(self.p.ano - self.rng.randint(25, 60), 1, 1),
+                celular='(27) 99999-0000',
+                endereco=escola.nome,
+                cnh_numero=self._digitos(11),
+                cnh_categoria='D',
+                cnh_validade=date(self.p.ano + 3, 12, 31),
+                data_inicio_contrato=date(self.p.ano, 2, 1),
+                salario=Decimal('3500.00'),
+                usuario_cadastro=self.usuario,
+            )
+            rotas.append((veiculo, motorista, indice))
+
+        veiculos = self._inserir(Veiculo, [veiculo for veiculo, _, _ in rotas])
+        motoristas = self._inserir(Motorista, [motorista for _, motorista, _ in rotas])
+        rotas = self._inserir(Rota, (
+            Rota(
+                nome=f'{escola.codigo} Rota {indice + 1:02d}',
+                turno=TURNOS[indice % len(TURNOS)],
+                horario_saida_ida=time(6, 0),
+                horario_chegada_ida=time(6, 50),
+                horario_saida_volta=time(12, 0),
+                horario_chegada_volta=time(12, 50),
+                veiculo_id=veiculo.pk,
+                motorista_id=motorista.pk,
+                km_total=Decimal(self.rng.randint(50, 400)) / 10,
+                usuario_cadastro=self.usuario,
+            )
+            for veiculo, motorista, indice in zip(veiculos, motoristas, range(len(veiculos)))
+        ))
+        pontos = self._inserir(PontoParada, (
+            PontoParada(
+                rota_id=rota.pk,
+                nome=f'Ponto {ordem}',
+                endereco=f'Rua {ordem}, {escola.nome}',
+                horario_ida=time(6, ordem * 10),
+                horario_volta=time(12, ordem * 10),
+                ordem=ordem,
+            )
+            for rota in rotas for ordem in range(1, 5)
+        ))
+        pontos_por_rota = {}
+        for ponto in pontos:
+            pontos_por_rota.setdefault(ponto.rota_id, []).append(ponto)
+
+        transportados = self.rng.sample(alunos, len(alunos) // 10)
+        self._inserir(AlunoTransporte, (
+            AlunoTransporte(
+                aluno_id=aluno_id,
+                rota_id=rota.pk,
+                ponto_embarque_id=self.rng.choice(pontos_por_rota[rota.pk]).pk,
+                ponto_desembarque_id=pontos_por_rota[rota.pk][-1].pk,
+                responsavel_nome=self._nome('F'),
+                responsavel_telefone='(27) 98888-0000',
+                responsavel_endereco=escola.nome,
+                data_inicio=date(self.p.ano, 2, 3),
+                usuario_cadastro=self.usuario,
+            )
+            for aluno_id, rota in ((aluno_id, self.rng.choice(rotas)) for aluno_id in transportados)
+        ))
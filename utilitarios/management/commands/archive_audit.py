@@ -0,0 +1,46 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from utilitarios.retencao import TABELAS, arquivar, corte_retencao
+
+
+class Command(BaseCommand):
+    help = (
+        'Move registros de auditoria e atividades recentes antigos para as tabelas de arquivo, em lotes. '
+        'Sem --before usa a retenção de cada tabela (RETENCAO_DIAS)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='Arquiva as linhas anteriores a esta data (AAAA-MM-DD)')
+        parser.add_argument(
+            '--tabela', choices=sorted(TABELAS), action='append',
+            help='Tabela a arquivar (pode repetir; padrão: todas)'
+        )
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas movidas por transação')
+
+    def handle(self, *args, **options):
+        antes = None
+        if options['before']:
+            try:
+                data = parse_date(options['before'])
+            except ValueError:
+                data = None
+            if data is None:
+                raise CommandError('--before deve ser uma data no formato AAAA-MM-DD.')
+            antes = timezone.make_aware(datetime.combine(data, time.min))
+
+        for nome in options['tabela'] or sorted(TABELAS):
+            corte = antes or corte_retencao(nome)
+            if corte is None:
+                self.stdout.write(f'{nome}: sem retenção configurada, ignorada')
+                continue
+            progresso = None
+            if options['verbosity'] > 1:
+                progresso = lambda movidas: self.stdout.write(f'  {nome}: {movidas} linhas arquivadas...')
+            total = arquivar(nome, corte, options['lote'], progresso)
+            self.stdout.write(self.style.SUCCESS(
+                f'{nome}: {total} linhas anteriores a {timezone.localtime(corte):%d/%m/%Y %H:%M} arquivadas'
+            ))
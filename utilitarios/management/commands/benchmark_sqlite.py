@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from guto_system.database import pragmas_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a vazão de escritores simultâneos no SQLite com o perfil padrão '
+        '(journal DELETE, transações DEFERRED) e com o perfil do GUTO (WAL, PRAGMAs, IMMEDIATE)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escritores', type=int, default=8, help='Threads gravando em paralelo')
+        parser.add_argument('--leitores', type=int, default=4, help='Threads lendo em paralelo')
+        parser.add_argument('--operacoes', type=int, default=200, help='Transações por escritor')
+
+    def handle(self, *args, **options):
+        perfis = [
+            ('padrão', {}, 'DEFERRED'),
+            ('guto', pragmas_sqlite(), 'IMMEDIATE'),
+        ]
+        self.stdout.write(f"{'perfil':<8} {'ok':>7} {'bloqueios':>10} {'leituras':>9} {'tempo (s)':>10} {'trans./s':>9}")
+        for nome, pragmas, modo in perfis:
+            resultado = self.executar(pragmas, modo, **options)
+            self.stdout.write(
+                f"{nome:<8} {resultado['ok']:>7} {resultado['bloqueios']:>10} {resultado['leituras']:>9} "
+                f"{resultado['tempo']:>10.2f} {resultado['ok'] / resultado['tempo']:>9.1f}"
+            )
+
+    def executar(self, pragmas, modo, escritores, leitores, operacoes, **kwargs):
+        """Roda a carga em um banco temporário e retorna contadores e tempo total"""
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'benchmark.sqlite3')
+            timeout = pragmas.get('busy_timeout', 5000) / 1000
+
+            def conectar():
+                conexao = sqlite3.connect(caminho, timeout=timeout, isolation_level=None)
+                for pragma, valor in pragmas.items():
+                    conexao.execute(f'PRAGMA {pragma}={valor}')
+                return conexao
+
+            conexao = conectar()
+            conexao.execute(
+                'CREATE TABLE frequencia (id INTEGER PRIMARY KEY, aula INTEGER, aluno INTEGER, situacao TEXT)'
+            )
+            conexao.execute('CREATE INDEX frequencia_aula ON frequencia (aula)')
+            conexao.close()
+
+            contadores = {'ok': 0, 'bloqueios': 0, 'leituras': 0}
+            trava = threading.Lock()
+            gravando = threading.Event()
+
+            def escritor(numero):
+                conexao = conectar()
+                for operacao in range(operacoes):
+                    # Leitura seguida de escrita na mesma transação, como o lançamento de uma chamada
+                    try:
+                        conexao.execute(f'BEGIN {modo}')
+                        conexao.execute('SELECT COUNT(*) FROM frequencia WHERE aula = ?', [numero]).fetchone()
+                        conexao.execute(
+                            'INSERT INTO frequencia (aula, aluno, situacao) VALUES (?, ?, ?)',
+                            [numero, operacao, 'PRESENTE']
+                        )
+                        conexao.execute('COMMIT')
+                        chave = 'ok'
+                    except sqlite3.OperationalError:
+                        if conexao.in_transaction:
+                            conexao.execute('ROLLBACK')
+                        chave = 'bloqueios'
+                    with trava:
+                        contadores[chave] += 1
+                conexao.close()
+
+            def leitor():
+                conexao = conectar()
+                while gravando.is_set():
+                    try:
+                        conexao.execute('SELECT aula, COUNT(*) FROM frequencia GROUP BY aula').fetchall()
+                        with trava:
+                            contadores['leituras'] += 1
+                    except sqlite3.OperationalError:
+                        pass
+                conexao.close()
+
+            threads_escrita = [threading.Thread(target=escritor, args=(numero,)) for numero in range(escritores)]
+            threads_leitura = [threading.Thread(target=leitor) for _ in range(leitores)]
+
+            gravando.set()
+            inicio = time.perf_counter()
+            for thread in threads_leitura + threads_escrita:
+                thread.start()
+            for thread in threads_escrita:
+                thread.join()
+            contadores['tempo'] = time.perf_counter() - inicio
+            gravando.clear()
+            for thread in threads_leitura:
+                thread.join()
+
+        return contadores
@@ -0,0 +1,121 @@
+import json
+import subprocess
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from alunos.models import Aluno
+from utilitarios.benchmark_views import CASOS, executar_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede consultas SQL, tempo e pico de memória das principais views no banco atual '
+        '(gere uma rede grande com generate_network) e falha se alguma ultrapassar seu orçamento de consultas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', help='Usuário autenticado nas requisições (padrão: primeiro superusuário)')
+        parser.add_argument('--repeticoes', type=int, default=3, help='Requisições cronometradas por view')
+        parser.add_argument('--views', help='Nomes dos casos separados por vírgula (padrão: todos)')
+        parser.add_argument('--saida', help='Arquivo JSON onde gravar os resultados')
+        parser.add_argument('--comparar', help='Arquivo JSON de uma execução anterior para comparação')
+
+    def handle(self, *args, **options):
+        casos = CASOS
+        if options['views']:
+            nomes = options['views'].split(',')
+            casos = [caso for caso in CASOS if caso.nome in nomes]
+            desconhecidos = set(nomes) - {caso.nome for caso in casos}
+            if desconhecidos:
+                raise CommandError(f'View(s) desconhecida(s): {", ".join(sorted(desconhecidos))}')
+
+        usuario = self.obter_usuario(options['usuario'])
+        anterior = self.carregar(options['comparar']) if options['comparar'] else {}
+
+        # Client de teste: libera o host "testserver" sem alterar ALLOWED_HOSTS
+        setup_test_environment()
+        try:
+            resultados = executar_benchmark(usuario, casos, options['repeticoes'])
+        except ValueError as erro:
+            raise CommandError(str(erro))
+        finally:
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'view':<22} {'status':>6} {'consultas':>10} {'mediana (ms)':>13} {'pico (KB)':>11}  comparação"
+        )
+        for resultado in resultados:
+            dados = resultado.como_dict()
+            situacao = self.style.SUCCESS if resultado.dentro_do_orcamento else self.style.ERROR
+            self.stdout.write(situacao(
+                f"{resultado.nome:<22} {resultado.status:>6} "
+                f"{f'{resultado.consultas}/{resultado.orcamento}':>10} "
+                f"{dados['tempo_ms']['mediana']:>13.1f} {dados['memoria_pico_kb']:>11.1f}  "
+                f"{self.comparar(dados, anterior.get(resultado.nome))}"
+            ))
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(self.relatorio(resultados, options['repeticoes']), arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultados gravados em {options['saida']}")
+
+        fora = [resultado.nome for resultado in resultados if not resultado.dentro_do_orcamento]
+        if fora:
+            raise CommandError(f'Views fora do orçamento de consultas ou com erro: {", ".join(fora)}')
+
+    def obter_usuario(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário "{username}" não encontrado.')
+        usuario = (
+            User.objects.filter(is_superuser=True).order_by('pk').first()
+            or User.objects.filter(username='rede_sintetica').first()
+        )
+        if usuario is None:
+            raise CommandError('Nenhum usuário disponível; informe --usuario.')
+        return usuario
+
+    def carregar(self, caminho):
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                return json.load(arquivo)['resultados']
+        except (OSError, ValueError, KeyError) as erro:
+            raise CommandError(f'Não foi possível ler {caminho}: {erro}')
+
+    def comparar(self, atual, anterior):
+        """Diferença de consultas e da mediana de tempo em relação à execução anterior"""
+        if not anterior:
+            return ''
+        consultas = atual['consultas'] - anterior['consultas']
+        mediana_anterior = anterior['tempo_ms']['mediana']
+        tempo = (atual['tempo_ms']['mediana'] - mediana_anterior) / mediana_anterior * 100 if mediana_anterior else 0
+        return f'{consultas:+d} consultas, {tempo:+.0f}% tempo'
+
+    def relatorio(self, resultados, repeticoes):
+        return {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'commit': self.commit_atual(),
+            'banco': {
+                'vendor': connection.vendor,
+                'nome': str(connection.settings_dict['NAME']),
+                'alunos': Aluno.objects.count(),
+            },
+            'repeticoes': repeticoes,
+            'resultados': {resultado.nome: resultado.como_dict() for resultado in resultados},
+        }
+
+    def commit_atual(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from utilitarios.planos_consulta import verificar_planos
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa EXPLAIN QUERY PLAN nas consultas críticas das turmas, do diário e da auditoria '
+        'e falha se alguma percorrer uma tabela inteira sem índice'
+    )
+
+    def handle(self, *args, **options):
+        try:
+            resultado = verificar_planos()
+        except NotImplementedError as erro:
+            raise CommandError(str(erro))
+
+        regressoes = []
+        for nome, (plano, varreduras) in resultado.items():
+            situacao = self.style.ERROR('VARREDURA') if varreduras else self.style.SUCCESS('ok')
+            self.stdout.write(f'{nome:<28} {situacao}')
+            if varreduras or options['verbosity'] > 1:
+                for linha in plano:
+                    self.stdout.write(f'    {linha}')
+            if varreduras:
+                regressoes.append(nome)
+
+        if regressoes:
+            raise CommandError(f"Consultas sem índice: {', '.join(regressoes)}")
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from busca.services import reconstruir_indice
+from dashboard.services import invalidar_resumo_dashboard
+from utilitarios.gerador_rede import GeradorRede, ParametrosRede
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera uma rede escolar sintética e determinística (escolas, turmas, alunos, notas, '
+        'frequências, funcionários e transporte) para testes de desempenho'
+    )
+
+    def add_arguments(self, parser):
+        padrao = ParametrosRede()
+        parser.add_argument('--alunos', type=int, default=padrao.alunos, help='Total de alunos da rede')
+        parser.add_argument('--escolas', type=int, default=padrao.escolas, help='Quantidade de escolas')
+        parser.add_argument('--alunos-por-turma', type=int, default=padrao.alunos_por_turma)
+        parser.add_argument('--disciplinas', type=int, default=padrao.disciplinas, help='Disciplinas por turma (máx. 8)')
+        parser.add_argument('--avaliacoes', type=int, default=padrao.avaliacoes, help='Avaliações por turma e disciplina')
+        parser.add_argument('--aulas', type=int, default=padrao.aulas, help='Aulas com chamada por turma e disciplina')
+        parser.add_argument('--funcionarios-por-escola', type=int, default=padrao.funcionarios_por_escola)
+        parser.add_argument('--rotas-por-escola', type=int, default=padrao.rotas_por_escola)
+        parser.add_argument('--ano', type=int, default=padrao.ano, help='Ano letivo (padrão: ano atual)')
+        parser.add_argument('--semente', type=int, default=padrao.semente, help='Semente do gerador aleatório')
+        parser.add_argument('--lote', type=int, default=padrao.lote, help='Registros por bulk_create')
+        parser.add_argument('--sem-indice', action='store_true', help='Não reconstrói o índice da busca ao final')
+
+    def handle(self, *args, **options):
+        parametros = ParametrosRede(
+            alunos=options['alunos'],
+            escolas=options['escolas'],
+            alunos_por_turma=options['alunos_por_turma'],
+            disciplinas=options['disciplinas'],
+            avaliacoes=options['avaliacoes'],
+            aulas=options['aulas'],
+            funcionarios_por_escola=options['funcionarios_por_escola'],
+            rotas_por_escola=options['rotas_por_escola'],
+            ano=options['ano'],
+            semente=options['semente'],
+            lote=options['lote'],
+        )
+        if parametros.escolas < 1 or parametros.alunos < 1 or parametros.alunos_por_turma < 1:
+            raise CommandError('Informe ao menos uma escola, um aluno e um aluno por turma.')
+        if not 1 <= parametros.disciplinas <= 8:
+            raise CommandError('A quantidade de disciplinas deve estar entre 1 e 8.')
+
+        gerador = GeradorRede(parametros, progresso=self.stdout.write)
+        if gerador.rede_existe():
+            raise CommandError(
+                f'A rede da semente {parametros.semente} já foi gerada neste banco; use outra --semente.'
+            )
+
+        inicio = time.perf_counter()
+        totais = gerador.gerar()
+        tempo_geracao = time.perf_counter() - inicio
+
+        # bulk_create não dispara os sinais que mantêm a busca e o dashboard atualizados
+        invalidar_resumo_dashboard()
+        if not options['sem_indice']:
+            reconstruir_indice()
+
+        for nome, total in totais.items():
+            self.stdout.write(f'  {nome:<28} {total:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rede {parametros.semente} gerada em {tempo_geracao:.1f}s '
+            f'(total com índice da busca: {time.perf_counter() - inicio:.1f}s)'
+        ))
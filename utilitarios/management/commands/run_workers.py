@@ -0,0 +1,93 @@
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+from utilitarios.fila import REGISTRO, executar, reivindicar
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa as tarefas em segundo plano (utilitarios/fila.py) com um pool de threads. '
+        'Vários processos run_workers podem rodar juntos: a fila no banco distribui as tarefas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Tarefas executadas ao mesmo tempo')
+        parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos entre consultas com a fila vazia')
+        parser.add_argument(
+            '--ate-esvaziar', action='store_true',
+            help='Termina quando não houver mais tarefas disponíveis (ex.: cron)'
+        )
+
+    def handle(self, *args, **options):
+        concorrencia = options['concurrency']
+        if concorrencia < 1:
+            raise CommandError('--concurrency deve ser pelo menos 1.')
+        trabalhador = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(
+            f'Trabalhador {trabalhador}: {concorrencia} threads, tarefas registradas: {", ".join(sorted(REGISTRO))}'
+        )
+
+        parar = threading.Event()
+        anteriores = self._tratar_sinais(parar)
+        livres = threading.Semaphore(concorrencia)
+        executando = []
+        executadas = 0
+        try:
+            with ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix='trabalhador') as pool:
+                while not parar.is_set():
+                    # Só reivindica quando há uma thread livre, para não segurar tarefas sem executar
+                    if not livres.acquire(timeout=options['intervalo']):
+                        continue
+                    try:
+                        tarefa = reivindicar(trabalhador)
+                    except OperationalError:
+                        # Banco bloqueado por outra escrita além do busy_timeout: tenta de novo no próximo ciclo
+                        logger.warning('Trabalhador %s: banco bloqueado ao reivindicar tarefa', trabalhador, exc_info=True)
+                        livres.release()
+                        parar.wait(options['intervalo'])
+                        continue
+                    if tarefa is None:
+                        livres.release()
+                        executando = [futuro for futuro in executando if not futuro.done()]
+                        if options['ate_esvaziar'] and not executando:
+                            break
+                        parar.wait(options['intervalo'])
+                        continue
+                    futuro = pool.submit(self._executar, tarefa)
+                    futuro.add_done_callback(lambda _: livres.release())
+                    executando.append(futuro)
+                    executadas += 1
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'  {tarefa}')
+        finally:
+            for sinal, tratador in anteriores.items():
+                signal.signal(sinal, tratador)
+        self.stdout.write(self.style.SUCCESS(f'Trabalhador {trabalhador} encerrado: {executadas} tarefas executadas'))
+
+    @staticmethod
+    def _executar(tarefa):
+        try:
+            executar(tarefa)
+        finally:
+            # Cada thread do pool tem sua conexão; fecha para não acumular conexões ociosas
+            connections.close_all()
+
+    def _tratar_sinais(self, parar):
+        """SIGINT/SIGTERM param de reivindicar tarefas; as em execução terminam antes de sair"""
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+
+        def tratar(sinal, frame):
+            self.stdout.write('Encerrando após as tarefas em execução...')
+            parar.set()
+
+        return {sinal: signal.signal(sinal, tratar) for sinal in (signal.SIGINT, signal.SIGTERM)}
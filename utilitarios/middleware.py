@@ -0,0 +1,188 @@
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import base as template_base
+
+logger = logging.getLogger(__name__)
+
+_perfil_atual = ContextVar('perfil_requisicao', default=None)
+_render_original = None
+
+_LISTA_IN = re.compile(r'\bIN \((?:%s, )*%s\)')
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACOS = re.compile(r'\s+')
+_CONTROLE_TRANSACAO = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+
+
+def impressao_digital(sql):
+    """
+    Forma normalizada da consulta: literais viram "?" e listas IN (%s, ...)
+    de qualquer tamanho ficam iguais, para agrupar as repetições de um N+1.
+    """
+    sql = _LISTA_IN.sub('IN (...)', sql)
+    sql = _LITERAIS.sub('?', sql)
+    return _ESPACOS.sub(' ', sql).strip()
+
+
+class PerfilRequisicao:
+    """Consultas e tempos acumulados durante uma requisição"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.consultas_template = 0
+        self.tempo_sql = 0.0
+        self.tempo_template = 0.0
+        self.profundidade_template = 0
+        self.impressoes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo_sql += time.perf_counter() - inicio
+            self.consultas += 1
+            if self.profundidade_template:
+                self.consultas_template += 1
+            if not sql.lstrip().upper().startswith(_CONTROLE_TRANSACAO):
+                self.impressoes[impressao_digital(sql)] += 1
+
+    def repetidas(self, limite):
+        """Consultas executadas `limite` vezes ou mais (provável N+1), da mais repetida para a menos"""
+        return [(sql, total) for sql, total in self.impressoes.most_common() if total >= limite]
+
+
+def _render_medido(self, context):
+    """Template.render com a medição do tempo de renderização (só o template de nível mais alto)"""
+    perfil = _perfil_atual.get()
+    if perfil is None or perfil.profundidade_template:
+        return _render_original(self, context)
+    perfil.profundidade_template += 1
+    inicio = time.perf_counter()
+    try:
+        return _render_original(self, context)
+    finally:
+        perfil.tempo_template += time.perf_counter() - inicio
+        perfil.profundidade_template -= 1
+
+
+def _instrumentar_templates():
+    global _render_original
+    if _render_original is None:
+        _render_original = template_base.Template.render
+        template_base.Template.render = _render_medido
+
+
+@contextmanager
+def _medindo(perfil):
+    """Conta as consultas de todas as conexões e os templates renderizados no bloco para o perfil"""
+    token = _perfil_atual.set(perfil)
+    try:
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(perfil))
+            yield
+    finally:
+        _perfil_atual.reset(token)
+
+
+class PerfilRequisicaoMiddleware:
+    """
+    Perfil das requisições, ativado por PERFIL_REQUISICOES (GUTO_PERFIL=1).
+
+    Para uma fração PERFIL_AMOSTRAGEM das requisições registra a quantidade
+    e o tempo das consultas SQL, o tempo de renderização dos templates e o
+    tempo restante da view. Os números vão no cabeçalho Server-Timing (visível
+    nas ferramentas do navegador) e numa linha de log; consultas repetidas
+    PERFIL_LIMITE_REPETICOES vezes ou mais são registradas como possível N+1.
+
+    O tempo de template inclui as consultas disparadas durante a renderização
+    (ex.: {{ turma.get_total_alunos }} em um laço), contadas à parte em
+    `consultas_template`.
+
+    Em respostas em streaming (ex.: exportações do censo) as consultas rodam
+    enquanto o corpo é enviado: a medição continua em cada parte do corpo e
+    a linha de log sai só no fim do envio, sem o cabeçalho Server-Timing
+    (já enviado a essa altura). Streaming assíncrono não é medido e o log
+    diz isso.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFIL_REQUISICOES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.amostragem = settings.PERFIL_AMOSTRAGEM
+        self.limite_repeticoes = settings.PERFIL_LIMITE_REPETICOES
+        _instrumentar_templates()
+
+    def __call__(self, request):
+        if random.random() >= self.amostragem:
+            return self.get_response(request)
+
+        perfil = PerfilRequisicao()
+        inicio = time.perf_counter()
+        with _medindo(perfil):
+            response = self.get_response(request)
+
+        if not response.streaming:
+            self._registrar(request, response, perfil, time.perf_counter() - inicio)
+        elif response.is_async:
+            self._registrar(request, response, perfil, time.perf_counter() - inicio, streaming='nao_medido')
+        else:
+            response.streaming_content = self._medir_streaming(
+                request, response, perfil, inicio, response.streaming_content
+            )
+        return response
+
+    def _medir_streaming(self, request, response, perfil, inicio, partes):
+        """Repassa as partes do corpo medindo a geração de cada uma; registra o perfil no fim"""
+        partes = iter(partes)
+        try:
+            while True:
+                with _medindo(perfil):
+                    parte = next(partes, None)
+                if parte is None:
+                    break
+                yield parte
+        finally:
+            self._registrar(request, response, perfil, time.perf_counter() - inicio, streaming='sim')
+
+    def _registrar(self, request, response, perfil, total, streaming=None):
+        repetidas = perfil.repetidas(self.limite_repeticoes)
+        view = max(total - perfil.tempo_template - perfil.tempo_sql, 0)
+        if streaming is None:
+            response['Server-Timing'] = ', '.join([
+                f'sql;dur={perfil.tempo_sql * 1000:.1f};desc="{perfil.consultas} consultas"',
+                f'template;dur={perfil.tempo_template * 1000:.1f}',
+                f'view;dur={view * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ] + ([f'n1;desc="{len(repetidas)} consultas repetidas"'] if repetidas else []))
+
+        dados = {
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': response.status_code,
+            'consultas': perfil.consultas,
+            'consultas_template': perfil.consultas_template,
+            'sql_ms': round(perfil.tempo_sql * 1000, 1),
+            'template_ms': round(perfil.tempo_template * 1000, 1),
+            'view_ms': round(view * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'repetidas': len(repetidas),
+        }
+        if streaming:
+            dados['streaming'] = streaming
+        logger.info(' '.join(f'{chave}={valor}' for chave, valor in dados.items()), extra={'perfil': dados})
+        for sql, vezes in repetidas:
+            logger.warning(
+                'Possível N+1 em %s: consulta executada %s vezes: %s',
+                request.path, vezes, sql[:300], extra={'perfil': dados}
+            )
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:18
+
+import re
+
+from django.db import migrations, models
+
+
+def popular_sequencias_disciplinas(apps, schema_editor):
+    """Inicia as sequências a partir dos códigos de disciplina já cadastrados (PREFIXO000)"""
+    Disciplina = apps.get_model('turma', 'Disciplina')
+    SequenciaCodigo = apps.get_model('utilitarios', 'SequenciaCodigo')
+
+    ultimos = {}
+    for codigo in Disciplina.objects.values_list('codigo', flat=True):
+        encontrado = re.fullmatch(r'(.+?)(\d{3,})', codigo or '')
+        if encontrado:
+            prefixo, numero = encontrado.group(1), int(encontrado.group(2))
+            ultimos[prefixo] = max(ultimos.get(prefixo, 0), numero)
+
+    SequenciaCodigo.objects.bulk_create([
+        SequenciaCodigo(prefixo=prefixo, ultimo_valor=ultimo)
+        for prefixo, ultimo in ultimos.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utilitarios', '0001_initial'),
+        ('turma', '0008_alter_disciplina_codigo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenciaCodigo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefixo', models.CharField(max_length=30, unique=True, verbose_name='Prefixo')),
+                ('ultimo_valor', models.PositiveIntegerField(default=0, verbose_name='Último Valor Alocado')),
+            ],
+            options={
+                'verbose_name': 'Sequência de Código',
+                'verbose_name_plural': 'Sequências de Códigos',
+                'ordering': ['prefixo'],
+            },
+        ),
+        migrations.RunPython(popular_sequencias_disciplinas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utilitarios', '0002_sequenciacodigo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroauditoria',
+            index=models.Index(fields=['-data_acao'], name='auditoria_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroauditoria',
+            index=models.Index(fields=['usuario', '-data_acao'], name='auditoria_usuario_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroauditoria',
+            index=models.Index(fields=['acao', '-data_acao'], name='auditoria_acao_data_idx'),
+        ),
+    ]
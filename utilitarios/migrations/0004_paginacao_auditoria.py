@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def preencher_usuarios_auditados(apps, schema_editor):
+    RegistroAuditoria = apps.get_model('utilitarios', 'RegistroAuditoria')
+    UsuarioAuditado = apps.get_model('utilitarios', 'UsuarioAuditado')
+    UsuarioAuditado.objects.bulk_create(
+        UsuarioAuditado(usuario_id=linha['usuario'], ultima_acao=linha['ultima_acao'])
+        for linha in RegistroAuditoria.objects.values('usuario').annotate(ultima_acao=models.Max('data_acao')).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('utilitarios', '0003_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsuarioAuditado',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+                ('ultima_acao', models.DateTimeField(verbose_name='Última Ação')),
+            ],
+            options={
+                'verbose_name': 'Usuário Auditado',
+                'verbose_name_plural': 'Usuários Auditados',
+            },
+        ),
+        migrations.RunPython(preencher_usuarios_auditados, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='registroauditoria',
+            name='auditoria_data_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='registroauditoria',
+            name='auditoria_usuario_data_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='registroauditoria',
+            name='auditoria_acao_data_idx',
+        ),
+        migrations.AddIndex(
+            model_name='registroauditoria',
+            index=models.Index(fields=['-data_acao', '-id'], name='auditoria_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroauditoria',
+            index=models.Index(fields=['usuario', '-data_acao', '-id'], name='auditoria_usuario_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroauditoria',
+            index=models.Index(fields=['acao', '-data_acao', '-id'], name='auditoria_acao_data_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utilitarios', '0004_paginacao_auditoria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAuditoriaArquivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('data_acao', models.DateTimeField(verbose_name='Data/Hora da Ação')),
+                ('acao', models.CharField(choices=[('CREATE', 'Criação'), ('UPDATE', 'Alteração'), ('DELETE', 'Exclusão'), ('VIEW', 'Consulta'), ('LOGIN', 'Login'), ('LOGOUT', 'Logout'), ('PRINT', 'Impressão')], max_length=10, verbose_name='Ação')),
+                ('tela', models.CharField(max_length=100, verbose_name='Tela/Módulo')),
+                ('funcionalidade', models.CharField(max_length=100, verbose_name='Funcionalidade')),
+                ('descricao', models.TextField(verbose_name='Descrição da Ação')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='Endereço IP')),
+                ('user_agent', models.TextField(blank=True, null=True, verbose_name='User Agent')),
+                ('dados_alterados', models.JSONField(blank=True, null=True, verbose_name='Dados Alterados')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Registro de Auditoria Arquivado',
+                'verbose_name_plural': 'Registros de Auditoria Arquivados',
+                'ordering': ['-data_acao'],
+                'indexes': [models.Index(fields=['-data_acao', '-id'], name='auditoria_arq_data_idx'), models.Index(fields=['usuario', '-data_acao', '-id'], name='auditoria_arq_usuario_idx'), models.Index(fields=['acao', '-data_acao', '-id'], name='auditoria_arq_acao_idx')],
+            },
+        ),
+    ]
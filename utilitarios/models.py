@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import RegexValidator, EmailValidator
-from datetime import date, datetime
+from django.utils import timezone
+from datetime import date, datetime, timedelta
 from alunos.models import Aluno
 
 # ============================================
@@ -285,10 +288,61 @@ class RegistroAuditoria(models.Model):
         verbose_name = "Registro de Auditoria"
         verbose_name_plural = "Registros de Auditoria"
         ordering = ['-data_acao']
+        indexes = [
+            # Tela de auditoria: paginação por (data, id), com filtros opcionais por usuário ou ação
+            models.Index(fields=['-data_acao', '-id'], name='auditoria_data_idx'),
+            models.Index(fields=['usuario', '-data_acao', '-id'], name='auditoria_usuario_data_idx'),
+            models.Index(fields=['acao', '-data_acao', '-id'], name='auditoria_acao_data_idx'),
+        ]
     
     def __str__(self):
         return f"{self.usuario.get_full_name()} - {self.get_acao_display()} - {self.tela} - {self.data_acao.strftime('%d/%m/%Y %H:%M')}"
 
+class RegistroAuditoriaArquivado(models.Model):
+    """
+    Registros de auditoria mais antigos que o período de retenção, movidos
+    pelo comando archive_audit (mesmo id e campos do RegistroAuditoria).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name="Usuário")
+    data_acao = models.DateTimeField(verbose_name="Data/Hora da Ação")
+    acao = models.CharField(max_length=10, choices=RegistroAuditoria.ACAO_CHOICES, verbose_name="Ação")
+    tela = models.CharField(max_length=100, verbose_name="Tela/Módulo")
+    funcionalidade = models.CharField(max_length=100, verbose_name="Funcionalidade")
+    descricao = models.TextField(verbose_name="Descrição da Ação")
+    ip_address = models.GenericIPAddressField(blank=True, null=True, verbose_name="Endereço IP")
+    user_agent = models.TextField(blank=True, null=True, verbose_name="User Agent")
+    dados_alterados = models.JSONField(blank=True, null=True, verbose_name="Dados Alterados")
+    
+    class Meta:
+        verbose_name = "Registro de Auditoria Arquivado"
+        verbose_name_plural = "Registros de Auditoria Arquivados"
+        ordering = ['-data_acao']
+        indexes = [
+            models.Index(fields=['-data_acao', '-id'], name='auditoria_arq_data_idx'),
+            models.Index(fields=['usuario', '-data_acao', '-id'], name='auditoria_arq_usuario_idx'),
+            models.Index(fields=['acao', '-data_acao', '-id'], name='auditoria_arq_acao_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.usuario.get_full_name()} - {self.get_acao_display()} - {self.tela} - {self.data_acao.strftime('%d/%m/%Y %H:%M')}"
+
+class UsuarioAuditado(models.Model):
+    """
+    Usuários que já têm registros de auditoria: opções do filtro da tela de
+    auditoria sem um DISTINCT na tabela de registros (mantida por
+    utilitarios.auditoria a cada gravação).
+    """
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+', verbose_name="Usuário")
+    ultima_acao = models.DateTimeField(verbose_name="Última Ação")
+    
+    class Meta:
+        verbose_name = "Usuário Auditado"
+        verbose_name_plural = "Usuários Auditados"
+    
+    def __str__(self):
+        return f"{self.usuario.get_full_name() or self.usuario.username} ({self.ultima_acao:%d/%m/%Y %H:%M})"
+
 class SolicitacaoTransferencia(models.Model):
     """Model para Solicitações de Transferência (RF2003)"""
     STATUS_CHOICES = [
@@ -413,3 +467,88 @@ class TipoAvaliacao(models.Model):
     
     def __str__(self):
         return f"{self.nome} (Peso: {self.peso})"
+
+# ============================================
+# SEQUÊNCIAS DE CÓDIGOS AUTOMÁTICOS
+# ============================================
+
+class SequenciaCodigo(models.Model):
+    """Último número alocado por prefixo de código automático (ex.: MAT -> MAT001, MAT002...)"""
+    prefixo = models.CharField(max_length=30, unique=True, verbose_name="Prefixo")
+    ultimo_valor = models.PositiveIntegerField(default=0, verbose_name="Último Valor Alocado")
+    
+    class Meta:
+        verbose_name = "Sequência de Código"
+        verbose_name_plural = "Sequências de Códigos"
+        ordering = ['prefixo']
+    
+    def __str__(self):
+        return f"{self.prefixo} ({self.ultimo_valor})"
+
+# ============================================
+# TAREFAS EM SEGUNDO PLANO
+# ============================================
+
+class Tarefa(models.Model):
+    """
+    Tarefa executada fora da requisição pelos trabalhadores de
+    `manage.py run_workers` (ver utilitarios/fila.py)
+    """
+    STATUS_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('EXECUTANDO', 'Executando'),
+        ('CONCLUIDA', 'Concluída'),
+        ('FALHOU', 'Falhou'),
+    ]
+    
+    nome = models.CharField(max_length=100, verbose_name="Nome da Tarefa")
+    argumentos = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Argumentos")
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='PENDENTE', verbose_name="Status")
+    
+    # Execução e novas tentativas
+    tentativas = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+    max_tentativas = models.PositiveIntegerField(default=3, verbose_name="Máximo de Tentativas")
+    executar_apos = models.DateTimeField(default=timezone.now, verbose_name="Executar Após")
+    bloqueada_ate = models.DateTimeField(blank=True, null=True, verbose_name="Bloqueada Até")
+    trabalhador = models.CharField(max_length=100, blank=True, verbose_name="Trabalhador")
+    
+    # Progresso e resultado
+    progresso = models.PositiveSmallIntegerField(default=0, verbose_name="Progresso (%)")
+    mensagem = models.CharField(max_length=255, blank=True, verbose_name="Mensagem")
+    resultado = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder, verbose_name="Resultado")
+    erro = models.TextField(blank=True, verbose_name="Erro")
+    
+    # Controle
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='+', verbose_name="Solicitada por")
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+    data_inicio = models.DateTimeField(blank=True, null=True, verbose_name="Início da Execução")
+    data_fim = models.DateTimeField(blank=True, null=True, verbose_name="Fim da Execução")
+    
+    class Meta:
+        verbose_name = "Tarefa"
+        verbose_name_plural = "Tarefas"
+        ordering = ['-data_criacao']
+        indexes = [
+            # Busca dos trabalhadores: próximas pendentes e execuções abandonadas
+            models.Index(fields=['status', 'executar_apos'], name='tarefa_fila_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.nome} #{self.pk} ({self.get_status_display()})"
+    
+    @property
+    def finalizada(self):
+        return self.status in ('CONCLUIDA', 'FALHOU')
+    
+    def reportar_progresso(self, progresso, mensagem=''):
+        """
+        Grava o progresso (0-100) exibido pelo endpoint de situação; vale
+        também como sinal de vida, adiando o prazo após o qual a execução é
+        considerada abandonada e outro trabalhador pode assumi-la.
+        """
+        self.progresso = max(0, min(int(progresso), 100))
+        self.mensagem = mensagem[:255]
+        self.bloqueada_ate = timezone.now() + timedelta(seconds=settings.TAREFAS_TEMPO_LIMITE)
+        Tarefa.objects.filter(pk=self.pk).update(
+            progresso=self.progresso, mensagem=self.mensagem, bloqueada_ate=self.bloqueada_ate
+        )
@@ -0,0 +1,189 @@
+"""
+Paginação por cursor (keyset) para listas longas ordenadas por data.
+
+Em vez de OFFSET, cada página busca as linhas "depois" (ou "antes") da
+chave de ordenação da última linha exibida, então a página 1000 custa o
+mesmo que a primeira quando há índice na ordenação. O total exibido vem de
+total_aproximado, que não conta a tabela a cada requisição.
+"""
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+
+def total_aproximado(queryset, timeout=300):
+    """
+    Quantidade de linhas do queryset sem um COUNT(*) por requisição: no
+    PostgreSQL, sem filtros, a estimativa do planejador (pg_class.reltuples);
+    nos demais casos o COUNT(*) fica em cache por `timeout` segundos.
+    """
+    queryset = queryset.order_by()
+    conexao = connections[queryset.db]
+    if conexao.vendor == 'postgresql' and not queryset.query.where:
+        with conexao.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            linha = cursor.fetchone()
+        # reltuples = -1 enquanto a tabela não passou por ANALYZE
+        if linha and linha[0] >= 0:
+            return linha[0]
+
+    sql, params = queryset.query.sql_with_params()
+    chave = 'total_aproximado:' + hashlib.sha256(f'{queryset.db}{sql}{params}'.encode()).hexdigest()
+    total = cache.get(chave)
+    if total is None:
+        total = queryset.count()
+        cache.set(chave, total, timeout)
+    return total
+
+
+class PaginaCursor:
+    """Uma página de PaginadorCursor; itera sobre os objetos como a Page do Django"""
+
+    def __init__(self, object_list, cursor_anterior=None, cursor_proximo=None, total=None):
+        self.object_list = object_list
+        self.cursor_anterior = cursor_anterior
+        self.cursor_proximo = cursor_proximo
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def tem_anterior(self):
+        return self.cursor_anterior is not None
+
+    @property
+    def tem_proxima(self):
+        return self.cursor_proximo is not None
+
+    @property
+    def tem_outras_paginas(self):
+        return self.tem_anterior or self.tem_proxima
+
+
+class PaginadorCursor:
+    """
+    Paginação keyset de `queryset` pela `ordenacao` (ex.: ('-data_acao', '-id')).
+
+    A ordenação precisa terminar num campo único (normalmente o id) e não ter
+    campos nulos; um índice com as mesmas colunas torna cada página uma busca
+    por faixa no índice.
+
+    `continuacao` são querysets lidos quando o principal acaba, cujas linhas
+    vêm todas depois das dele na ordenação (ex.: o arquivo da auditoria, só
+    com registros mais antigos que os da tabela principal).
+    """
+
+    def __init__(self, queryset, ordenacao, por_pagina=50, contar=True, continuacao=()):
+        self.queryset = queryset
+        self.fontes = [queryset, *continuacao]
+        self.campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in ordenacao]
+        self.por_pagina = por_pagina
+        self.contar = contar
+
+    def get_pagina(self, depois=None, antes=None):
+        """Página seguinte a `depois` ou anterior a `antes` (cursores da página atual); a primeira se nenhum"""
+        try:
+            if antes:
+                return self._pagina_anterior(self._decodificar(antes))
+            if depois:
+                return self._pagina_seguinte(self._decodificar(depois))
+        except ValueError:
+            pass
+        return self._pagina_seguinte(None)
+
+    def _buscar(self, fontes, chave, inverter):
+        """Até por_pagina + 1 linhas depois da chave, passando para a fonte seguinte quando uma acaba"""
+        itens = []
+        for fonte in fontes:
+            queryset = self._ordenado(fonte, inverter)
+            if chave is not None:
+                queryset = queryset.filter(self._filtro(chave, inverter))
+            itens.extend(queryset[:self.por_pagina + 1 - len(itens)])
+            if len(itens) > self.por_pagina:
+                break
+        return itens
+
+    def _pagina_seguinte(self, chave):
+        itens = self._buscar(self.fontes, chave, inverter=False)
+        mais = len(itens) > self.por_pagina
+        itens = itens[:self.por_pagina]
+        return self._montar(
+            itens,
+            anterior=chave is not None and bool(itens),
+            proxima=mais,
+        )
+
+    def _pagina_anterior(self, chave):
+        itens = self._buscar(reversed(self.fontes), chave, inverter=True)
+        if len(itens) <= self.por_pagina:
+            # Chegou ao início: mostra a primeira página completa
+            return self._pagina_seguinte(None)
+        itens = itens[:self.por_pagina]
+        itens.reverse()
+        return self._montar(itens, anterior=True, proxima=True)
+
+    def _montar(self, itens, anterior, proxima):
+        return PaginaCursor(
+            itens,
+            cursor_anterior=self._codificar(itens[0]) if anterior else None,
+            cursor_proximo=self._codificar(itens[-1]) if proxima and itens else None,
+            total=sum(total_aproximado(fonte) for fonte in self.fontes) if self.contar else None,
+        )
+
+    def _ordenado(self, queryset, inverter):
+        return queryset.order_by(*[
+            f'-{nome}' if decrescente != inverter else nome for nome, decrescente in self.campos
+        ])
+
+    def _filtro(self, chave, inverter):
+        """
+        Linhas depois da chave na ordenação: (a < x) OR (a = x AND b < y)...
+        mais a faixa a <= x, que permite ao banco usar o índice da primeira coluna.
+        """
+        condicao = Q()
+        iguais = {}
+        for (nome, decrescente), valor in zip(self.campos, chave):
+            operador = 'lt' if decrescente != inverter else 'gt'
+            condicao |= Q(**iguais, **{f'{nome}__{operador}': valor})
+            iguais[nome] = valor
+        nome, decrescente = self.campos[0]
+        faixa = Q(**{f'{nome}__{"lte" if decrescente != inverter else "gte"}': chave[0]})
+        return faixa & condicao
+
+    def _codificar(self, objeto):
+        valores = [getattr(objeto, objeto._meta.get_field(nome).attname) for nome, _ in self.campos]
+        # isoformat direto: o DjangoJSONEncoder corta os microssegundos, que fazem parte da chave
+        valores = [valor.isoformat() if hasattr(valor, 'isoformat') else valor for valor in valores]
+        dados = json.dumps(valores, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+    def _decodificar(self, cursor):
+        try:
+            dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            valores = json.loads(dados)
+        except (ValueError, TypeError) as erro:
+            raise ValueError('Cursor inválido') from erro
+        if not isinstance(valores, list) or len(valores) != len(self.campos):
+            raise ValueError('Cursor inválido')
+        try:
+            return [self._campo(nome).to_python(valor) for (nome, _), valor in zip(self.campos, valores)]
+        except Exception as erro:
+            raise ValueError('Cursor inválido') from erro
+
+    def _campo(self, nome):
+        return self.queryset.model._meta.get_field(nome)
@@ -0,0 +1,96 @@
+"""
+Verificação dos planos de execução (EXPLAIN QUERY PLAN) das consultas mais
+frequentes do diário, das turmas e da auditoria.
+
+Cada consulta crítica é montada com o mesmo formato usado pelas views; se
+alguma voltar a varrer a tabela inteira (SCAN sem índice), a verificação
+falha — no teste `PlanosConsultaTest` e no comando `check_query_plans`.
+"""
+from django.db import connections
+from django.utils import timezone
+
+
+def _consultas_criticas():
+    """Retorna {nome: queryset} com os formatos de consulta das views"""
+    from alunos.models import Aluno
+    from dashboard.models import AtividadeRecente
+    from turma.models import Avaliacao, Enturmacao, LancamentoNota, Turma
+    from utilitarios.models import RegistroAuditoria
+    from utilitarios.paginacao import PaginadorCursor
+
+    def pagina_seguinte(queryset, ordenacao, chave):
+        paginador = PaginadorCursor(queryset, ordenacao)
+        return paginador._ordenado(queryset, inverter=False).filter(paginador._filtro(chave, inverter=False))[:51]
+
+    agora = timezone.now()
+    turma = Turma(pk=1)
+    return {
+        # turma.views / diario.views: alunos ativos da turma
+        'alunos_da_turma': Aluno.objects.filter(
+            enturmacoes__turma=turma, enturmacoes__ativo=True
+        ).order_by('nome'),
+        'alunos_enturmados': turma.get_alunos_enturmados(),
+        'enturmacoes_ativas': Enturmacao.objects.filter(turma=turma, ativo=True),
+        # diario.views: avaliações da turma/disciplina (com estatísticas) e da divisão
+        'avaliacoes_disciplina': Avaliacao.objects.filter(
+            turma_id=1, disciplina_id=1
+        ).with_estatisticas().order_by('nome'),
+        'avaliacoes_divisao': Avaliacao.objects.filter(
+            turma_id=1, disciplina_id=1, divisao_periodo_id=1
+        ).order_by('data_aplicacao'),
+        'avaliacoes_recentes_turma': Avaliacao.objects.filter(turma_id=1).order_by('-data_aplicacao')[:5],
+        # alunos.views / turma.forms: arquivo corrente
+        'alunos_corrente': Aluno.objects.filter(tipo_arquivo='CORRENTE').order_by('nome'),
+        # utilitarios.views.auditoria
+        'auditoria': RegistroAuditoria.objects.order_by('-data_acao')[:50],
+        'auditoria_por_usuario': RegistroAuditoria.objects.filter(usuario_id=1).order_by('-data_acao')[:50],
+        'auditoria_por_acao': RegistroAuditoria.objects.filter(acao='LOGIN').order_by('-data_acao')[:50],
+        # utilitarios.paginacao: páginas seguintes da auditoria e das listas de notas e avaliações
+        'auditoria_cursor': pagina_seguinte(RegistroAuditoria.objects.all(), ('-data_acao', '-id'), [agora, 1]),
+        'auditoria_cursor_por_acao': pagina_seguinte(
+            RegistroAuditoria.objects.filter(acao='LOGIN'), ('-data_acao', '-id'), [agora, 1]
+        ),
+        'lancamentos_cursor': pagina_seguinte(LancamentoNota.objects.all(), ('-data_lancamento', '-id'), [agora, 1]),
+        'avaliacoes_cursor': pagina_seguinte(Avaliacao.objects.all(), ('-data_aplicacao', '-id'), [agora.date(), 1]),
+        # dashboard: avaliações pendentes e atividades recentes
+        'avaliacoes_pendentes': Avaliacao.objects.filter(notas_lancadas=False).order_by().values('pk'),
+        'atividades_recentes': AtividadeRecente.objects.select_related('usuario')[:10],
+    }
+
+
+def plano_consulta(queryset):
+    """Linhas de detalhe do EXPLAIN QUERY PLAN do queryset (somente SQLite)"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'sqlite':
+        raise NotImplementedError('A verificação de planos de consulta está disponível apenas no SQLite.')
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [linha[3] for linha in cursor.fetchall()]
+
+
+def varreduras_completas(plano):
+    """Linhas do plano que percorrem uma tabela inteira sem usar índice"""
+    varreduras = []
+    for linha in plano:
+        if not linha.startswith('SCAN '):
+            continue
+        # Subconsultas materializadas e tabelas virtuais (FTS5) não são tabelas do modelo
+        if linha.startswith('SCAN (') or ' USING ' in linha or 'VIRTUAL TABLE' in linha:
+            continue
+        varreduras.append(linha)
+    return varreduras
+
+
+def verificar_planos(consultas=None):
+    """
+    Executa o EXPLAIN QUERY PLAN de cada consulta e retorna
+    {nome: (plano, varreduras completas)}.
+    """
+    if consultas is None:
+        consultas = _consultas_criticas()
+    resultado = {}
+    for nome, queryset in consultas.items():
+        plano = plano_consulta(queryset)
+        resultado[nome] = (plano, varreduras_completas(plano))
+    return resultado
@@ -0,0 +1,91 @@
+"""
+Retenção dos registros de auditoria e das atividades recentes.
+
+Linhas mais antigas que o corte são movidas, em lotes, para as tabelas de
+arquivo (RegistroAuditoriaArquivado, AtividadeRecenteArquivada) com o mesmo
+id; assim as tabelas principais, lidas a cada requisição, ficam do tamanho
+do período de retenção (RETENCAO_DIAS). A tela de auditoria continua a
+paginação no arquivo quando os registros recentes acabam.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+
+@dataclass(frozen=True)
+class TabelaRetencao:
+    origem: str
+    arquivo: str
+    campo_data: str
+
+    @property
+    def model_origem(self):
+        return apps.get_model(self.origem)
+
+    @property
+    def model_arquivo(self):
+        return apps.get_model(self.arquivo)
+
+
+TABELAS = {
+    'auditoria': TabelaRetencao('utilitarios.RegistroAuditoria', 'utilitarios.RegistroAuditoriaArquivado', 'data_acao'),
+    'atividades': TabelaRetencao('dashboard.AtividadeRecente', 'dashboard.AtividadeRecenteArquivada', 'data_atividade'),
+}
+
+
+def corte_retencao(nome, agora=None):
+    """Data a partir da qual as linhas da tabela ficam na tabela principal (None = sem retenção configurada)"""
+    dias = settings.RETENCAO_DIAS.get(nome)
+    if dias is None:
+        return None
+    return (agora or timezone.now()) - timedelta(days=dias)
+
+
+def linhas_a_arquivar(nome, antes):
+    """Linhas da tabela `nome` com data anterior a `antes`, da mais antiga para a mais nova"""
+    tabela = TABELAS[nome]
+    return tabela.model_origem.objects.filter(**{f'{tabela.campo_data}__lt': antes}).order_by(tabela.campo_data, 'id')
+
+
+def arquivar(nome, antes, lote=5000, progresso=None):
+    """
+    Move para o arquivo as linhas da tabela `nome` com data anterior a
+    `antes`, `lote` linhas por transação (transações curtas não seguram o
+    lock de escrita do SQLite por muito tempo). Retorna o total movido.
+
+    A cópia é um INSERT ... SELECT no próprio banco, que ignora ids já
+    arquivados; como cada lote é copiado e apagado na mesma transação, uma
+    execução interrompida pode simplesmente ser repetida.
+    """
+    tabela = TABELAS[nome]
+    origem, arquivo = tabela.model_origem, tabela.model_arquivo
+    conexao = connections[router.db_for_write(origem)]
+    campos = arquivo._meta.concrete_fields
+    insert = (
+        f'{conexao.ops.insert_statement(on_conflict=OnConflict.IGNORE)} '
+        f'{conexao.ops.quote_name(arquivo._meta.db_table)} '
+        f'({", ".join(conexao.ops.quote_name(campo.column) for campo in campos)})'
+    )
+    sufixo = conexao.ops.on_conflict_suffix_sql(campos, OnConflict.IGNORE, None, None)
+    pendentes = linhas_a_arquivar(nome, antes)
+
+    total = 0
+    while True:
+        with transaction.atomic(using=conexao.alias):
+            ids = list(pendentes.values_list('id', flat=True)[:lote])
+            if not ids:
+                break
+            lote_atual = origem.objects.filter(pk__in=ids).order_by()
+            sql, params = lote_atual.values_list(*[campo.attname for campo in campos]).query.sql_with_params()
+            with conexao.cursor() as cursor:
+                cursor.execute(f'{insert} {sql} {sufixo}', params)
+            lote_atual.delete()
+        total += len(ids)
+        if progresso:
+            progresso(total)
+    return total
@@ -0,0 +1,67 @@
+"""Serviços compartilhados do módulo Utilitários"""
+from django.db import connection, transaction
+
+from .models import SequenciaCodigo
+
+
+def alocar_sequencia(prefixo, quantidade=1):
+    """
+    Reserva atomicamente os próximos `quantidade` números da sequência do
+    prefixo e retorna o range alocado.
+
+    Nos bancos com upsert e RETURNING (SQLite 3.35+, PostgreSQL) a reserva
+    é um único INSERT ... ON CONFLICT DO UPDATE ... RETURNING; nos demais,
+    um SELECT FOR UPDATE dentro de uma transação. Números reservados e não
+    usados (ex.: erro ao salvar) não são reaproveitados.
+    """
+    if quantidade < 1:
+        return range(0)
+
+    features = connection.features
+    if features.supports_update_conflicts and features.can_return_columns_from_insert:
+        tabela = connection.ops.quote_name(SequenciaCodigo._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {tabela} (prefixo, ultimo_valor) VALUES (%s, %s) '
+                f'ON CONFLICT (prefixo) DO UPDATE SET ultimo_valor = {tabela}.ultimo_valor + excluded.ultimo_valor '
+                f'RETURNING ultimo_valor',
+                [prefixo, quantidade]
+            )
+            ultimo = cursor.fetchone()[0]
+    else:
+        with transaction.atomic():
+            sequencia, _ = SequenciaCodigo.objects.select_for_update().get_or_create(prefixo=prefixo)
+            sequencia.ultimo_valor += quantidade
+            sequencia.save(update_fields=['ultimo_valor'])
+            ultimo = sequencia.ultimo_valor
+
+    return range(ultimo - quantidade + 1, ultimo + 1)
+
+
+def formatar_codigo(prefixo, numero, digitos=3):
+    """Formata o número alocado como PREFIXO000"""
+    return f"{prefixo}{numero:0{digitos}d}"
+
+
+def alocar_codigos(prefixo, quantidade=1, digitos=3, em_uso=None):
+    """
+    Aloca `quantidade` códigos no formato PREFIXO000.
+
+    `em_uso` é uma função opcional que recebe a lista de códigos propostos
+    e devolve os que já existem (ex.: cadastrados manualmente); esses são
+    descartados e novos números são reservados até completar a quantidade.
+    """
+    codigos = []
+    while len(codigos) < quantidade:
+        propostos = [
+            formatar_codigo(prefixo, numero, digitos)
+            for numero in alocar_sequencia(prefixo, quantidade - len(codigos))
+        ]
+        ocupados = set(em_uso(propostos)) if em_uso else set()
+        codigos.extend(codigo for codigo in propostos if codigo not in ocupados)
+    return codigos
+
+
+def proximo_codigo(prefixo, digitos=3, em_uso=None):
+    """Aloca um único código no formato PREFIXO000 (ver alocar_codigos)"""
+    return alocar_codigos(prefixo, 1, digitos, em_uso)[0]
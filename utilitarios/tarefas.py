@@ -0,0 +1,27 @@
+"""Tarefas em segundo plano do app (executadas por manage.py run_workers)"""
+from django.utils.dateparse import parse_datetime
+
+from .fila import registrar_tarefa
+from .retencao import TABELAS, arquivar, corte_retencao, linhas_a_arquivar
+
+
+@registrar_tarefa('utilitarios.arquivar_auditoria')
+def arquivar_auditoria(tarefa, tabelas=None, antes=None, lote=5000):
+    """
+    Mesmo trabalho de `manage.py archive_audit`: move as linhas antigas para
+    o arquivo, com o progresso calculado sobre o total a mover.
+    """
+    cortes = {}
+    for nome in tabelas or sorted(TABELAS):
+        corte = parse_datetime(antes) if antes else corte_retencao(nome)
+        if corte is not None:
+            cortes[nome] = corte
+    total = sum(linhas_a_arquivar(nome, corte).count() for nome, corte in cortes.items())
+
+    movidas = {}
+    for nome, corte in cortes.items():
+        def progresso(linhas, nome=nome):
+            feitas = sum(movidas.values()) + linhas
+            tarefa.reportar_progresso(feitas * 100 // max(total, 1), f'{nome}: {linhas} linhas arquivadas')
+        movidas[nome] = arquivar(nome, corte, lote, progresso)
+    return movidas
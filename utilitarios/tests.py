@@ -1,3 +1,571 @@
-from django.test import TestCase
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command, CommandError
+from django.contrib.auth.models import User
+from django.db import connection, transaction, OperationalError
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, RequestFactory, override_settings
+from utilitarios.models import SequenciaCodigo, RegistroAuditoria, RegistroAuditoriaArquivado, UsuarioAuditado, Tarefa
+from utilitarios.paginacao import PaginadorCursor, total_aproximado
+from utilitarios.auditoria import EscritorAuditoria, registrar_auditoria
+from dashboard.models import AtividadeRecente, AtividadeRecenteArquivada
+from utilitarios.retencao import corte_retencao
+from utilitarios.fila import registrar_tarefa, enfileirar, reivindicar, executar
+from utilitarios.services import alocar_sequencia, alocar_codigos
+from utilitarios.decorators import repetir_se_bloqueado
+from utilitarios.planos_consulta import verificar_planos, varreduras_completas
+from utilitarios.benchmark_views import CASOS, executar_benchmark
+from utilitarios.middleware import PerfilRequisicaoMiddleware, impressao_digital
+from alunos.models import Aluno
+from turma.models import Enturmacao, NotaAvaliacao, RegistroFrequencia
+from busca.services import buscar
+from guto_system.database import database_from_env
 
-# Create your tests here.
+
+class SequenciaCodigoTest(TestCase):
+    """Testes para a alocação atômica de códigos automáticos"""
+
+    def test_alocacao_com_upsert(self):
+        """Teste 1: Verifica a reserva de números com um único comando por alocação"""
+        with self.assertNumQueries(1):
+            self.assertEqual(list(alocar_sequencia('ABC')), [1])
+        self.assertEqual(list(alocar_sequencia('ABC', 3)), [2, 3, 4])
+        self.assertEqual(list(alocar_sequencia('XYZ', 2)), [1, 2])
+        self.assertEqual(SequenciaCodigo.objects.get(prefixo='ABC').ultimo_valor, 4)
+
+    def test_alocacao_com_select_for_update(self):
+        """Teste 2: Verifica o fallback para bancos sem upsert com RETURNING"""
+        alocar_sequencia('ABC', 2)
+        with mock.patch.object(connection.features, 'can_return_columns_from_insert', False):
+            self.assertEqual(list(alocar_sequencia('ABC', 2)), [3, 4])
+            self.assertEqual(list(alocar_sequencia('NOVO')), [1])
+
+    def test_codigos_em_uso_sao_pulados(self):
+        """Teste 3: Verifica que códigos já existentes são descartados"""
+        codigos = alocar_codigos('ABC', 3, em_uso=lambda propostos: {'ABC002'} & set(propostos))
+        self.assertEqual(codigos, ['ABC001', 'ABC003', 'ABC004'])
+
+
+class PerfilSQLiteTest(TransactionTestCase):
+    """Testes para o perfil de conexão do SQLite e a repetição em caso de bloqueio"""
+
+    def test_pragmas_aplicados_na_conexao(self):
+        """Teste 1: Verifica os PRAGMAs e o modo de transação configurados"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+        self.assertEqual(connection.settings_dict['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+
+    def test_gravacao_repetida_quando_banco_bloqueado(self):
+        """Teste 2: Verifica que só a gravação é repetida em bloqueio transitório e outros erros propagam"""
+        chamadas = []
+
+        @repetir_se_bloqueado(espera=0)
+        def gravar(codigo):
+            with transaction.atomic():
+                SequenciaCodigo.objects.create(prefixo=codigo, ultimo_valor=len(chamadas))
+                chamadas.append(codigo)
+                if len(chamadas) == 1:
+                    raise OperationalError('database is locked')
+
+        gravar('ABC')
+        self.assertEqual(len(chamadas), 2)
+        # A tentativa que falhou foi desfeita
+        self.assertEqual(list(SequenciaCodigo.objects.values_list('prefixo', 'ultimo_valor')), [('ABC', 1)])
+
+        @repetir_se_bloqueado(espera=0)
+        def gravar_com_erro():
+            chamadas.append('erro')
+            raise OperationalError('no such table: x')
+
+        with self.assertRaises(OperationalError):
+            gravar_com_erro()
+        self.assertEqual(chamadas.count('erro'), 1)
+
+        # Dentro de um bloco atômico externo não há repetição
+        chamadas.clear()
+        with self.assertRaises(OperationalError), transaction.atomic():
+            gravar('XYZ')
+        self.assertEqual(len(chamadas), 1)
+
+
+class PerfilBancoPorAmbienteTest(SimpleTestCase):
+    """Testes para a escolha do perfil de banco por variáveis de ambiente"""
+
+    def test_sqlite_por_padrao(self):
+        """Teste 1: Verifica que sem GUTO_DB_ENGINE o perfil é o SQLite"""
+        with mock.patch.dict(os.environ, {}, clear=True):
+            banco = database_from_env('db.sqlite3')
+        self.assertEqual(banco['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertIn('PRAGMA journal_mode=WAL', banco['OPTIONS']['init_command'])
+
+    def test_perfil_postgres(self):
+        """Teste 2: Verifica pool, health checks e statement_timeout do perfil PostgreSQL"""
+        ambiente = {
+            'GUTO_DB_ENGINE': 'postgresql',
+            'GUTO_PG_NAME': 'rede',
+            'GUTO_PG_POOL_MAX': '20',
+            'GUTO_PG_STATEMENT_TIMEOUT': '15000',
+        }
+        with mock.patch.dict(os.environ, ambiente, clear=True):
+            banco = database_from_env('db.sqlite3')
+        self.assertEqual(banco['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(banco['NAME'], 'rede')
+        self.assertEqual(banco['CONN_MAX_AGE'], 0)
+        self.assertTrue(banco['CONN_HEALTH_CHECKS'])
+        self.assertEqual(banco['OPTIONS']['pool']['max_size'], 20)
+        self.assertEqual(banco['OPTIONS']['options'], '-c statement_timeout=15000')
+
+        with mock.patch.dict(os.environ, {'GUTO_DB_ENGINE': 'oracle'}, clear=True):
+            with self.assertRaises(ValueError):
+                database_from_env('db.sqlite3')
+
+
+class PlanosConsultaTest(TestCase):
+    """Testes para os planos de execução das consultas críticas"""
+
+    def test_consultas_criticas_usam_indices(self):
+        """Teste 1: Verifica que nenhuma consulta crítica percorre uma tabela inteira"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN disponível apenas no SQLite')
+        regressoes = {
+            nome: plano for nome, (plano, varreduras) in verificar_planos().items() if varreduras
+        }
+        self.assertEqual(regressoes, {})
+
+    def test_deteccao_de_varredura_completa(self):
+        """Teste 2: Verifica que uma consulta sem índice é detectada"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN disponível apenas no SQLite')
+        resultado = verificar_planos({'sem_indice': Aluno.objects.filter(nome_mae='Maria')})
+        self.assertEqual(resultado['sem_indice'][1], ['SCAN alunos_aluno'])
+        self.assertEqual(varreduras_completas([
+            'SCAN alunos_aluno USING INDEX aluno_corrente_nome_idx',
+            'SCAN busca_fts VIRTUAL TABLE INDEX 0:M1',
+            'SCAN (subquery-1)',
+        ]), [])
+
+
+class GeradorRedeTest(TestCase):
+    """Testes para o comando generate_network"""
+
+    def gerar(self, semente=7):
+        call_command(
+            'generate_network', '--alunos', '45', '--escolas', '2', '--alunos-por-turma', '10',
+            '--disciplinas', '2', '--avaliacoes', '1', '--aulas', '2', '--funcionarios-por-escola', '3',
+            '--rotas-por-escola', '1', '--ano', '2025', '--semente', str(semente), '--lote', '7',
+            stdout=StringIO()
+        )
+        return list(Aluno.objects.order_by('codigo').values_list('nome', 'data_nascimento'))
+
+    def test_rede_gerada_em_lotes(self):
+        """Teste 1: Verifica as quantidades geradas e a atualização do índice da busca"""
+        alunos = self.gerar()
+        self.assertEqual(len(alunos), 45)
+        # 2 escolas com 23 e 22 alunos, 10 por turma: 3 + 3 turmas
+        self.assertEqual(Enturmacao.objects.filter(ativo=True).count(), 45)
+        self.assertEqual(Enturmacao.objects.values('turma').distinct().count(), 6)
+        self.assertEqual(NotaAvaliacao.objects.count(), 45 * 2)
+        self.assertEqual(RegistroFrequencia.objects.count(), 45 * 2 * 2)
+        self.assertTrue(NotaAvaliacao.objects.filter(nota__isnull=False, nota__lte=10).exists())
+        self.assertFalse(Aluno.objects.exclude(matriculas__status='ATIVA').exists())
+        primeiro_nome = alunos[0][0].split()[0]
+        self.assertTrue(buscar(Aluno.objects.all(), 'aluno', primeiro_nome).exists())
+
+    def test_rede_deterministica(self):
+        """Teste 2: Verifica que a mesma semente gera os mesmos dados e não pode ser gerada duas vezes"""
+        with transaction.atomic():
+            primeira = self.gerar()
+            transaction.set_rollback(True)
+        segunda = self.gerar()
+        self.assertEqual(primeira, segunda)
+        with self.assertRaises(CommandError):
+            self.gerar()
+
+
+class BenchmarkViewsTest(TestCase):
+    """Testes para o orçamento de consultas das principais views"""
+
+    def test_views_dentro_do_orcamento(self):
+        """Teste 1: Verifica que nenhuma view ultrapassa o orçamento de consultas numa rede gerada"""
+        call_command(
+            'generate_network', '--alunos', '40', '--escolas', '2', '--alunos-por-turma', '10',
+            '--disciplinas', '2', '--avaliacoes', '2', '--aulas', '2', '--funcionarios-por-escola', '2',
+            '--rotas-por-escola', '1', '--ano', '2025', '--semente', '3', stdout=StringIO()
+        )
+        usuario = User.objects.create_superuser('benchmark', 'benchmark@teste.com', 'senha')
+        resultados = executar_benchmark(usuario, repeticoes=1)
+        self.assertEqual(len(resultados), len(CASOS))
+        fora = {r.nome: (r.status, r.consultas, r.orcamento) for r in resultados if not r.dentro_do_orcamento}
+        self.assertEqual(fora, {})
+
+
+@override_settings(PERFIL_REQUISICOES=True, PERFIL_AMOSTRAGEM=1.0, PERFIL_LIMITE_REPETICOES=3)
+class PerfilRequisicaoTest(TestCase):
+    """Testes para o middleware de perfil de requisições"""
+
+    def view_n_mais_um(self, request):
+        for codigo in range(4):
+            Aluno.objects.filter(codigo=codigo).first()
+        return HttpResponse('ok')
+
+    def test_server_timing_e_n_mais_um(self):
+        """Teste 1: Verifica o cabeçalho Server-Timing e o aviso de consultas repetidas"""
+        middleware = PerfilRequisicaoMiddleware(self.view_n_mais_um)
+        with self.assertLogs('utilitarios.middleware', level='INFO') as logs:
+            response = middleware(RequestFactory().get('/alunos/'))
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertIn('desc="4 consultas"', response['Server-Timing'])
+        self.assertIn('n1;desc="1 consultas repetidas"', response['Server-Timing'])
+        self.assertIn('caminho=/alunos/ status=200 consultas=4', logs.output[0])
+        self.assertIn('Possível N+1 em /alunos/: consulta executada 4 vezes', logs.output[1])
+
+    def test_desligado_e_amostragem(self):
+        """Teste 2: Verifica que o middleware fica fora quando desligado e respeita a amostragem"""
+        with override_settings(PERFIL_REQUISICOES=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                PerfilRequisicaoMiddleware(self.view_n_mais_um)
+        with override_settings(PERFIL_AMOSTRAGEM=0):
+            response = PerfilRequisicaoMiddleware(self.view_n_mais_um)(RequestFactory().get('/'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_impressao_digital(self):
+        """Teste 3: Verifica que literais e listas IN de tamanhos diferentes geram a mesma impressão"""
+        self.assertEqual(
+            impressao_digital('SELECT * FROM t WHERE id IN (%s, %s) AND nome = \'Ana\' LIMIT 21'),
+            impressao_digital('SELECT *  FROM t WHERE id IN (%s) AND nome = \'Bia\' LIMIT 1'),
+        )
+
+    def test_streaming_medido_ate_o_fim_do_corpo(self):
+        """Teste 4: Verifica que as consultas feitas durante o streaming entram no perfil"""
+        def view_streaming(request):
+            def partes():
+                for codigo in range(3):
+                    yield str(Aluno.objects.filter(codigo=codigo).count())
+            return StreamingHttpResponse(partes())
+
+        response = PerfilRequisicaoMiddleware(view_streaming)(RequestFactory().get('/censo/exportar/'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        with self.assertLogs('utilitarios.middleware', level='INFO') as logs:
+            self.assertEqual(b''.join(response.streaming_content), b'000')
+        self.assertIn('caminho=/censo/exportar/ status=200 consultas=3', logs.output[0])
+        self.assertIn('streaming=sim', logs.output[0])
+        self.assertIn('Possível N+1 em /censo/exportar/: consulta executada 3 vezes', logs.output[1])
+
+
+class EscritorAuditoriaTest(TransactionTestCase):
+    """Testes para a gravação assíncrona de atividades e auditoria"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('auditor', password='senha')
+        self.escritor = EscritorAuditoria(lote=3, intervalo_ms=20, fila_maxima=100)
+        self.addCleanup(self.escritor.encerrar)
+
+    def atividade(self, numero):
+        return AtividadeRecente(usuario=self.usuario, acao='CRIAR', modulo='ALUNOS', objeto_nome=f'Aluno {numero}')
+
+    def test_gravacao_em_lote_apos_commit(self):
+        """Teste 1: Verifica que os registros são gravados em lote só depois do commit"""
+        with transaction.atomic():
+            for numero in range(7):
+                self.escritor.enviar(self.atividade(numero))
+            self.escritor.enviar(RegistroAuditoria(
+                usuario=self.usuario, acao='UPDATE', tela='Usuários', funcionalidade='Alterar', descricao='teste'
+            ))
+            self.assertTrue(self.escritor.fila.empty())
+        self.escritor.descarregar()
+        self.assertEqual(AtividadeRecente.objects.count(), 7)
+        self.assertEqual(RegistroAuditoria.objects.count(), 1)
+
+        with transaction.atomic():
+            self.escritor.enviar(self.atividade(99))
+            transaction.set_rollback(True)
+        self.escritor.descarregar()
+        self.assertEqual(AtividadeRecente.objects.count(), 7)
+
+    def test_fila_cheia_e_encerramento(self):
+        """Teste 2: Verifica a gravação síncrona com a fila cheia e após o encerramento"""
+        escritor = EscritorAuditoria(lote=10, intervalo_ms=20, fila_maxima=1)
+        escritor._iniciar = lambda: None  # sem thread: a fila enche no segundo registro
+        escritor.enviar(self.atividade(1))
+        with self.assertLogs('utilitarios.auditoria', level='WARNING'):
+            escritor.enviar(self.atividade(2))
+        self.assertEqual(AtividadeRecente.objects.count(), 1)
+        escritor.encerrar()
+        self.assertEqual(AtividadeRecente.objects.count(), 2)
+        escritor.enviar(self.atividade(3))
+        self.assertEqual(AtividadeRecente.objects.count(), 3)
+
+    @override_settings(AUDITORIA_MODO='sincrono')
+    def test_modo_sincrono(self):
+        """Teste 3: Verifica que o modo síncrono grava o registro na própria chamada"""
+        atividade = AtividadeRecente.registrar_atividade(self.usuario, 'EDITAR', 'ALUNOS', 'Aluno')
+        self.assertIsNotNone(atividade.pk)
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+        request.user = self.usuario
+        registro = registrar_auditoria(request, 'VIEW', 'Auditoria', 'Consultar', 'Consulta')
+        self.assertEqual(RegistroAuditoria.objects.get(pk=registro.pk).ip_address, '10.0.0.1')
+
+    def test_lote_com_falha_gravado_um_a_um(self):
+        """Teste 4: Verifica que um lote que falha no banco é gravado registro a registro, sem perdas"""
+        with mock.patch(
+            'django.db.models.query.QuerySet.bulk_create', side_effect=OperationalError('server closed the connection')
+        ), mock.patch('utilitarios.auditoria.close_old_connections') as renovar:
+            with self.assertLogs('utilitarios.auditoria', level='ERROR'):
+                for numero in range(4):
+                    self.escritor.enviar(self.atividade(numero))
+                self.escritor.descarregar()
+        self.assertEqual(AtividadeRecente.objects.count(), 4)
+        self.assertTrue(renovar.called)
+
+
+class PaginacaoCursorTest(TestCase):
+    """Testes para a paginação por cursor e a tela de auditoria"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_superuser('auditor', 'auditor@teste.com', 'senha')
+        RegistroAuditoria.objects.bulk_create([
+            RegistroAuditoria(
+                usuario=self.usuario, acao='LOGIN' if numero % 2 else 'VIEW',
+                tela='Auditoria', funcionalidade='Consultar', descricao=f'Registro {numero}'
+            )
+            for numero in range(23)
+        ])
+        # Datas repetidas: o id desempata a ordenação
+        for numero, registro in enumerate(RegistroAuditoria.objects.order_by('id')):
+            RegistroAuditoria.objects.filter(pk=registro.pk).update(
+                data_acao=timezone.now() - timedelta(minutes=numero // 4)
+            )
+
+    def test_percorre_paginas_nos_dois_sentidos(self):
+        """Teste 1: Verifica que as páginas seguintes e anteriores cobrem todos os registros sem repetir"""
+        esperado = list(RegistroAuditoria.objects.order_by('-data_acao', '-id').values_list('id', flat=True))
+        paginador = PaginadorCursor(RegistroAuditoria.objects.all(), ('-data_acao', '-id'), por_pagina=5)
+
+        paginas = [paginador.get_pagina()]
+        while paginas[-1].tem_proxima:
+            paginas.append(paginador.get_pagina(depois=paginas[-1].cursor_proximo))
+        self.assertEqual([r.id for pagina in paginas for r in pagina], esperado)
+        self.assertEqual([len(pagina) for pagina in paginas], [5, 5, 5, 5, 3])
+        self.assertFalse(paginas[0].tem_anterior)
+        self.assertEqual(paginas[-1].total, 23)
+
+        anterior = paginador.get_pagina(antes=paginas[3].cursor_anterior)
+        self.assertEqual([r.id for r in anterior], [r.id for r in paginas[2]])
+        # Voltando para o início, a primeira página vem completa
+        self.assertEqual([r.id for r in paginador.get_pagina(antes=paginas[1].cursor_anterior)], esperado[:5])
+        self.assertEqual([r.id for r in paginador.get_pagina(depois='cursor-invalido')], esperado[:5])
+
+    def test_tela_auditoria(self):
+        """Teste 2: Verifica a tela de auditoria com filtros, cursor e usuários da tabela de opções"""
+        request = RequestFactory().get('/')
+        request.user = self.usuario
+        with override_settings(AUDITORIA_MODO='sincrono'):
+            registrar_auditoria(request, 'UPDATE', 'Usuários', 'Alterar usuário', 'Teste')
+        self.assertTrue(UsuarioAuditado.objects.filter(usuario=self.usuario).exists())
+
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('utilitarios:auditoria'), {'acao': 'LOGIN', 'data_inicio': '2025-02-30'})
+        self.assertEqual(response.status_code, 200)
+        pagina = response.context['registros']
+        self.assertEqual(pagina.total, 11)
+        self.assertTrue(all(registro.acao == 'LOGIN' for registro in pagina))
+        self.assertEqual(response.context['usuarios'], [self.usuario])
+        self.assertEqual(response.context['filtros_query'], 'acao=LOGIN&data_inicio=2025-02-30')
+
+    def test_total_aproximado_em_cache(self):
+        """Teste 3: Verifica que o total fica em cache em vez de contar a tabela a cada página"""
+        self.assertEqual(total_aproximado(RegistroAuditoria.objects.all()), 23)
+        RegistroAuditoria.objects.filter(acao='VIEW').delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(total_aproximado(RegistroAuditoria.objects.order_by('-id')), 23)
+        self.assertEqual(total_aproximado(RegistroAuditoria.objects.filter(acao='LOGIN')), 11)
+
+
+class RetencaoAuditoriaTest(TestCase):
+    """Testes para o arquivamento de auditoria e atividades antigas"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_superuser('auditor', 'auditor@teste.com', 'senha')
+        RegistroAuditoria.objects.bulk_create([
+            RegistroAuditoria(
+                usuario=self.usuario, acao='UPDATE', tela='Usuários', funcionalidade='Alterar',
+                descricao=f'Registro {numero}', dados_alterados={'numero': numero}
+            )
+            for numero in range(7)
+        ])
+        # Um registro por dia, do mais recente (hoje) ao mais antigo (6 dias atrás)
+        self.agora = timezone.now()
+        for numero, registro in enumerate(RegistroAuditoria.objects.order_by('-id')):
+            RegistroAuditoria.objects.filter(pk=registro.pk).update(data_acao=self.agora - timedelta(days=numero, hours=1))
+        AtividadeRecente.objects.create(
+            usuario=self.usuario, acao='EDITAR', modulo='ALUNOS', objeto_nome='Aluno antigo'
+        )
+        AtividadeRecente.objects.update(data_atividade=self.agora - timedelta(days=120))
+
+    def test_arquiva_em_lotes_preservando_registros(self):
+        """Teste 1: Verifica que o comando move em lotes as linhas antigas mantendo id e dados"""
+        data = timezone.localdate(self.agora - timedelta(days=3))
+        antigos = {
+            registro.id: (registro.data_acao, registro.dados_alterados)
+            for registro in RegistroAuditoria.objects.filter(data_acao__date__lt=data)
+        }
+        saida = StringIO()
+        call_command(
+            'archive_audit', before=data.isoformat(), tabela=['auditoria'], lote=2, verbosity=2, stdout=saida
+        )
+
+        self.assertEqual(RegistroAuditoria.objects.count() + RegistroAuditoriaArquivado.objects.count(), 7)
+        self.assertEqual(
+            {registro.id: (registro.data_acao, registro.dados_alterados)
+             for registro in RegistroAuditoriaArquivado.objects.all()},
+            antigos
+        )
+        self.assertFalse(RegistroAuditoria.objects.filter(pk__in=antigos).exists())
+        self.assertIn('auditoria: 2 linhas arquivadas...', saida.getvalue())
+        # A atividade não foi pedida e continua na tabela principal
+        self.assertEqual(AtividadeRecente.objects.count(), 1)
+
+        # Repetir o comando não move nem duplica nada
+        call_command('archive_audit', before=data.isoformat(), tabela=['auditoria'], stdout=StringIO())
+        self.assertEqual(RegistroAuditoriaArquivado.objects.count(), len(antigos))
+
+        with self.assertRaises(CommandError):
+            call_command('archive_audit', before='30/02/2025', stdout=StringIO())
+
+    @override_settings(RETENCAO_DIAS={'auditoria': 2, 'atividades': 90})
+    def test_retencao_por_tabela(self):
+        """Teste 2: Verifica que sem --before cada tabela usa a sua retenção configurada"""
+        self.assertEqual(corte_retencao('auditoria', self.agora), self.agora - timedelta(days=2))
+        call_command('archive_audit', stdout=StringIO())
+        self.assertEqual(RegistroAuditoria.objects.count(), 2)
+        self.assertEqual(RegistroAuditoriaArquivado.objects.count(), 5)
+        self.assertFalse(AtividadeRecente.objects.exists())
+        self.assertEqual(AtividadeRecenteArquivada.objects.get().objeto_nome, 'Aluno antigo')
+
+        # Retenção None (variável de ambiente vazia ou 0) não arquiva a tabela
+        with override_settings(RETENCAO_DIAS={'auditoria': None}):
+            self.assertIsNone(corte_retencao('auditoria', self.agora))
+            call_command('archive_audit', tabela=['auditoria'], stdout=StringIO())
+        self.assertEqual(RegistroAuditoria.objects.count(), 2)
+
+    @override_settings(RETENCAO_DIAS={'auditoria': 2})
+    def test_paginacao_continua_no_arquivo(self):
+        """Teste 3: Verifica que a tela de auditoria continua a paginação nos registros arquivados"""
+        call_command('archive_audit', tabela=['auditoria'], stdout=StringIO())
+        esperado = list(
+            RegistroAuditoria.objects.order_by('-data_acao').values_list('id', flat=True)
+        ) + list(RegistroAuditoriaArquivado.objects.order_by('-data_acao').values_list('id', flat=True))
+
+        paginador = PaginadorCursor(
+            RegistroAuditoria.objects.all(), ('-data_acao', '-id'), por_pagina=2,
+            continuacao=[RegistroAuditoriaArquivado.objects.all()]
+        )
+        paginas = [paginador.get_pagina()]
+        while paginas[-1].tem_proxima:
+            paginas.append(paginador.get_pagina(depois=paginas[-1].cursor_proximo))
+        self.assertEqual([r.id for pagina in paginas for r in pagina], esperado)
+        self.assertEqual(paginas[0].total, 7)
+        self.assertEqual(
+            [r.id for r in paginador.get_pagina(antes=paginas[2].cursor_anterior)], [r.id for r in paginas[1]]
+        )
+
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('utilitarios:auditoria'), {'acao': 'UPDATE'})
+        self.assertEqual(response.context['registros'].total, 7)
+
+
+@registrar_tarefa('testes.somar')
+def somar(tarefa, a, b):
+    tarefa.reportar_progresso(50, 'Somando')
+    return {'soma': a + b}
+
+
+@registrar_tarefa('testes.falhar_na_primeira')
+def falhar_na_primeira(tarefa):
+    if tarefa.tentativas == 1:
+        raise RuntimeError('Falha transitória')
+    return 'ok'
+
+
+class FilaTarefasTest(TransactionTestCase):
+    """Testes para a fila de tarefas em segundo plano"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('usuario', 'usuario@teste.com', 'senha')
+
+    def test_executa_com_progresso_e_resultado(self):
+        """Teste 1: Verifica a execução de uma tarefa e o endpoint de progresso"""
+        tarefa = enfileirar('testes.somar', usuario=self.usuario, a=2, b=3)
+        with self.assertRaises(ValueError):
+            enfileirar('testes.inexistente')
+
+        self.assertEqual(reivindicar('teste').pk, tarefa.pk)
+        # Já está com um trabalhador: ninguém mais a reivindica
+        self.assertIsNone(reivindicar('outro'))
+        tarefa = executar(Tarefa.objects.get(pk=tarefa.pk))
+        self.assertEqual(tarefa.status, 'CONCLUIDA')
+        self.assertEqual(tarefa.resultado, {'soma': 5})
+        self.assertEqual((tarefa.tentativas, tarefa.progresso, tarefa.mensagem), (1, 100, 'Somando'))
+
+        self.client.force_login(self.usuario)
+        dados = self.client.get(reverse('utilitarios:tarefa_status', args=[tarefa.pk])).json()
+        self.assertEqual(dados['status'], 'CONCLUIDA')
+        self.assertTrue(dados['finalizada'])
+        self.assertEqual(dados['resultado'], {'soma': 5})
+        self.client.force_login(User.objects.create_user('outro', 'outro@teste.com', 'senha'))
+        self.assertEqual(self.client.get(reverse('utilitarios:tarefa_status', args=[tarefa.pk])).status_code, 404)
+
+    @override_settings(TAREFAS_ESPERA_BASE=10)
+    def test_nova_tentativa_com_espera(self):
+        """Teste 2: Verifica a nova tentativa com espera, a falha definitiva e a execução abandonada"""
+        tarefa = enfileirar('testes.falhar_na_primeira')
+        tarefa = executar(reivindicar('teste'))
+        self.assertEqual(tarefa.status, 'PENDENTE')
+        self.assertIn('Falha transitória', tarefa.erro)
+        self.assertGreater(tarefa.executar_apos, timezone.now() + timedelta(seconds=9))
+        self.assertIsNone(reivindicar('teste'))
+
+        Tarefa.objects.filter(pk=tarefa.pk).update(executar_apos=timezone.now())
+        tarefa = executar(reivindicar('teste'))
+        self.assertEqual((tarefa.status, tarefa.tentativas, tarefa.resultado), ('CONCLUIDA', 2, 'ok'))
+
+        enfileirar('testes.falhar_na_primeira', max_tentativas=1)
+        unica = executar(reivindicar('teste'))
+        self.assertEqual((unica.status, unica.tentativas), ('FALHOU', 1))
+        self.assertIsNotNone(unica.data_fim)
+
+        # Trabalhador morto no meio da execução: o prazo vence e outro assume
+        abandonada = enfileirar('testes.somar', a=1, b=1)
+        reivindicar('morto')
+        Tarefa.objects.filter(pk=abandonada.pk).update(bloqueada_ate=timezone.now() - timedelta(seconds=1))
+        assumida = reivindicar('teste')
+        self.assertEqual((assumida.pk, assumida.tentativas, assumida.trabalhador), (abandonada.pk, 2, 'teste'))
+
+    def test_run_workers(self):
+        """Teste 3: Verifica que o comando executa as tarefas disponíveis com várias threads"""
+        tarefas = [enfileirar('testes.somar', a=numero, b=1) for numero in range(6)]
+        adiada = enfileirar('testes.somar', atraso=60, a=0, b=0)
+
+        saida = StringIO()
+        call_command('run_workers', concurrency=3, intervalo=0.05, ate_esvaziar=True, stdout=saida)
+        self.assertIn('6 tarefas executadas', saida.getvalue())
+        self.assertEqual(
+            [t.resultado for t in Tarefa.objects.filter(pk__in=[t.pk for t in tarefas]).order_by('pk')],
+            [{'soma': numero + 1} for numero in range(6)]
+        )
+        self.assertEqual(Tarefa.objects.get(pk=adiada.pk).status, 'PENDENTE')
+        with self.assertRaises(CommandError):
+            call_command('run_workers', concurrency=0, stdout=StringIO())
@@ -24,6 +24,9 @@ urlpatterns = [
     # Auditoria
     path('auditoria/', views.auditoria, name='auditoria'),
     
+    # Tarefas em segundo plano (progresso consultado pela tela)
+    path('tarefas/<int:tarefa_id>/', views.tarefa_status, name='tarefa_status'),
+    
     # Solicitações de Transferência
     path('transferencias/', views.solicitacoes_transferencia, name='solicitacoes_transferencia'),
     path('transferencias/<int:solicitacao_id>/processar/', views.processar_transferencia, name='processar_transferencia'),
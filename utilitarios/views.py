@@ -8,14 +8,20 @@ from django.core.paginator import Paginator
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+from urllib.parse import urlencode
 import json
 
 from .models import (
     GrupoAcesso, Instituicao, PerfilUsuario, AssociacaoUsuarioInstituicao,
     ConfiguracaoSistema, DadoAdicional, ValorDadoAdicional, RegistroAuditoria,
     SolicitacaoTransferencia, PermissaoGrupo, BloqueioFuncionalidade,
-    MatriculaRapida, CabecalhoRelatorio, TipoAvaliacao
+    MatriculaRapida, CabecalhoRelatorio, TipoAvaliacao, UsuarioAuditado, RegistroAuditoriaArquivado,
+    Tarefa
 )
+from .auditoria import registrar_auditoria
+from .paginacao import PaginadorCursor
 
 
 @login_required
@@ -83,12 +89,9 @@ def editar_usuario(request, user_id):
         perfil.observacoes = request.POST.get('observacoes', '')
         perfil.save()
         
-        RegistroAuditoria.objects.create(
-            usuario=request.user,
-            acao='ALTERAR_USUARIO',
-            detalhes=f'Usuário {usuario.username} alterado',
-            ip_origem=request.META.get('REMOTE_ADDR', ''),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')
+        registrar_auditoria(
+            request, 'UPDATE', 'Usuários', 'Alterar usuário',
+            f'Usuário {usuario.username} alterado'
         )
         
         messages.success(request, 'Usuário atualizado com sucesso!')
@@ -199,46 +202,100 @@ def dados_adicionais(request):
     return render(request, 'utilitarios/dados_adicionais.html', context)
 
 
+def _ler_data(valor):
+    """Data AAAA-MM-DD do filtro, ou None se vazia ou inválida"""
+    try:
+        return parse_date(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def _inicio_do_dia(data):
+    return timezone.make_aware(datetime.combine(data, time.min))
+
+
 @login_required
 def auditoria(request):
-    registros = RegistroAuditoria.objects.all().order_by('-data_acao')
-    
-    # Filtros
+    # Filtros (datas como faixa de data_acao, para usar os índices)
     acao = request.GET.get('acao', '')
     usuario_id = request.GET.get('usuario', '')
     data_inicio = request.GET.get('data_inicio', '')
     data_fim = request.GET.get('data_fim', '')
-    
-    if acao:
-        registros = registros.filter(acao=acao)
-    if usuario_id:
-        registros = registros.filter(usuario_id=usuario_id)
-    if data_inicio:
-        registros = registros.filter(data_acao__date__gte=data_inicio)
-    if data_fim:
-        registros = registros.filter(data_acao__date__lte=data_fim)
-    
-    paginator = Paginator(registros, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    usuarios = User.objects.all()
-    acoes = RegistroAuditoria.objects.values_list('acao', flat=True).distinct()
-    
+    inicio = _ler_data(data_inicio)
+    fim = _ler_data(data_fim)
+    
+    def filtrar(registros):
+        registros = registros.select_related('usuario')
+        if acao:
+            registros = registros.filter(acao=acao)
+        if usuario_id.isdigit():
+            registros = registros.filter(usuario_id=usuario_id)
+        if inicio:
+            registros = registros.filter(data_acao__gte=_inicio_do_dia(inicio))
+        if fim:
+            registros = registros.filter(data_acao__lt=_inicio_do_dia(fim + timedelta(days=1)))
+        return registros
+    
+    # Paginação por cursor: páginas profundas custam o mesmo que a primeira.
+    # Depois dos registros recentes a paginação segue no arquivo (archive_audit).
+    paginador = PaginadorCursor(
+        filtrar(RegistroAuditoria.objects.all()), ('-data_acao', '-id'), por_pagina=50,
+        continuacao=[filtrar(RegistroAuditoriaArquivado.objects.all())],
+    )
+    pagina = paginador.get_pagina(depois=request.GET.get('depois'), antes=request.GET.get('antes'))
+    
+    # Opções dos filtros: ações fixas do model e usuários da tabela UsuarioAuditado
+    usuarios = [
+        auditado.usuario for auditado in
+        UsuarioAuditado.objects.select_related('usuario').order_by('usuario__first_name', 'usuario__username')
+    ]
+    
+    filtros = {
+        'acao': acao,
+        'usuario': usuario_id,
+        'data_inicio': data_inicio,
+        'data_fim': data_fim,
+    }
     context = {
-        'registros': page_obj,
+        'registros': pagina,
+        'total_registros': pagina.total,
         'usuarios': usuarios,
-        'acoes': acoes,
-        'filtros': {
-            'acao': acao,
-            'usuario': usuario_id,
-            'data_inicio': data_inicio,
-            'data_fim': data_fim,
-        }
+        'acoes': RegistroAuditoria.ACAO_CHOICES,
+        'filtros': filtros,
+        'filtros_query': urlencode({chave: valor for chave, valor in filtros.items() if valor}),
     }
     return render(request, 'utilitarios/auditoria.html', context)
 
 
+@login_required
+def tarefa_status(request, tarefa_id):
+    """
+    Situação e progresso de uma tarefa em segundo plano, em JSON, para a tela
+    consultar periodicamente. Cada usuário vê as próprias tarefas; o
+    administrador vê todas.
+    """
+    tarefas = Tarefa.objects.all() if request.user.is_superuser else Tarefa.objects.filter(usuario=request.user)
+    tarefa = get_object_or_404(tarefas, pk=tarefa_id)
+    erro = tarefa.erro.strip().splitlines()
+    return JsonResponse({
+        'id': tarefa.pk,
+        'nome': tarefa.nome,
+        'status': tarefa.status,
+        'status_display': tarefa.get_status_display(),
+        'finalizada': tarefa.finalizada,
+        'progresso': tarefa.progresso,
+        'mensagem': tarefa.mensagem,
+        'tentativas': tarefa.tentativas,
+        'max_tentativas': tarefa.max_tentativas,
+        'resultado': tarefa.resultado if tarefa.status == 'CONCLUIDA' else None,
+        # Só a última linha do traceback (a exceção), sem os detalhes internos
+        'erro': erro[-1] if erro else '',
+        'data_criacao': tarefa.data_criacao,
+        'data_inicio': tarefa.data_inicio,
+        'data_fim': tarefa.data_fim,
+    })
+
+
 @login_required
 def solicitacoes_transferencia(request):
     solicitacoes = SolicitacaoTransferencia.objects.all().order_by('-data_solicitacao')
@@ -280,12 +337,9 @@ def processar_transferencia(request, solicitacao_id):
     
     solicitacao.save()
     
-    RegistroAuditoria.objects.create(
-        usuario=request.user,
-        acao='PROCESSAR_TRANSFERENCIA',
-        detalhes=f'Solicitação #{solicitacao.id} {solicitacao.status.lower()}',
-        ip_origem=request.META.get('REMOTE_ADDR', ''),
-        user_agent=request.META.get('HTTP_USER_AGENT', '')
+    registrar_auditoria(
+        request, 'UPDATE', 'Solicitações de Transferência', 'Processar transferência',
+        f'Solicitação #{solicitacao.id} {solicitacao.status.lower()}'
     )
     
     return redirect('utilitarios:solicitacoes_transferencia')